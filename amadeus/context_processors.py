@@ -10,12 +10,9 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-from datetime import datetime
-
 from themes.models import Themes
-from notifications.models import Notification
-from mural.models import MuralVisualizations
-from chat.models import ChatVisualizations
+
+from .counters import get_count
 
 def theme(request):
 	context = {}
@@ -36,7 +33,7 @@ def notifies(request):
 	notifications = 0
 
 	if request.user.is_authenticated:
-		notifications = Notification.objects.filter(creation_date = datetime.now(), viewed = False, user = request.user).count()
+		notifications = get_count(request.user, 'notifications')
 
 	context['notifications_count'] = notifications
 
@@ -48,7 +45,7 @@ def mural_notifies(request):
 	notifications = 0
 
 	if request.user.is_authenticated:
-		notifications = MuralVisualizations.objects.filter(viewed = False, user = request.user).count()
+		notifications = get_count(request.user, 'mural')
 
 	context['mural_notifications_count'] = notifications
 
@@ -60,7 +57,7 @@ def chat_notifies(request):
 	notifications = 0
 
 	if request.user.is_authenticated:
-		notifications = ChatVisualizations.objects.filter(viewed = False, user = request.user).count()
+		notifications = get_count(request.user, 'chat')
 
 	context['chat_notifications_count'] = notifications
 
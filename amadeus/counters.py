@@ -0,0 +1,203 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# File used to store the users unread counters (pendency notifications, mural and chat) kept in the cache
+
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
+
+#The key of a user keeps the generation of its counters, each counter is a key of that generation so it can be
+#incremented atomically
+COUNTERS_KEY = "counters-%s-%s"
+COUNT_KEY = "counter-%s-%s"
+
+#Totals by scope of each kind of counter
+SCOPES = {
+	'notifications': ['subject'],
+	'mural': ['subject', 'category', 'resource'],
+	'chat': ['subject', 'talk'],
+}
+
+def get_cache():
+	return caches[getattr(settings, 'COUNTERS_CACHE', 'default')]
+
+def get_key(user_id):
+	#Pendency notifications only count on the day they were created
+	return COUNTERS_KEY % (user_id, date.today().isoformat())
+
+def empty_counters():
+	counters = {}
+
+	for kind, scopes in SCOPES.items():
+		counters[kind] = 0
+
+		for scope in scopes:
+			counters[kind + '_' + scope] = {}
+
+	return counters
+
+def add_total(counters, kind, total, **scopes):
+	counters[kind] += total
+
+	for scope, value in scopes.items():
+		if value:
+			totals = counters[kind + '_' + scope]
+			totals[value] = totals.get(value, 0) + total
+
+def compute_counters(user):
+	from chat.models import ChatVisualizations
+	from mural.models import MuralVisualizations
+	from notifications.models import Notification
+	from subjects.models import Subject
+
+	counters = empty_counters()
+
+	notifications = Notification.objects.filter(user = user, viewed = False, creation_date = date.today()).values('task__resource__topic__subject').annotate(total = Count('id')).order_by()
+
+	for row in notifications:
+		add_total(counters, 'notifications', row['total'], subject = row['task__resource__topic__subject'])
+
+	#A visualization points to a post or to a comment, the space is the one of the post
+	mural = MuralVisualizations.objects.filter(user = user, viewed = False).annotate(
+		space_subject = Coalesce('post__subjectpost__space', 'comment__post__subjectpost__space', output_field = models.IntegerField()),
+		space_category = Coalesce('post__categorypost__space', 'comment__post__categorypost__space', output_field = models.IntegerField()),
+		space_resource = Coalesce('post__subjectpost__resource', 'comment__post__subjectpost__resource', output_field = models.IntegerField())
+	).values('space_subject', 'space_category', 'space_resource').annotate(total = Count('id')).order_by()
+
+	for row in mural:
+		add_total(counters, 'mural', row['total'], subject = row['space_subject'], category = row['space_category'], resource = row['space_resource'])
+
+	chat = ChatVisualizations.objects.filter(user = user, viewed = False).values('message__subject', 'message__talk').annotate(total = Count('id')).order_by()
+
+	#Subject messages only count while the user still participates in the subject
+	if user.is_staff:
+		subjects = None
+	else:
+		subjects = set(Subject.objects.filter(Q(students = user) | Q(professor = user) | Q(category__coordinators = user)).values_list('id', flat = True))
+
+	for row in chat:
+		subject = row['message__subject']
+
+		if subject and not subjects is None and not subject in subjects:
+			subject = None
+
+		add_total(counters, 'chat', row['total'], subject = subject, talk = row['message__talk'])
+
+	return counters
+
+def get_name(kind, scope = None, value = None):
+	if scope is None:
+		return kind
+
+	return "%s_%s-%s" % (kind, scope, value)
+
+def get_timeout():
+	return getattr(settings, 'COUNTERS_TIMEOUT', 600)
+
+def store_counters(user, counters):
+	"""
+		Writes the computed counters of the user as a new generation of keys and returns it with the names written
+	"""
+	generation = uuid.uuid4().hex
+	values = {}
+
+	for kind, scopes in SCOPES.items():
+		values[get_name(kind)] = counters[kind]
+
+		for scope in scopes:
+			for value, total in counters[kind + '_' + scope].items():
+				values[get_name(kind, scope, value)] = total
+
+	get_cache().set_many({COUNT_KEY % (generation, name): total for name, total in values.items()}, get_timeout())
+	get_cache().set(get_key(user.id), (generation, list(values.keys())), get_timeout())
+
+	return generation, values
+
+def get_counters(user):
+	"""
+		Returns the generation of the counters of the user and the values of the ones known, computed with three grouped
+		queries when they are not cached. They are kept on the user object too, so the context processors and tags of a
+		request share them
+	"""
+	if not hasattr(user, '_unread_counters'):
+		cached = get_cache().get(get_key(user.id))
+
+		if cached is None:
+			generation, values = store_counters(user, compute_counters(user))
+		else:
+			generation, names = cached
+			keys = {COUNT_KEY % (generation, name): name for name in names}
+
+			values = {keys[key]: total for key, total in get_cache().get_many(list(keys.keys())).items()}
+
+		user._unread_counters = (generation, values)
+
+	return user._unread_counters
+
+def get_count(user, kind, scope = None, value = None):
+	generation, values = get_counters(user)
+	name = get_name(kind, scope, value)
+
+	#Scopes that got their first item after the counters were computed
+	if not name in values:
+		values[name] = get_cache().get(COUNT_KEY % (generation, name), 0)
+
+	return values[name]
+
+def increment(user_ids, kind, **scopes):
+	"""
+		Adds one unread item to the cached counters of the users, the ones not cached are computed on their next read.
+		Every counter is its own key and cache.incr is atomic on the shared cache, so concurrent increments are not lost
+	"""
+	cache = get_cache()
+	names = [get_name(kind)] + [get_name(kind, scope, value) for scope, value in scopes.items() if value]
+
+	for cached in cache.get_many([get_key(user_id) for user_id in user_ids]).values():
+		generation = cached[0]
+
+		for name in names:
+			key = COUNT_KEY % (generation, name)
+
+			cache.add(key, 0, get_timeout())
+
+			try:
+				cache.incr(key)
+			except ValueError:
+				#The key expired along with its generation
+				pass
+
+def invalidate(user_ids):
+	get_cache().delete_many([get_key(user_id) for user_id in user_ids])
+
+class CounterQuerySet(models.QuerySet):
+	"""
+		Queryset of the unread models (notifications, mural and chat visualizations): marking rows as viewed drops the
+		counters of their users, a viewed update usually covers several scopes at once
+	"""
+	def update(self, **kwargs):
+		if 'viewed' in kwargs:
+			user_ids = set(self.values_list('user_id', flat = True))
+
+			rows = super(CounterQuerySet, self).update(**kwargs)
+
+			invalidate(user_ids)
+
+			return rows
+
+		return super(CounterQuerySet, self).update(**kwargs)
@@ -0,0 +1,118 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# Runner for the nightly batch jobs: the work is split in shards (e.g. one per subject) that run on a
+# process pool, each one inside its own transaction, and finished shards are checkpointed so a rerun
+# of the same day skips them.
+
+import time
+import multiprocessing
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import JobShard
+
+class ShardedJob(object):
+	code = None
+	#Jobs that commit their own batches (and can resume a shard left halfway) turn this off
+	atomic = True
+
+	def get_shards(self):
+		"""
+			Must return the list of shard keys (e.g. subject ids)
+		"""
+		return []
+
+	def run_shard(self, shard):
+		pass
+
+	def finish(self, timings):
+		"""
+			Called once every shard of the run is done, with the (shard, duration) of the ones this call processed
+		"""
+		pass
+
+	def get_run(self):
+		return str(timezone.localtime(timezone.now()).date())
+
+def finish_shard(job, shard, checkpoint, start):
+	job.run_shard(shard)
+
+	checkpoint.finished = timezone.now()
+	checkpoint.duration = time.time() - start
+	checkpoint.save()
+
+def run_shard(job, run, shard):
+	checkpoint, created = JobShard.objects.get_or_create(job = job.code, run = run, shard = str(shard))
+
+	if not checkpoint.finished is None:
+		return (shard, None)
+
+	start = time.time()
+
+	checkpoint.started = timezone.now()
+	checkpoint.save()
+
+	if job.atomic:
+		with transaction.atomic():
+			finish_shard(job, shard, checkpoint, start)
+	else:
+		finish_shard(job, shard, checkpoint, start)
+
+	return (shard, checkpoint.duration)
+
+def _pool_run_shard(args):
+	job_path, run, shard = args
+
+	return run_shard(import_string(job_path)(), run, shard)
+
+def run_job(job, processes = None, run = None):
+	"""
+		Runs the shards that are not finished yet for the run (today by default) and returns the time of each one
+	"""
+	if processes is None:
+		processes = getattr(settings, 'JOB_PROCESSES', 1)
+
+	if run is None:
+		run = job.get_run()
+
+	finished = set(JobShard.objects.filter(job = job.code, run = run, finished__isnull = False).values_list('shard', flat = True))
+	shards = [shard for shard in job.get_shards() if not str(shard) in finished]
+
+	if processes > 1 and len(shards) > 1:
+		job_path = job.__class__.__module__ + '.' + job.__class__.__name__
+
+		#Forked workers must open their own database connections
+		connections.close_all()
+
+		with multiprocessing.Pool(processes) as pool:
+			timings = pool.map(_pool_run_shard, [(job_path, run, shard) for shard in shards])
+	else:
+		timings = [run_shard(job, run, shard) for shard in shards]
+
+	timings = [(shard, duration) for shard, duration in timings if not duration is None]
+
+	job.finish(timings)
+
+	return timings
+
+def timings_report(job, timings):
+	lines = ["%s: %d shards" % (job.code, len(timings))]
+
+	for shard, duration in timings:
+		lines.append("%s: %.2fs" % (shard, duration))
+
+	return "\n".join(lines)
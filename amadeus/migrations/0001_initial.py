@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 14:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=100, verbose_name='Job')),
+                ('run', models.CharField(max_length=50, verbose_name='Run')),
+                ('shard', models.CharField(max_length=100, verbose_name='Shard')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='Started')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Finished')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='Duration (seconds)')),
+            ],
+            options={
+                'verbose_name': 'Job shard',
+                'verbose_name_plural': 'Job shards',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobshard',
+            unique_together=set([('job', 'run', 'shard')]),
+        ),
+    ]
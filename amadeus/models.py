@@ -0,0 +1,35 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+class JobShard(models.Model):
+	"""
+		Checkpoint of one shard of a batch job run (see amadeus.jobs)
+	"""
+	job = models.CharField(_('Job'), max_length = 100)
+	run = models.CharField(_('Run'), max_length = 50)
+	shard = models.CharField(_('Shard'), max_length = 100)
+	started = models.DateTimeField(_('Started'), null = True, blank = True)
+	finished = models.DateTimeField(_('Finished'), null = True, blank = True)
+	duration = models.FloatField(_('Duration (seconds)'), null = True, blank = True)
+
+	class Meta:
+		verbose_name = _('Job shard')
+		verbose_name_plural = _('Job shards')
+		unique_together = (('job', 'run', 'shard'),)
+
+	def __str__(self):
+		return self.job + ' / ' + self.run + ' / ' + self.shard
@@ -12,10 +12,92 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 
 # File used to store functions to handle permissions
 
+from django.db.models import Q
+from django.utils.functional import cached_property
+
 from categories.models import Category
 from subjects.models import Subject
 from topics.models import Resource
 
+"""
+	Class to store the role sets of a user, each set is loaded with one query the first time a check needs it.
+	The roles are kept on the user object (see get_roles), so the checks of a request share them
+"""
+class UserRoles(object):
+	def __init__(self, user):
+		#Anonymous users have no id and no roles, filtering by a None id would look for rows without users
+		self.user_id = user.id if user else None
+		self.is_staff = bool(user and user.is_staff)
+
+	@cached_property
+	def coordinated_categories(self):
+		if self.user_id is None:
+			return set()
+
+		return set(Category.objects.filter(coordinators__id = self.user_id).values_list('id', flat = True))
+
+	@cached_property
+	def managed_subjects(self):
+		#Subjects the user teaches or whose category the user coordinates
+		if self.user_id is None:
+			return set()
+
+		return set(Subject.objects.filter(Q(professor__id = self.user_id) | Q(category__coordinators__id = self.user_id)).values_list('id', flat = True))
+
+	@cached_property
+	def enrolled_subjects(self):
+		if self.user_id is None:
+			return set()
+
+		return set(Subject.objects.filter(students__id = self.user_id).values_list('id', flat = True))
+
+	@cached_property
+	def student_categories(self):
+		if self.user_id is None:
+			return set()
+
+		return set(Subject.objects.filter(students__id = self.user_id).values_list('category__slug', flat = True))
+
+	@cached_property
+	def resources(self):
+		#Resources the user was added to, directly or through a group
+		if self.user_id is None:
+			return set()
+
+		return set(Resource.objects.filter(Q(students__id = self.user_id) | Q(groups__participants__id = self.user_id)).values_list('id', flat = True))
+
+	def manages_subject(self, subject_id):
+		return self.is_staff or subject_id in self.managed_subjects
+
+	def can_access_resource(self, resource, topic):
+		if self.manages_subject(topic.subject_id):
+			return True
+
+		if resource.visible or topic.repository:
+			if resource.all_students and topic.subject_id in self.enrolled_subjects:
+				return True
+
+			if resource.id in self.resources:
+				return True
+
+		return False
+
+def get_roles(user):
+	if user is None:
+		return UserRoles(None)
+
+	if not hasattr(user, '_roles'):
+		user._roles = UserRoles(user)
+
+	return user._roles
+
+"""
+	Function to forget the roles loaded for the user, used after changing its memberships in the same request
+"""
+def clear_roles(user):
+	if hasattr(user, '_roles'):
+		del user._roles
+
 """
 	Function to know if a user has permission to:
 		- Edit Category
@@ -24,10 +106,12 @@ from topics.models import Resource
 		- Replicate Subject
 """
 def has_category_permissions(user, category):
-	if user.is_staff:
+	roles = get_roles(user)
+
+	if roles.is_staff:
 		return True
 
-	if category and category.coordinators.filter(id = user.id).exists():
+	if category and category.id in roles.coordinated_categories:
 		return True
 
 	return False
@@ -39,16 +123,7 @@ def has_category_permissions(user, category):
 		- Create Topic inside Subject 
 """
 def has_subject_permissions(user, subject):
-	if user and user.is_staff:
-		return True
-
-	if subject.professor and subject.professor.filter(id = user.id).exists():
-		return True
-
-	if subject.category and subject.category.coordinators.filter(id = user.id).exists():
-		return True
-
-	return False
+	return get_roles(user).manages_subject(subject.id)
 
 """
 	Function to know if user has permission to:
@@ -58,7 +133,7 @@ def has_subject_view_permissions(user, subject):
 	if has_subject_permissions(user, subject):
 		return True
 
-	if subject and subject.students.filter(id = user.id).exists():
+	if subject and subject.id in get_roles(user).enrolled_subjects:
 		return True
 
 	return False
@@ -67,31 +142,20 @@ def has_subject_view_permissions(user, subject):
 	Function to know if user is student of some subject in category
 """
 def has_category_permission(user, cat_slug):
-	exist = Subject.objects.filter(students__id = user.id, category__slug = cat_slug).exists()
-
-	return exist
+	return cat_slug in get_roles(user).student_categories
 
 """
 	Function to know if user has permission to:
 		- Access Resource
 """
 def has_resource_permissions(user, resource):
-	if has_subject_permissions(user, resource.topic.subject):
-		return True
-
-	if resource.visible or resource.topic.repository:
-		if resource.all_students:
-			if resource.topic.subject.students.filter(id = user.id).exists():
-				return True
-
-		if resource.students.filter(id = user.id).exists():
-			return True
-
-		if Resource.objects.filter(id = resource.id, groups__participants__pk = user.pk).exists():
-			return True
-
-	return False
-
-
+	return get_roles(user).can_access_resource(resource, resource.topic)
 
+"""
+	Function to get, from a list of resources, the ones the user can access. Load the resources with
+	select_related('topic') to check them without extra queries
+"""
+def get_accessible_resources(user, resources):
+	roles = get_roles(user)
 
+	return [resource for resource in resources if roles.can_access_resource(resource, resource.topic)]
@@ -11,9 +11,10 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 from channels.routing import route
-from mural.consumers import ws_add, ws_message
+from mural.consumers import ws_add, ws_message, ws_disconnect
 
 channel_routing = [
 	route("websocket.connect", ws_add),
     route("websocket.receive", ws_message),
+    route("websocket.disconnect", ws_disconnect),
 ]
\ No newline at end of file
@@ -11,6 +11,7 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 import os
+import sys
 
 import dj_database_url
 
@@ -142,8 +143,64 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
         "LOCATION": os.path.join(BASE_DIR, 'data/cache/resubmit'),
     },
+    # Shared by every process (see users.presence and amadeus.counters), its entries must not be culled
+    "presence": {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        "LOCATION": os.path.join(BASE_DIR, 'data/cache/presence'),
+        "OPTIONS": {
+            "MAX_ENTRIES": 100000,
+            "CULL_FREQUENCY": 10,
+        },
+    },
+    # cache.incr of the file cache rewrites the entry with the default timeout, keep it as COUNTERS_TIMEOUT
+    "counters": {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        "LOCATION": os.path.join(BASE_DIR, 'data/cache/counters'),
+        "TIMEOUT": 600,
+        "OPTIONS": {
+            "MAX_ENTRIES": 100000,
+            "CULL_FREQUENCY": 10,
+        },
+    },
+    "statistics": {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        "LOCATION": os.path.join(BASE_DIR, 'data/cache/statistics'),
+    },
+    "topics": {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        "LOCATION": os.path.join(BASE_DIR, 'data/cache/topics'),
+    },
 }
 
+# Redis cache shared by every process when REDIS_URL is set, as the channel layer below
+if os.environ.get('REDIS_URL'):
+    CACHES["presence"] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        "LOCATION": os.environ['REDIS_URL'],
+    }
+    # cache.incr is atomic there, so concurrent increments of the unread counters are not lost
+    CACHES["counters"] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        "LOCATION": os.environ['REDIS_URL'],
+        "TIMEOUT": 600,
+    }
+
+PRESENCE_CACHE = "presence"
+PRESENCE_TOUCH_INTERVAL = 60 # seconds between last seen updates of a user
+
+# Unread counters (see amadeus.counters)
+COUNTERS_CACHE = "counters"
+COUNTERS_TIMEOUT = 600 # seconds, bounds the drift of counters of deleted posts and messages
+
+# Resources statistics (see topics.statistics and log.resources)
+STATISTICS_CACHE = "statistics"
+STATISTICS_TIMEOUT = 3600 # seconds, bounds the time archived logs stay in the statistics
+DASHBOARDS_TIMEOUT = 300 # seconds, the subject dashboards metrics of the week are kept in the statistics cache
+
+# Subject page topics list (see topics.tree and topics.versions)
+TOPICS_CACHE = "topics"
+TOPICS_TIMEOUT = 3600 # seconds a rendered list stays in the cache, changing a topic or resource makes its subject ones stale at once
+
 WSGI_APPLICATION = 'amadeus.wsgi.application'
 
 SESSION_SECURITY_WARN_AFTER = 1140
@@ -217,18 +274,64 @@ CRON_CLASSES = [
     'goals.cron.SetGoals'
 ]
 
+# Processes used by the sharded batch jobs (see amadeus.jobs)
+JOB_PROCESSES = 4
+
 CRONJOBS = [
     ('0 5 * * *', 'notifications.cron.notification_cron'),
-    ('0 0 * * *', 'goals.cron.setgoals_cron')
+    ('0 0 * * *', 'goals.cron.setgoals_cron'),
+    ('30 0 * * *', 'analytics.cron.rollup_cron'),
+    ('0 2 * * *', 'log.cron.partition_cron'),
+    ('0 3 1 * *', 'log.cron.archive_cron'),
+    ('* * * * *', 'api.cron.push_cron'),
+    ('* * * * *', 'mural.cron.fanout_cron'),
+    ('* * * * *', 'reports.cron.report_cron'),
+    ('*/15 * * * *', 'questionary.cron.pregenerate_cron')
 ]
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "asgiref.inmemory.ChannelLayer",
-        "ROUTING": "amadeus.routing.channel_routing",
+# The cron jobs log the time of each shard they run (see amadeus.jobs.timings_report), crontab keeps their output
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'notifications.cron': {'handlers': ['console'], 'level': 'INFO'},
+        'goals.cron': {'handlers': ['console'], 'level': 'INFO'},
+        'questionary.cron': {'handlers': ['console'], 'level': 'INFO'},
     },
 }
 
+# Attempts of the students created ahead of the questionaries begin date (see questionary.utils)
+QUESTIONARY_PREGENERATE_AHEAD = 24 # hours before the begin date
+QUESTIONARY_PREGENERATE_BATCH = 200 # students whose attempts are inserted together
+QUESTIONARY_PREGENERATE_INTERVAL = 15 # minutes, as in its crontab line
+
+# Redis layer shared by every daphne and worker process, set REDIS_URL (e.g. redis://localhost:6379/0) to use it.
+# Without it the in-memory layer is used, which only reaches clients connected to the same process (development and tests)
+if os.environ.get('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "asgi_redis.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [os.environ['REDIS_URL']],
+                "capacity": 1000,
+                "group_expiry": 86400,
+            },
+            "ROUTING": "amadeus.routing.channel_routing",
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "asgiref.inmemory.ChannelLayer",
+            "ROUTING": "amadeus.routing.channel_routing",
+        },
+    }
+
 FCM_DJANGO_SETTINGS = {
     "FCM_SERVER_KEY": "AAAA8UuwSms:APA91bHZyLpw5rnaZtzGT12_yPD0NwVlBX2fD_CJgR_cRvKmxeg9gKd8Y281JkSAFYwMYyruY1O3qjIMEIiByeEAZRxZz9gJKbbxGDR86fMTrv2Yfu83aD6JUZKqBsR-xX5G8CM7LQ5C",
     # true if you want to have only one active device per registered user at a time
@@ -262,6 +365,32 @@ AUTHENTICATION_BACKENDS = [
 ROLEPERMISSIONS_MODULE = 'amadeus.roles'
 
 LOGS_URL = 'logs/'
+
+# Buffered log writes (see log.sink), off on 'manage.py test' because the flush thread writes with its own
+# connection, outside of the test transactions
+LOG_BUFFER_ENABLED = not (len(sys.argv) > 1 and sys.argv[1] == 'test')
+LOG_BUFFER_SIZE = 200 # rows per bulk insert
+LOG_FLUSH_INTERVAL = 5 # seconds
+
+# Log retention (see log.partitions and log.archive)
+LOG_RETENTION_SEMESTERS = None # semesters kept on the database, logs are only archived when set
+LOG_ARCHIVE_DIR = 'log_archive' # inside MEDIA_ROOT
+
+# Push notification outbox (see api.push)
+PUSH_BACKEND = 'api.push.FCMBackend'
+PUSH_BATCH_SIZE = 500 # devices per FCM multicast request
+PUSH_MAX_ATTEMPTS = 5
+PUSH_RETRY_DELAY = 30 # seconds, doubled on each attempt
+PUSH_POLL_INTERVAL = 2 # seconds between push_worker rounds
+PUSH_CLAIM_TIMEOUT = 300 # seconds before a push claimed by a worker that stopped is sent again
+
+# Mural fan-out (see mural.fanout)
+MURAL_FANOUT_BATCH_SIZE = 500 # users per batch
+MURAL_FANOUT_POLL_INTERVAL = 1 # seconds between mural_worker rounds
+
+# Interaction reports (see reports.builder)
+REPORT_POLL_INTERVAL = 2 # seconds between report_worker rounds
+REPORT_TIMEOUT = 1800 # seconds before a report left running by a stopped worker is built again
 #https://github.com/squ1b3r/Djaneiro
 
 
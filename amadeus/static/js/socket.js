@@ -22,6 +22,11 @@ socket = new WebSocket(ws_scheme + "://" + window.location.host + "/");
 socket.onmessage = function(e) {
 	content = JSON.parse(e.data);
 
+	// Group messages also reach the user that made the change
+	if (content.sender && content.sender == socket_user) {
+		return;
+	}
+
 	if (content.type == "mural") {
 		if (content.subtype == "post") {
 			muralNotificationPost(content);
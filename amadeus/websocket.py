@@ -0,0 +1,72 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# File used to store the websocket groups a connection joins, so one change can be sent with a single group send
+
+from django.db.models import Q
+
+from channels import Group
+
+from categories.models import Category
+from subjects.models import Subject
+
+#Staff users receive the posts of every category and subject
+STAFF_GROUP = "mural-staff"
+GENERAL_GROUP = "mural-general"
+
+def user_group(user_id):
+	return "user-%s" % user_id
+
+def category_group(category_id):
+	return "mural-category-%s" % category_id
+
+def subject_group(subject_id):
+	return "mural-subject-%s" % subject_id
+
+"""
+	Function to get the groups a connected user must join:
+		- its own group
+		- the general mural group
+		- the staff group or the groups of the categories and subjects it coordinates, teaches or studies
+"""
+def get_user_groups(user):
+	groups = [user_group(user.id), GENERAL_GROUP]
+
+	if user.is_staff:
+		groups.append(STAFF_GROUP)
+	else:
+		categories = Category.objects.filter(Q(coordinators = user) | Q(subject_category__professor = user) | Q(subject_category__students = user)).distinct().values_list('id', flat = True)
+		subjects = Subject.objects.filter(Q(professor = user) | Q(students = user) | Q(category__coordinators = user)).distinct().values_list('id', flat = True)
+
+		groups.extend(category_group(category) for category in categories)
+		groups.extend(subject_group(subject) for subject in subjects)
+
+	return groups
+
+"""
+	Function to get the groups that reach every user of a mural space, None when the space receivers can't be
+	described by groups (posts of a resource are restricted to the resource students)
+"""
+def get_space_groups(space_type, space, resource = None):
+	if space_type == "generalpost":
+		return [GENERAL_GROUP]
+	elif space_type == "categorypost":
+		return [category_group(space), STAFF_GROUP]
+	elif space_type == "subjectpost" and not resource:
+		return [subject_group(space), STAFF_GROUP]
+
+	return None
+
+def send_to_groups(groups, text):
+	for group in groups:
+		Group(group).send({'text': text})
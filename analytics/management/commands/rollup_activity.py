@@ -0,0 +1,37 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.utils import rollup_pending
+
+class Command(BaseCommand):
+    help = "Summarizes the logs of the finished days on the daily activity table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help = "First day (YYYY-MM-DD) to summarize again, defaults to the day after the last summarized one")
+
+    def handle(self, *args, **options):
+        since = None
+
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("Invalid date %s, use YYYY-MM-DD" % options['since'])
+
+        days = rollup_pending(since)
+
+        self.stdout.write(self.style.SUCCESS("%d days summarized" % len(days)))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 13:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True, verbose_name='Date')),
+                ('user_id', models.IntegerField(verbose_name='Actor id')),
+                ('component', models.TextField(verbose_name='Component (Module / App)')),
+                ('resource', models.TextField(verbose_name='Resource')),
+                ('action', models.TextField(verbose_name='Action')),
+                ('subject_id', models.IntegerField(blank=True, null=True, verbose_name='Subject id')),
+                ('category_id', models.IntegerField(blank=True, null=True, verbose_name='Category id')),
+                ('count', models.IntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Daily activity',
+                'verbose_name_plural': 'Daily activities',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='dailyactivity',
+            index_together=set([('date', 'category_id'), ('resource', 'date')]),
+        ),
+    ]
@@ -10,6 +10,31 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+class DailyActivity(models.Model):
+	"""
+		Number of logs of a day grouped by user, component, resource, action, subject and category.
+		Filled by analytics.utils.rollup_day, so the analytics endpoints don't need to scan the log table.
+	"""
+	date = models.DateField(_('Date'), db_index = True)
+	user_id = models.IntegerField(_('Actor id'))
+	component = models.TextField(_('Component (Module / App)'))
+	resource = models.TextField(_('Resource'))
+	action = models.TextField(_('Action'))
+	subject_id = models.IntegerField(_('Subject id'), null = True, blank = True)
+	category_id = models.IntegerField(_('Category id'), null = True, blank = True)
+	count = models.IntegerField(_('Count'), default = 0)
+
+	class Meta:
+		verbose_name = _('Daily activity')
+		verbose_name_plural = _('Daily activities')
+		index_together = [
+			['date', 'category_id'],
+			['resource', 'date'],
+		]
 
-# Create your models here.
+	def __str__(self):
+		return str(self.date) + ' / ' + str(self.user_id)
@@ -0,0 +1,57 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from log.models import Log
+from ..models import DailyActivity
+from ..utils import rollup_day, rollup_month, count_per_day, count_per_field
+
+class RollupTest(TestCase):
+
+    def new_log(self, when, user_id, subject_id):
+        return Log.objects.create(component = "subject", action = "view", resource = "subject", user = "tester", user_id = user_id, user_email = "tester@amadeus.br", context = {'subject_id': subject_id}, datetime = when)
+
+    def test_rollup_and_live_counts(self):
+        now = timezone.now()
+        yesterday = timezone.localtime(now).date() - timedelta(days = 1)
+
+        self.new_log(now - timedelta(days = 1), 1, 10)
+        self.new_log(now - timedelta(days = 1), 1, 10)
+        self.new_log(now - timedelta(days = 1), 2, 11)
+
+        self.assertEqual(rollup_day(yesterday), 2)
+        self.assertEqual(DailyActivity.objects.get(user_id = 1).count, 2)
+
+        #today is not summarized yet and comes from the log table
+        self.new_log(now, 2, 10)
+
+        today = timezone.localtime(now).date()
+
+        self.assertEqual(list(count_per_day([yesterday, today]).values()), [3, 1])
+        self.assertEqual(count_per_field('subject_id', resource = 'subject'), {10: 3, 11: 1})
+
+    def test_rollup_month(self):
+        self.new_log(timezone.make_aware(datetime(2015, 3, 2, 12)), 1, 10)
+
+        self.assertEqual(rollup_day(date(2015, 3, 2)), 1)
+
+        #Logs loaded back into the table (see log.archive.restore_month) are summarized again with their month
+        self.new_log(timezone.make_aware(datetime(2015, 3, 2, 13)), 1, 10)
+        self.new_log(timezone.make_aware(datetime(2015, 3, 31, 13)), 2, 10)
+
+        self.assertEqual(len(rollup_month(date(2015, 3, 1))), 31)
+        self.assertEqual(count_per_field('user_id', subject_id = 10), {1: 2, 2: 1})
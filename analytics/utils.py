@@ -0,0 +1,138 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+from datetime import datetime, time, timedelta
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from log.models import Log
+
+from .models import DailyActivity
+
+ROLLUP_FIELDS = ['user_id', 'component', 'resource', 'action', 'subject_id', 'category_id']
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+def rolled_until():
+    """
+        Last day already summarized on DailyActivity, the days after it are counted from the log table
+    """
+    return DailyActivity.objects.aggregate(last = Max('date'))['last']
+
+def live_logs(last):
+    if last is None:
+        return Log.objects.all()
+
+    return Log.objects.filter(datetime__gte = day_start(last + timedelta(days = 1)))
+
+def rollup_day(day):
+    logs = Log.objects.filter(datetime__gte = day_start(day), datetime__lt = day_start(day + timedelta(days = 1)))
+    rows = logs.values(*ROLLUP_FIELDS).annotate(count = Count('id')).order_by()
+
+    activities = [DailyActivity(date = day, count = row['count'], **{field: row[field] for field in ROLLUP_FIELDS}) for row in rows]
+
+    with transaction.atomic():
+        DailyActivity.objects.filter(date = day).delete()
+        DailyActivity.objects.bulk_create(activities, batch_size = 1000)
+
+    return len(activities)
+
+def rollup_pending(since = None):
+    """
+        Summarizes every finished day after the last one on DailyActivity, or after since when given
+    """
+    if since is None:
+        last = rolled_until()
+
+        if last is None:
+            first = Log.objects.aggregate(first = Min('datetime'))['first']
+
+            if first is None:
+                return []
+
+            since = timezone.localtime(first).date()
+        else:
+            since = last + timedelta(days = 1)
+
+    yesterday = timezone.localtime(timezone.now()).date() - timedelta(days = 1)
+    days = []
+
+    while since <= yesterday:
+        rollup_day(since)
+        days.append(since)
+
+        since = since + timedelta(days = 1)
+
+    return days
+
+def rollup_month(month):
+    """
+        Summarizes again the finished days of the month (its first day), used after its logs are restored from the archive
+    """
+    yesterday = timezone.localtime(timezone.now()).date() - timedelta(days = 1)
+    day = month
+    days = []
+
+    while day.month == month.month and day <= yesterday:
+        rollup_day(day)
+        days.append(day)
+
+        day = day + timedelta(days = 1)
+
+    return days
+
+def count_per_day(days, **filters):
+    days = [day.date() if isinstance(day, datetime) else day for day in days]
+    data = OrderedDict([(day, 0) for day in days])
+
+    if not days:
+        return data
+
+    last = rolled_until()
+    rolled = [day for day in days if not last is None and day <= last]
+    live = [day for day in days if last is None or day > last]
+
+    if rolled:
+        for row in DailyActivity.objects.filter(date__in = rolled, **filters).values('date').annotate(total = Sum('count')).order_by():
+            data[row['date']] = row['total']
+
+    if live:
+        logs = Log.objects.filter(datetime__gte = day_start(min(live)), datetime__lt = day_start(max(live) + timedelta(days = 1)), **filters)
+
+        for row in logs.annotate(day = TruncDate('datetime')).values('day').annotate(total = Count('id')).order_by():
+            if row['day'] in live:
+                data[row['day']] = row['total']
+
+    return data
+
+def count_per_field(field, **filters):
+    """
+        Number of logs for each value of field (e.g. subject_id, user_id) among the logs matching filters
+    """
+    last = rolled_until()
+    counts = {}
+
+    filters[field + '__isnull'] = False
+
+    for row in DailyActivity.objects.filter(**filters).values(field).annotate(total = Sum('count')).order_by():
+        counts[row[field]] = row['total']
+
+    for row in live_logs(last).filter(**filters).values(field).annotate(total = Count('id')).order_by():
+        counts[row[field]] = counts.get(row[field], 0) + row['total']
+
+    return counts
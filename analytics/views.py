@@ -13,25 +13,25 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 from django.shortcuts import render
 
 from django.views import generic
-from django.db.models import Count
 from django.core.urlresolvers import reverse_lazy
 
 from subjects.models import Tag, Subject
+from categories.models import Category
 from topics.models import Resource, Topic
 from users.models import User
 from django.http import HttpResponse, JsonResponse
-from log.models import Log
 import operator
 from django.utils.translation import ugettext_lazy as _
 from django.shortcuts import render, get_object_or_404, redirect
 
 from datetime import date, timedelta, datetime
 import calendar
-from collections import OrderedDict
 
 
 from mural.models import Comment,Mural
 
+from .utils import count_per_day, count_per_field
+
 
 def most_used_tags(request):
    
@@ -85,18 +85,12 @@ def most_active_users_in_a_month(request):
 
 
 def activity_in_timestamp(days, **kwargs):
-    data = OrderedDict()
-
     params = kwargs.get('params')
-    for day in days:
-        if params.get('category_id'):
-            category_id = params['category_id']
-            day_count = Log.objects.filter(datetime__date = day, context__contains = {"category_id" : int(category_id)}).count()
-        else:
-            day_count = Log.objects.filter(datetime__date = day).count()
-        data[day] = day_count
 
-    return data
+    if params.get('category_id'):
+        return count_per_day(days, category_id = int(params['category_id']))
+
+    return count_per_day(days)
 
 
 
@@ -130,16 +124,15 @@ def most_accessed_subjects(request):
     return JsonResponse(subjects, safe=False)
 
 def get_log_count_of_resource(resource = ''):
+    models = {'subject': Subject, 'category': Category}
+
+    counts = count_per_field(resource + '_id', resource = resource)
+    names = dict(models[resource].objects.filter(id__in = counts.keys()).values_list('id', 'name'))
 
-    data = Log.objects.filter(resource = resource)
     items = {}
-    for datum in data:
-        if datum.context:
-            item_id = datum.context[resource + '_id']
-            if item_id in items.keys():
-                items[item_id]['count'] = items[item_id]['count'] + 1
-            else:
-                items[item_id] = {'name': datum.context[resource+'_name'], 'count': 1}
+    for item_id, count in counts.items():
+        if item_id in names:
+            items[item_id] = {'name': names[item_id], 'count': count}
     return items
 
 def most_accessed_categories(request):
@@ -186,10 +179,12 @@ def most_accessed_resource_kind(request):
     return JsonResponse(data, safe=False)
 
 def most_active_users(request):
-    fifty_users = Log.objects.values('user_id').annotate(count = Count('user_id')).order_by('-count')[:50]
-    fifty_users = list(fifty_users)
+    counts = count_per_field('user_id')
+    fifty_users = [{'user_id': user_id, 'count': count} for user_id, count in sorted(counts.items(), key = lambda x: x[1], reverse = True)[:50]]
+    users = User.objects.in_bulk([user['user_id'] for user in fifty_users])
+    fifty_users = [user for user in fifty_users if user['user_id'] in users]
     for user in fifty_users:
-        user_object = User.objects.get(id=user['user_id'])
+        user_object = users[user['user_id']]
         user['image'] = user_object.image_url
         user['user'] = user_object.social_name
     return JsonResponse(fifty_users, safe=False)
@@ -0,0 +1,46 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.push import dispatch_pending
+
+class Command(BaseCommand):
+	help = "Sends the queued push notifications in multicast batches, retrying the failed ones"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--once', action = 'store_true', help = "Send what is due and exit")
+		parser.add_argument('--limit', type = int, default = 5000, help = "Maximum pushes taken on each round")
+
+	def handle(self, *args, **options):
+		interval = getattr(settings, 'PUSH_POLL_INTERVAL', 2)
+
+		while True:
+			close_old_connections()
+
+			sent = dispatch_pending(options['limit'])
+
+			if options['once']:
+				self.stdout.write("Sent %d pushes" % sent)
+
+				break
+
+			#A full round means there is more waiting, so only sleep when the outbox is drained
+			if sent < options['limit']:
+				time.sleep(interval)
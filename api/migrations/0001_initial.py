@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 15:00
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('fcm_django', '0003_auto_20170313_1314'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PushJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.TextField(blank=True, null=True, verbose_name='Title')),
+                ('body', models.TextField(blank=True, null=True, verbose_name='Body')),
+                ('data', django.contrib.postgres.fields.jsonb.JSONField(blank=True, null=True, verbose_name='Data')),
+                ('attempts', models.IntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Next attempt')),
+                ('create_date', models.DateTimeField(auto_now_add=True, verbose_name='Create Date')),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='push_jobs', to='fcm_django.FCMDevice', verbose_name='Device')),
+            ],
+            options={
+                'verbose_name': 'Push job',
+                'verbose_name_plural': 'Push jobs',
+            },
+        ),
+    ]
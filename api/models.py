@@ -10,6 +10,29 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+
 from django.db import models
+from django.contrib.postgres.fields import JSONField
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from fcm_django.models import FCMDevice
+
+class PushJob(models.Model):
+	"""
+		Push notification waiting to be sent to a device by the push worker (see api.push)
+	"""
+	device = models.ForeignKey(FCMDevice, verbose_name = _('Device'), related_name = 'push_jobs', on_delete = models.CASCADE)
+	title = models.TextField(_('Title'), blank = True, null = True)
+	body = models.TextField(_('Body'), blank = True, null = True)
+	data = JSONField(_('Data'), blank = True, null = True)
+	attempts = models.IntegerField(_('Attempts'), default = 0)
+	next_attempt = models.DateTimeField(_('Next attempt'), default = timezone.now, db_index = True)
+	create_date = models.DateTimeField(_('Create Date'), auto_now_add = True)
+
+	class Meta:
+		verbose_name = _('Push job')
+		verbose_name_plural = _('Push jobs')
 
-# Create your models here.
+	def __str__(self):
+		return str(self.device) + ' / ' + str(self.title)
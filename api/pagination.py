@@ -0,0 +1,98 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# Keyset (cursor) pagination used by the mobile endpoints that list messages, posts and comments
+
+import base64
+
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
+
+from mural.models import Comment, MuralFavorites
+from mural.utils import MOST_RECENT
+
+def encode_cursor(date, pk):
+	value = "%s|%s" % (date.isoformat(), pk)
+
+	return base64.urlsafe_b64encode(value.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+	"""
+		Returns the (date, id) pair of the cursor or None when it is empty or invalid, so the first page is listed
+	"""
+	if not cursor:
+		return None
+
+	try:
+		date, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+
+		date = parse_datetime(date)
+		pk = int(pk)
+	except (TypeError, ValueError, UnicodeError):
+		return None
+
+	if date is None:
+		return None
+
+	return date, pk
+
+def after_cursor(date_field):
+	"""
+		Builds the filter of the items listed after a cursor, for querysets ordered by date_field and id, both descending
+	"""
+	def after(queryset, date, pk):
+		return queryset.filter(Q(**{date_field + '__lt': date}) | Q(**{date_field: date, 'pk__lt': pk}))
+
+	return after
+
+def posts_after(queryset, date, pk):
+	#Subject posts are ordered by an extra select, it can only be compared in raw sql
+	return queryset.extra(where = ["(" + MOST_RECENT + ", mural_subjectpost.mural_ptr_id) < (%s, %s)"], params = [date, pk])
+
+def get_posts_context(user, posts):
+	"""
+		Serializer context with the comments totals and the favorite ids of a page of posts, loaded with two queries
+	"""
+	ids = [post.pk for post in posts]
+
+	comments = Comment.objects.filter(post__in = ids).values_list('post').annotate(total = Count('id')).order_by()
+	favorites = MuralFavorites.objects.filter(user = user, post__in = ids).values_list('post', flat = True)
+
+	return {"comments": dict(comments), "favorites": set(favorites)}
+
+def get_page(queryset, json_data, date_field, first_page = 0, after = None):
+	"""
+		Returns the items of a page and the cursor of the next one (None on the last page).
+		Clients that send a cursor get the items after it, the ones still sending a page number get that page,
+		in both cases with a single sliced query of one extra item to know if there is a next page
+	"""
+	size = int(json_data['page_size'])
+	cursor = decode_cursor(json_data.get('cursor', ''))
+
+	if cursor is None:
+		start = max(int(json_data.get('page', first_page)) - first_page, 0) * size
+	else:
+		if after is None:
+			after = after_cursor(date_field)
+
+		queryset = after(queryset, *cursor)
+		start = 0
+
+	items = list(queryset[start:start + size + 1])
+	next_cursor = None
+
+	if len(items) > size:
+		items = items[:size]
+		next_cursor = encode_cursor(getattr(items[-1], date_field), items[-1].pk)
+
+	return items, next_cursor
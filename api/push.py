@@ -0,0 +1,181 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+import json
+import logging
+from datetime import timedelta
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from fcm_django.models import FCMDevice
+
+from .models import PushJob
+
+logger = logging.getLogger(__name__)
+
+#FCM errors that are worth retrying, any other error means the registration id is not valid anymore
+RETRY_ERRORS = ['Unavailable', 'InternalServerError', 'DeviceMessageRateExceeded']
+
+class FCMBackend(object):
+	"""
+		Sends one payload to many devices with a single FCM multicast request
+	"""
+	def send(self, registration_ids, title = None, body = None, data = None):
+		from fcm_django.fcm import fcm_send_bulk_message
+
+		result = fcm_send_bulk_message(registration_ids = registration_ids, title = title, body = body, data = data)
+
+		responses = result if type(result) == list else [result]
+		results = []
+
+		for response in responses:
+			results.extend(response['results'])
+
+		return results
+
+class FakeBackend(object):
+	"""
+		Keeps the pushes in memory instead of sending them, used on tests and development
+	"""
+	sent = []
+	errors = {}
+
+	def send(self, registration_ids, title = None, body = None, data = None):
+		results = []
+
+		for registration_id in registration_ids:
+			if registration_id in self.errors:
+				results.append({'error': self.errors[registration_id]})
+			else:
+				self.sent.append({'registration_id': registration_id, 'title': title, 'body': body, 'data': data})
+				results.append({'message_id': str(len(self.sent))})
+
+		return results
+
+def get_backend():
+	return import_string(getattr(settings, 'PUSH_BACKEND', 'api.push.FCMBackend'))()
+
+def queue_push(users, title = None, body = None, data = None):
+	"""
+		Queues the push for every active device of the given users (or user ids) with one query and one insert
+	"""
+	user_ids = [user if type(user) == int else user.id for user in users]
+
+	if not user_ids:
+		return 0
+
+	devices = FCMDevice.objects.filter(user_id__in = user_ids, active = True).values_list('id', flat = True)
+
+	jobs = [PushJob(device_id = device_id, title = title, body = body, data = data) for device_id in devices]
+
+	PushJob.objects.bulk_create(jobs, batch_size = 1000)
+
+	return len(jobs)
+
+def queue_user_pushes(pushes):
+	"""
+		Queues a different push per user, pushes maps user ids to (title, body, data)
+	"""
+	devices = FCMDevice.objects.filter(user_id__in = list(pushes.keys()), active = True).values_list('id', 'user_id')
+
+	jobs = [PushJob(device_id = device_id, title = pushes[user_id][0], body = pushes[user_id][1], data = pushes[user_id][2]) for device_id, user_id in devices]
+
+	PushJob.objects.bulk_create(jobs, batch_size = 1000)
+
+	return len(jobs)
+
+def retry_delay(attempts):
+	return timedelta(seconds = getattr(settings, 'PUSH_RETRY_DELAY', 30) * (2 ** (attempts - 1)))
+
+def send_batch(backend, jobs, devices):
+	job = jobs[0]
+	registration_ids = [devices[job.device_id].registration_id for job in jobs]
+
+	try:
+		results = backend.send(registration_ids, title = job.title, body = job.body, data = job.data)
+	except Exception:
+		logger.exception("Push batch of %d devices failed", len(jobs))
+
+		results = [{'error': 'Unavailable'}] * len(jobs)
+
+	sent, retry, invalid = [], [], []
+
+	for job, result in zip(jobs, results):
+		if not 'error' in result:
+			sent.append(job.id)
+		elif result['error'] in RETRY_ERRORS:
+			retry.append(job)
+		else:
+			invalid.append(job.device_id)
+
+	max_attempts = getattr(settings, 'PUSH_MAX_ATTEMPTS', 5)
+
+	PushJob.objects.filter(id__in = sent).delete()
+
+	FCMDevice.objects.filter(id__in = invalid).update(active = False)
+	PushJob.objects.filter(device_id__in = invalid).delete()
+
+	for job in retry:
+		job.attempts += 1
+
+		if job.attempts >= max_attempts:
+			job.delete()
+		else:
+			job.next_attempt = timezone.now() + retry_delay(job.attempts)
+			job.save(update_fields = ['attempts', 'next_attempt'])
+
+	return len(sent)
+
+def claim_pending(limit):
+	"""
+		Claims due pushes by moving their next attempt PUSH_CLAIM_TIMEOUT seconds ahead, so no other worker takes them
+		while they are sent and a worker that dies leaves them to be retried
+	"""
+	now = timezone.now()
+	lease = timedelta(seconds = getattr(settings, 'PUSH_CLAIM_TIMEOUT', 300))
+
+	with transaction.atomic():
+		#Locked rows are skipped, so many workers can run at the same time
+		jobs = list(PushJob.objects.raw("UPDATE api_pushjob SET next_attempt = %s WHERE id IN (SELECT id FROM api_pushjob WHERE next_attempt <= %s ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED) RETURNING *", [now + lease, now, limit]))
+
+	return sorted(jobs, key = lambda job: job.id)
+
+def dispatch_pending(limit = 5000):
+	"""
+		Sends the due pushes, grouping the ones with the same payload in multicast batches.
+		The requests to FCM are made after the claim is committed, no transaction is kept open while they run
+	"""
+	backend = get_backend()
+	batch_size = getattr(settings, 'PUSH_BATCH_SIZE', 500)
+
+	jobs = claim_pending(limit)
+	devices = FCMDevice.objects.in_bulk([job.device_id for job in jobs])
+
+	payloads = OrderedDict()
+
+	for job in jobs:
+		key = json.dumps([job.title, job.body, job.data], sort_keys = True)
+
+		payloads.setdefault(key, []).append(job)
+
+	sent = 0
+
+	for group in payloads.values():
+		for i in range(0, len(group), batch_size):
+			sent += send_batch(backend, group[i:i + batch_size], devices)
+
+	return sent
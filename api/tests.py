@@ -10,6 +10,89 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-from django.test import TestCase
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from fcm_django.models import FCMDevice
+
+from chat.models import Conversation, TalkMessages
+from users.models import User
+
+from .models import PushJob
+from .pagination import get_page
+from .push import FakeBackend, claim_pending, queue_push, dispatch_pending
+
+@override_settings(PUSH_BACKEND = 'api.push.FakeBackend', PUSH_BATCH_SIZE = 2)
+class PushDispatchTest(TestCase):
+
+	def setUp(self):
+		FakeBackend.sent = []
+		FakeBackend.errors = {}
+
+		self.users = [User.objects.create(username = "push%d" % i, email = "push%d@amadeus.br" % i) for i in range(3)]
+
+		for user in self.users:
+			FCMDevice.objects.create(user = user, registration_id = "token-%s" % user.id, type = "android")
+
+	def test_multicast_batches(self):
+		self.assertEqual(queue_push(self.users, data = {"type": "mural"}), 3)
+
+		self.assertEqual(dispatch_pending(), 3)
+		self.assertEqual(len(FakeBackend.sent), 3)
+		self.assertEqual(PushJob.objects.count(), 0)
+
+	def test_failures(self):
+		FakeBackend.errors = {"token-%s" % self.users[0].id: 'NotRegistered', "token-%s" % self.users[1].id: 'Unavailable'}
+
+		queue_push(self.users, data = {"type": "mural"})
+
+		self.assertEqual(dispatch_pending(), 1)
+		self.assertFalse(FCMDevice.objects.get(user = self.users[0]).active)
+
+		retry = PushJob.objects.get()
+
+		self.assertEqual(retry.device.user, self.users[1])
+		self.assertEqual(retry.attempts, 1)
+
+		#Not due yet
+		self.assertEqual(dispatch_pending(), 0)
+
+	def test_claimed(self):
+		queue_push(self.users, data = {"type": "mural"})
+
+		#Pushes claimed by a worker that stopped are only sent again once the claim expires
+		self.assertEqual(len(claim_pending(2)), 2)
+		self.assertEqual(dispatch_pending(), 1)
+		self.assertEqual(PushJob.objects.count(), 2)
+
+class KeysetPaginationTest(TestCase):
+
+	def setUp(self):
+		self.user = User.objects.create(username = "pager", email = "pager@amadeus.br")
+		talk = Conversation.objects.create(user_one = self.user, user_two = self.user)
+
+		for i in range(5):
+			TalkMessages.objects.create(text = "msg %d" % i, talk = talk, user = self.user)
+
+		self.messages = TalkMessages.objects.filter(talk = talk).order_by('-create_date', '-id')
+
+	def test_cursor_pages(self):
+		listed = []
+		cursor = ""
+
+		while True:
+			with self.assertNumQueries(1):
+				page, cursor = get_page(self.messages, {"page_size": 2, "cursor": cursor}, 'create_date')
+
+			listed.extend(page)
+
+			if cursor is None:
+				break
+
+		self.assertEqual([message.id for message in listed], [message.id for message in self.messages])
+
+	def test_page_number(self):
+		page, cursor = get_page(self.messages, {"page_size": 2, "page": 3}, 'create_date', first_page = 1)
+
+		self.assertEqual(len(page), 1)
+		self.assertIsNone(cursor)
@@ -15,46 +15,39 @@ import textwrap
 from django.utils.html import strip_tags
 from django.utils.translation import ugettext as _
 
-from fcm_django.models import FCMDevice
-from fcm_django.fcm import fcm_send_message
-
 from chat.serializers import ChatSerializer
 
-def sendChatPushNotification(user, message):
-	device = FCMDevice.objects.filter(user = user, active = True).first()
+from .push import queue_push
 
-	if not device is None:
-		serializer = ChatSerializer(message)
+def sendChatPushNotification(user, message):
+	serializer = ChatSerializer(message)
 
-		json_r = json.dumps(serializer.data)
-		json_r = json.loads(json_r)
-		
-		info = {}
+	info = {}
 
-		info["data"] = {}
-		info["data"]["messages"] = []
-		info["data"]["message_sent"] = json_r
+	info["data"] = {}
+	info["data"]["messages"] = []
+	info["data"]["message_sent"] = serializer.data
 
-		info["message"] = ""
-		info["type"] = ""
-		info["title"] = ""
-		info["success"] = True
-		info["number"] = 1
-		info['extra'] = 0
+	info["message"] = ""
+	info["type"] = ""
+	info["title"] = ""
+	info["success"] = True
+	info["number"] = 1
+	info['extra'] = 0
 
-		response = json.dumps(info)
+	response = json.dumps(info)
 
-		title = str(message.user).join(_(" sent a message"))
+	title = str(message.user).join(_(" sent a message"))
 
-		simple_notify = textwrap.shorten(strip_tags(message.text), width = 30, placeholder = "...")
+	simple_notify = textwrap.shorten(strip_tags(message.text), width = 30, placeholder = "...")
 
-		if message.image:
-			simple_notify += " ".join(_("[Photo]"))
+	if message.image:
+		simple_notify += " ".join(_("[Photo]"))
 
-		device.send_message(title = str(message.user), body = simple_notify, data = {"response": response, "title": title, "body": simple_notify, "user_from": message.user.email, "user_name": str(message.user), "user_img": message.user.image_url, "type": 'chat', "click_action": 'FLUTTER_NOTIFICATION_CLICK'})
+	queue_push([user], title = str(message.user), body = simple_notify, data = {"response": response, "title": title, "body": simple_notify, "user_from": message.user.email, "user_name": str(message.user), "user_img": message.user.image_url, "type": 'chat', "click_action": 'FLUTTER_NOTIFICATION_CLICK'})
 
 def sendMuralPushNotification(user, user_action, message):
-	device = FCMDevice.objects.filter(user = user, active = True).first()
+	sendMuralPushNotifications([user], user_action, message)
 
-	if not device is None:
-		device.send_message(data = {"title": "Mural", "body": message, "user_img": user_action.image_url, "type": "mural"})
\ No newline at end of file
+def sendMuralPushNotifications(users, user_action, message):
+	queue_push(users, data = {"title": "Mural", "body": message, "user_img": user_action.image_url, "type": "mural"})
@@ -50,7 +50,8 @@ from users.models import User
 
 from mural.serializers import MuralSerializer, CommentsSerializer
 from mural.models import SubjectPost, MuralVisualizations, Comment, MuralFavorites
-from mural.utils import getSubjectPosts, getSpaceUsers
+from mural.utils import getSubjectPosts
+from mural.fanout import queue_fanout
 
 from notifications.models import Notification
 
@@ -60,7 +61,8 @@ from django.http import HttpResponse
 
 from fcm_django.models import FCMDevice
 
-from .utils import  sendChatPushNotification, sendMuralPushNotification
+from .pagination import get_page, get_posts_context, posts_after
+from .utils import  sendChatPushNotification
 
 @csrf_exempt
 def getToken(request):
@@ -367,8 +369,6 @@ class ChatViewset(viewsets.ModelViewSet, LogMixin):
 
         username = json_data['email']
         user_two = json_data['user_two']
-        n_page = int(json_data['page'])
-        messages_by_page = int(json_data['page_size'])
 
         user = User.objects.get(email = username)
 
@@ -379,30 +379,24 @@ class ChatViewset(viewsets.ModelViewSet, LogMixin):
         if not user_two == "":
             user2 = User.objects.get(email = user_two)
 
-            messages = TalkMessages.objects.filter((Q(talk__user_one__email = username) & Q(talk__user_two__email = user_two)) | (Q(talk__user_one__email = user_two) & Q(talk__user_two__email = username))).order_by('-create_date')
+            messages = TalkMessages.objects.filter((Q(talk__user_one__email = username) & Q(talk__user_two__email = user_two)) | (Q(talk__user_one__email = user_two) & Q(talk__user_two__email = username))).select_related('user', 'subject').order_by('-create_date', '-id')
 
             views = ChatVisualizations.objects.filter(Q(user = user) & (Q(message__talk__user_two__email = user_two) | Q(message__talk__user_one__email = user_two)) & Q(viewed = False))
 
             views.update(viewed = True, date_viewed = datetime.now())
 
-            page = []
+            page, next_cursor = get_page(messages, json_data, 'create_date', first_page = 1)
 
-            for i in range(messages_by_page*(n_page - 1), (n_page*messages_by_page)):
-                if i >= messages.count():
-                    break
-                else:
-                    page.append(messages[i])
+            favorites = set(ChatFavorites.objects.filter(user = user, message__in = [message.id for message in page]).values_list('message', flat = True))
 
-            serializer = ChatSerializer(page, many = True, context = {"request_user": user})
+            serializer = ChatSerializer(page, many = True, context = {"request_user": user, "favorites": favorites})
 
-            json_r = json.dumps(serializer.data)
-            json_r = json.loads(json_r)
-            
             info = {}
 
             info["data"] = {}
-            info["data"]["messages"] = json_r
+            info["data"]["messages"] = serializer.data
             info["data"]["message_sent"] = {}
+            info["data"]["next_cursor"] = next_cursor
 
             info["message"] = ""
             info["type"] = ""
@@ -523,11 +517,8 @@ class ChatViewset(viewsets.ModelViewSet, LogMixin):
 
                 serializer = ChatSerializer(message)
 
-                json_r = json.dumps(serializer.data)
-                json_r = json.loads(json_r)
-
                 info["data"] = {}
-                info["data"]["message_sent"] = json_r
+                info["data"]["message_sent"] = serializer.data
 
                 info["message"] = _("Message sent successfully!")
                 info["success"] = True
@@ -623,38 +614,29 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
         subject = json_data['subject']
         favorites = json_data['only_fav']
         mines = json_data['only_mine']
-        n_page = int(json_data['page'])
-        posts_by_page = int(json_data['page_size'])
+        n_page = int(json_data.get('page', 0))
 
         user = User.objects.get(email = username)
         sub = Subject.objects.get(slug = subject)
         
         posts = getSubjectPosts(sub.id, user, favorites == "True", mines == "True")
-        posts = posts.order_by("-most_recent")
-
-        page = []
+        posts = posts.select_related('user').order_by("-most_recent", "-pk")
 
         response = ""
 
-        if n_page is None or n_page == 0:
+        if n_page == 0 and not json_data.get('cursor', ''):
             views = MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(comment__post__subjectpost__space__id = sub.id) | Q(post__subjectpost__space__id = sub.id)))
             views.update(viewed = True, date_viewed = datetime.now())
 
-        for i in range(posts_by_page * n_page, ((n_page + 1) * posts_by_page)):
-            if i >= posts.count():
-                break
-            else:
-                page.append(posts[i])
-        
-        serializer = MuralSerializer(page, many = True, context = {"request_user": user, "subject": subject})
+        page, next_cursor = get_page(posts, json_data, 'most_recent', after = posts_after)
 
-        json_r = json.dumps(serializer.data)
-        json_r = json.loads(json_r)
+        serializer = MuralSerializer(page, many = True, context = {"request_user": user, "subject": subject, **get_posts_context(user, page)})
 
         info = {}
 
         info["data"] = {}
-        info["data"]["posts"] = json_r
+        info["data"]["posts"] = serializer.data
+        info["data"]["next_cursor"] = next_cursor
 
         info["message"] = ""
         info["type"] = ""
@@ -679,30 +661,20 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
         json_data = request.data if request.data else json.loads(request.body.decode('utf-8'))
 
         post_id = json_data['post_id']
-        n_page = int(json_data['page'])
-        comments_by_page = int(json_data['page_size'])
-
-        mural = SubjectPost.objects.get(id = post_id)
-
-        page = []
 
-        comments = Comment.objects.filter(post__id = post_id).order_by('-last_update')
+        mural = SubjectPost.objects.select_related('space').get(id = post_id)
 
-        for i in range(comments_by_page * n_page, ((n_page + 1) * comments_by_page)):
-            if i >= comments.count():
-                break
-            else:
-                page.append(comments[i])
+        comments = Comment.objects.filter(post__id = post_id).select_related('user', 'post', 'post__user').order_by('-last_update', '-id')
 
-        serializer = CommentsSerializer(page, many = True, context = {"request_user": mural.user, "subject": mural.space.slug})
+        page, next_cursor = get_page(comments, json_data, 'last_update')
 
-        json_r = json.dumps(serializer.data)
-        json_r = json.loads(json_r)
+        serializer = CommentsSerializer(page, many = True, context = {"request_user": mural.user, "subject": mural.space.slug, **get_posts_context(mural.user, [mural])})
 
         info = {}
 
         info["data"] = {}
-        info["data"]["comments"] = json_r
+        info["data"]["comments"] = serializer.data
+        info["data"]["next_cursor"] = next_cursor
 
         info["message"] = ""
         info["type"] = ""
@@ -761,10 +733,6 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
         post.save()
 
         if not post.pk is None:
-            users = getSpaceUsers(user.id, post)
-            
-            entries = []
-
             paths = [
                 reverse("mural:manage_subject"),
                 reverse("mural:subject_view", args = (), kwargs = {'slug': subject.slug})
@@ -784,14 +752,7 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
                 "post_type": "subjects"
             }
 
-            notification = json.dumps(notification)
-
-            for user in users:
-                entries.append(MuralVisualizations(viewed = False, user = user, post = post))
-                sendMuralPushNotification(user, post.user, simple_notify)
-                Group("user-%s" % user.id).send({'text': notification})
-
-            MuralVisualizations.objects.bulk_create(entries)
+            queue_fanout(user, post, notification, simple_notify, visualize = True)
 
             self.log_context['subject_id'] = post.space.id
             self.log_context['subject_name'] = post.space.name
@@ -799,11 +760,8 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
 
             serializer = MuralSerializer(post, context = {"request_user": user, "subject": space})
 
-            json_r = json.dumps(serializer.data)
-            json_r = json.loads(json_r)
-
             info["data"] = {}
-            info["data"]["new_post"] = json_r
+            info["data"]["new_post"] = serializer.data
 
             info["message"] = _("Post created successfully!")
             info["success"] = True
@@ -855,10 +813,6 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
         comment.save()
 
         if not comment.pk is None:
-            users = getSpaceUsers(user.id, mural)
-            
-            entries = []
-
             paths = [
                 reverse("mural:manage_general"),
 			    reverse("mural:manage_category"),
@@ -880,14 +834,7 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
                 "type_slug": mural.get_space_slug()
             }
 
-            notification = json.dumps(notification)
-
-            for user in users:
-                entries.append(MuralVisualizations(viewed = False, user = user, comment = comment))
-                sendMuralPushNotification(user, comment.user, simple_notify)
-                Group("user-%s" % user.id).send({'text': notification})
-
-            MuralVisualizations.objects.bulk_create(entries)
+            queue_fanout(user, mural, notification, simple_notify, comment = comment, visualize = True)
 
             self.log_context['post_id'] = mural.id
             self.log_context['subject_id'] = mural.space.id
@@ -896,11 +843,8 @@ class MuralViewset(viewsets.ModelViewSet, LogMixin):
 
             serializer = CommentsSerializer(comment, context = {"request_user": user, "subject": mural.space.slug})
 
-            json_r = json.dumps(serializer.data)
-            json_r = json.loads(json_r)
-
             info["data"] = {}
-            info["data"]["new_comment"] = json_r
+            info["data"]["new_comment"] = serializer.data
 
             info["message"] = _("Comment created successfully!")
             info["success"] = True
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 19:40
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banco_questoes', '0003_question_created_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                "ALTER TABLE banco_questoes_question ADD COLUMN tag_ids integer[] NOT NULL DEFAULT '{}'",
+                """
+                UPDATE banco_questoes_question SET tag_ids = ARRAY(
+                    SELECT tag_id FROM banco_questoes_question_categories WHERE question_id = banco_questoes_question.id ORDER BY tag_id)
+                """,
+                "CREATE INDEX banco_questoes_question_tag_ids ON banco_questoes_question USING GIN (tag_ids)",
+                """
+                CREATE FUNCTION banco_questoes_question_tag_ids() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP <> 'INSERT' THEN
+                        UPDATE banco_questoes_question SET tag_ids = ARRAY(
+                            SELECT tag_id FROM banco_questoes_question_categories WHERE question_id = OLD.question_id ORDER BY tag_id)
+                        WHERE id = OLD.question_id;
+                    END IF;
+
+                    IF TG_OP <> 'DELETE' THEN
+                        UPDATE banco_questoes_question SET tag_ids = ARRAY(
+                            SELECT tag_id FROM banco_questoes_question_categories WHERE question_id = NEW.question_id ORDER BY tag_id)
+                        WHERE id = NEW.question_id;
+                    END IF;
+
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE TRIGGER banco_questoes_question_tag_ids AFTER INSERT OR UPDATE OR DELETE ON banco_questoes_question_categories
+                    FOR EACH ROW EXECUTE PROCEDURE banco_questoes_question_tag_ids()
+                """,
+            ],
+            [
+                "DROP TRIGGER banco_questoes_question_tag_ids ON banco_questoes_question_categories",
+                "DROP FUNCTION banco_questoes_question_tag_ids()",
+                "ALTER TABLE banco_questoes_question DROP COLUMN tag_ids",
+            ],
+        ),
+    ]
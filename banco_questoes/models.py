@@ -22,6 +22,7 @@ def validate_img_extension(value):
 		if not value.file.content_type in valid_formats:
 			raise ValidationError(_('File not supported.'))
 
+#The table also has a tag_ids column, the ids of the question categories, kept by a trigger and read by banco_questoes.utils
 class Question(models.Model):
     enunciado = models.TextField(_("Statement"), blank = True)
     question_img = models.ImageField(verbose_name = _("Image"), blank = True, null = True, upload_to = 'questions/', validators = [validate_img_extension])
@@ -1,3 +1,39 @@
 from django.test import TestCase
 
-# Create your tests here.
+from subjects.models import Tag
+
+from .models import Question
+from .utils import count_questions, draw_questions
+
+class QuestionTagsTest(TestCase):
+
+    def setUp(self):
+        self.easy = Tag.objects.create(name = "easy")
+        self.math = Tag.objects.create(name = "math")
+
+        self.both = Question.objects.create(enunciado = "both")
+        self.both.categories.add(self.easy, self.math)
+
+        self.only_math = Question.objects.create(enunciado = "only math")
+        self.only_math.categories.add(self.math)
+
+        Question.objects.create(enunciado = "no categories")
+
+    def test_draw_and_count(self):
+        self.assertEqual(count_questions([self.math.id]), 2)
+        self.assertEqual(count_questions([self.easy.id, self.math.id]), 1)
+        self.assertEqual(count_questions([]), 2)
+
+        self.assertEqual(sorted(draw_questions([self.math.id], 5)), sorted([self.both.id, self.only_math.id]))
+        self.assertEqual(draw_questions([self.math.id], 5, [self.both.id]), [self.only_math.id])
+        self.assertEqual(len(draw_questions([self.math.id], 1)), 1)
+
+    def test_categories_changes(self):
+        self.both.categories.remove(self.math)
+        self.only_math.categories.add(self.easy)
+
+        self.assertEqual(draw_questions([self.easy.id, self.math.id], 5), [self.only_math.id])
+
+        self.only_math.delete()
+
+        self.assertEqual(count_questions([self.easy.id]), 1)
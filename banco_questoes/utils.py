@@ -0,0 +1,43 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+# Questions drawing and counting by their categories (tags). They use the tag_ids column of the questions, the ids of
+# their categories kept by a trigger on the categories table (see migration 0004_question_tag_ids), with a GIN index
+
+from django.db import connection
+
+def get_tag_ids(tags):
+    """
+        Returns the tags ids as integers, None if some of them is not an id
+    """
+    try:
+        return [int(tag) for tag in tags]
+    except (TypeError, ValueError):
+        return None
+
+def draw_questions(tags, n_questions, exclude = []):
+    """
+        Returns the ids of n_questions random questions that have all the tags, except the excluded ones
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM banco_questoes_question WHERE tag_ids @> %s::integer[] AND tag_ids <> '{}' AND NOT id = ANY(%s::integer[]) ORDER BY random() LIMIT %s", [list(tags), list(exclude), n_questions])
+
+        return [row[0] for row in cursor.fetchall()]
+
+def count_questions(tags):
+    """
+        Returns how many questions have all the tags
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM banco_questoes_question WHERE tag_ids @> %s::integer[] AND tag_ids <> '{}'", [list(tags)])
+
+        return cursor.fetchone()[0]
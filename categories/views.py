@@ -30,11 +30,11 @@ from subjects.models import Subject
 
 from log.mixins import LogMixin
 from log.decorators import log_decorator_ajax
-from log.models import Log
 
 import time
 
 from topics.models import Topic, Resource
+from topics.versions import touch_subject
 from users.models import User
 
 class IndexView(LoginRequiredMixin, views.StaffuserRequiredMixin, ListView):
@@ -229,6 +229,9 @@ class UpdateCategory(LogMixin, UpdateView):
             Topic.objects.filter(subject__category = category, repository = False).update(visible = False)
             Resource.objects.filter(topic__subject__category = category, topic__repository = False).update(visible = False)
 
+            for subject_id in category.subject_category.values_list('id', flat = True):
+                touch_subject(subject_id)
+
         return super(UpdateCategory, self).form_valid(form)
 
     def get_context_data(self, **kwargs):
@@ -263,7 +266,7 @@ def category_view_log(request, category):
 
         request.log_context = log_context
 
-        log_id = Log.objects.latest('id').id
+        log_id = request.log_id
 
         return JsonResponse({'message': 'ok', 'log_id': log_id})
 
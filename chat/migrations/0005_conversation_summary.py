@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 17:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_merge_20170413_2034'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.TalkMessages', verbose_name='Last Message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Message Date'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='user_one_unread',
+            field=models.PositiveIntegerField(default=0, verbose_name='User One Unread'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='user_two_unread',
+            field=models.PositiveIntegerField(default=0, verbose_name='User Two Unread'),
+        ),
+        migrations.AlterIndexTogether(
+            name='conversation',
+            index_together=set([('user_one', 'last_message_date'), ('user_two', 'last_message_date')]),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE chat_conversation SET last_message_id = last.id, last_message_date = last.create_date
+            FROM (SELECT DISTINCT ON (talk_id) id, talk_id, create_date FROM chat_talkmessages WHERE talk_id IS NOT NULL ORDER BY talk_id, create_date DESC, id DESC) AS last
+            WHERE last.talk_id = chat_conversation.id;
+
+            UPDATE chat_conversation SET
+                user_one_unread = (SELECT COUNT(*) FROM chat_chatvisualizations v INNER JOIN chat_talkmessages m ON m.id = v.message_id
+                    WHERE m.talk_id = chat_conversation.id AND v.user_id = chat_conversation.user_one_id AND NOT v.viewed),
+                user_two_unread = (SELECT COUNT(*) FROM chat_chatvisualizations v INNER JOIN chat_talkmessages m ON m.id = v.message_id
+                    WHERE m.talk_id = chat_conversation.id AND v.user_id = chat_conversation.user_two_id AND NOT v.viewed);
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -14,12 +14,14 @@ import os
 import time
 from os import path
 from django.db import models
+from django.db.models import Case, Count, F, When
 from django.core import validators
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
 
 from datetime import timezone
 
+from amadeus.counters import CounterQuerySet, increment
 from subjects.models import Subject
 from users.models import User
 
@@ -39,6 +41,29 @@ def upload_filename(instance, filename):
 class Conversation(models.Model):
 	user_one = models.ForeignKey(User, verbose_name = _('User One'), related_name = 'talk_user_start')
 	user_two = models.ForeignKey(User, verbose_name = _('User Two'), related_name = 'talk_user_end')
+	last_message = models.ForeignKey('TalkMessages', verbose_name = _('Last Message'), related_name = '+', null = True, blank = True, on_delete = models.SET_NULL)
+	last_message_date = models.DateTimeField(_('Last Message Date'), null = True, blank = True)
+	user_one_unread = models.PositiveIntegerField(_('User One Unread'), default = 0)
+	user_two_unread = models.PositiveIntegerField(_('User Two Unread'), default = 0)
+
+	class Meta:
+		index_together = [('user_one', 'last_message_date'), ('user_two', 'last_message_date')]
+
+	def unread(self, user):
+		if self.user_one_id == user.id:
+			return self.user_one_unread
+
+		return self.user_two_unread
+
+def refresh_unread(talk_ids):
+	"""
+		Recounts the unread messages of both participants of the conversations, used after a batch of messages is marked as viewed
+	"""
+	totals = ChatVisualizations.objects.filter(message__talk__in = talk_ids, viewed = False).values_list('message__talk', 'user').annotate(total = Count('id')).order_by()
+	totals = {(talk, user): total for talk, user, total in totals}
+
+	for talk in Conversation.objects.filter(id__in = talk_ids).only('id', 'user_one', 'user_two'):
+		Conversation.objects.filter(id = talk.id).update(user_one_unread = totals.get((talk.id, talk.user_one_id), 0), user_two_unread = totals.get((talk.id, talk.user_two_id), 0))
 
 class TalkMessages(models.Model):
 	text = models.TextField(_('Message'), blank = True)
@@ -48,6 +73,14 @@ class TalkMessages(models.Model):
 	subject = models.ForeignKey(Subject, verbose_name = _('Subject'), related_name = 'message_subject', null = True)
 	create_date = models.DateTimeField(_('Create Date'), auto_now_add = True)
 
+	def save(self, *args, **kwargs):
+		created = self.pk is None
+
+		super(TalkMessages, self).save(*args, **kwargs)
+
+		if created and self.talk_id:
+			Conversation.objects.filter(id = self.talk_id).update(last_message = self, last_message_date = self.create_date)
+
 	def get_timestamp(self):
 		return str(self.create_date.replace(tzinfo = timezone.utc).timestamp())
 
@@ -59,12 +92,45 @@ class TalkMessages(models.Model):
 		
 		return ""
 
+class ChatVisualizationQuerySet(CounterQuerySet):
+	"""
+		Besides the cached counters, a viewed update recounts the unread summary of the conversations involved
+	"""
+	def update(self, **kwargs):
+		if 'viewed' in kwargs:
+			talk_ids = set(self.exclude(message__talk = None).values_list('message__talk', flat = True))
+
+			rows = super(ChatVisualizationQuerySet, self).update(**kwargs)
+
+			if talk_ids:
+				refresh_unread(talk_ids)
+
+			return rows
+
+		return super(ChatVisualizationQuerySet, self).update(**kwargs)
+
 class ChatVisualizations(models.Model):
 	viewed = models.BooleanField(_('Viewed'), default = False)
 	message = models.ForeignKey(TalkMessages, verbose_name = _('Message'), related_name = 'chat_visualization_message', null = True)
 	user = models.ForeignKey(User, verbose_name = _('User'), related_name = "chat_visualization_user", null = True)
 	date_viewed = models.DateTimeField(_('Date/Time Viewed'), null = True, blank = True)
 
+	objects = ChatVisualizationQuerySet.as_manager()
+
+	def save(self, *args, **kwargs):
+		created = self.pk is None
+
+		super(ChatVisualizations, self).save(*args, **kwargs)
+
+		if created and not self.viewed and self.message:
+			increment([self.user_id], 'chat', subject = self.message.subject_id, talk = self.message.talk_id)
+
+			if self.message.talk_id:
+				#Only the unread counter of the receiver participant grows
+				Conversation.objects.filter(id = self.message.talk_id).update(
+					user_one_unread = Case(When(user_one = self.user_id, then = F('user_one_unread') + 1), default = F('user_one_unread')),
+					user_two_unread = Case(When(user_two = self.user_id, then = F('user_two_unread') + 1), default = F('user_two_unread')))
+
 class ChatFavorites(models.Model):
 	message = models.ForeignKey(TalkMessages, verbose_name = _('Message'), related_name = 'chat_favorites_message', null = True)
 	user = models.ForeignKey(User, verbose_name = _('User'), related_name = "chat_favorites_user", null = True)
\ No newline at end of file
@@ -25,6 +25,12 @@ class ChatSerializer(serializers.ModelSerializer):
 	favorite = serializers.SerializerMethodField()
 
 	def get_favorite(self, message):
+		#Listings put the favorite ids of the whole page in the context
+		favorites = self.context.get("favorites", None)
+
+		if not favorites is None:
+			return message.id in favorites
+
 		user = self.context.get("request_user", None)
 
 		if not user is None:
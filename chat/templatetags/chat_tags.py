@@ -11,35 +11,24 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 from django import template
-from django.conf import settings
-from django.utils import timezone
-from django.db.models import Count, F, Q
 from django.utils.translation import ugettext_lazy as _
-from django.contrib.sessions.models import Session
 
-from log.models import Log
+from amadeus.counters import get_count
+from users.presence import get_user_status
 
-from chat.models import TalkMessages, ChatVisualizations, ChatFavorites
+from chat.models import ChatFavorites
 
 register = template.Library()
 
-@register.assignment_tag(name = 'is_online')
-def is_online(user):
-	expire_time = settings.SESSION_SECURITY_EXPIRE_AFTER
-	now = timezone.now()
-	
-	activities = Log.objects.filter(user_id = user.id).order_by('-datetime')
+@register.assignment_tag(name = 'is_online', takes_context = True)
+def is_online(context, user):
+	#Views that list many users put the statuses of the whole page in the context (see users.presence.get_statuses)
+	statuses = context.get('statuses', {})
 
-	if activities.count() > 0:
-		last_activity = activities[0]
+	if user.id in statuses:
+		return statuses[user.id]
 
-		if last_activity.action != 'logout':
-			if (now - last_activity.datetime).total_seconds() < expire_time:
-				return "active"
-			else:
-				return "away"
-	
-	return ""
+	return get_user_status(user.id)
 
 @register.filter(name = 'status_text')
 def status_text(status):
@@ -59,18 +48,14 @@ def chat_user(user, chat):
 
 @register.filter(name = 'last_message')
 def last_message(chat):
-	last_message = TalkMessages.objects.filter(talk = chat).order_by('-create_date')
-	
-	if len(last_message) > 0:
-		return last_message[0].create_date
+	if chat.last_message_date:
+		return chat.last_message_date
 
 	return ''
 
 @register.filter(name = 'notifies')
 def notifies(chat, user):
-	total = ChatVisualizations.objects.filter(message__talk = chat, user = user, viewed = False).count()
-
-	return total
+	return chat.unread(user)
 
 @register.filter(name = 'fav_label')
 def fav_label(message, user):
@@ -95,6 +80,4 @@ def fav_class(message, user):
 
 @register.filter(name = 'notifies_subject')
 def notifies_subject(subject, user):
-	total = ChatVisualizations.objects.filter(Q(message__subject = subject, user = user, viewed = False)  & (Q(user__is_staff = True) | Q(message__subject__students = user) | Q(message__subject__professor = user) | Q(message__subject__category__coordinators = user))).distinct().count()
-
-	return total
\ No newline at end of file
+	return get_count(user, 'chat', 'subject', subject.id)
\ No newline at end of file
@@ -12,4 +12,38 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 
 from django.test import TestCase
 
-# Create your tests here.
+from users.models import User
+
+from .models import Conversation, TalkMessages, ChatVisualizations
+
+class ConversationSummaryTest(TestCase):
+
+	def setUp(self):
+		self.sender = User.objects.create(username = "sender", email = "sender@amadeus.br")
+		self.receiver = User.objects.create(username = "receiver", email = "receiver@amadeus.br")
+		self.talk = Conversation.objects.create(user_one = self.sender, user_two = self.receiver)
+
+	def send(self, text):
+		message = TalkMessages.objects.create(text = text, talk = self.talk, user = self.sender)
+		ChatVisualizations.objects.create(viewed = False, message = message, user = self.receiver)
+
+		return message
+
+	def test_send_updates_summary(self):
+		self.send("Hi")
+		last = self.send("How are you?")
+
+		talk = Conversation.objects.get(id = self.talk.id)
+
+		self.assertEqual(talk.last_message_id, last.id)
+		self.assertEqual(talk.last_message_date, last.create_date)
+		self.assertEqual(talk.unread(self.receiver), 2)
+		self.assertEqual(talk.unread(self.sender), 0)
+
+	def test_viewed_resets_unread(self):
+		self.send("Hi")
+		self.send("How are you?")
+
+		ChatVisualizations.objects.filter(user = self.receiver, message__talk = self.talk).update(viewed = True)
+
+		self.assertEqual(Conversation.objects.get(id = self.talk.id).unread(self.receiver), 0)
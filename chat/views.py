@@ -32,13 +32,13 @@ from amadeus.permissions import has_subject_view_permissions
 from channels import Group
 import json
 
-from log.models import Log
 from log.mixins import LogMixin
 import time
 
 from categories.models import Category
 from subjects.models import Subject
 from users.models import User
+from users.presence import get_statuses
 
 from api.utils import  sendChatPushNotification
 
@@ -63,18 +63,20 @@ class GeneralIndex(LoginRequiredMixin, LogMixin, generic.ListView):
 	def get_queryset(self):
 		user = self.request.user
 
-		conversations = Conversation.objects.extra(select = {"most_recent": "select create_date from chat_talkmessages where chat_talkmessages.talk_id = chat_conversation.id order by create_date DESC LIMIT 1"}).filter((Q(user_one = user) | Q(user_two = user))).order_by('-most_recent')
+		conversations = Conversation.objects.filter((Q(user_one = user) | Q(user_two = user))).select_related('user_one', 'user_two').order_by('-last_message_date')
 				
 		return conversations
 
 	def get_context_data(self, **kwargs):
 		context = super(GeneralIndex, self).get_context_data(**kwargs)
 
+		context['statuses'] = get_statuses([chat.user_two_id if chat.user_one_id == self.request.user.id else chat.user_one_id for chat in context['conversations']])
+
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(GeneralIndex, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+		log = super(GeneralIndex, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		context['title'] = _('Messages')
 		context['totals'] = self.totals
@@ -108,12 +110,14 @@ class GeneralParticipants(LoginRequiredMixin, LogMixin, generic.ListView):
 	def get_context_data(self, **kwargs):
 		context = super(GeneralParticipants, self).get_context_data(**kwargs)
 
+		context['statuses'] = get_statuses([participant.id for participant in context['participants']])
+
 		self.log_context['search_by'] = self.request.GET.get('search', '')
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(GeneralParticipants, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+		log = super(GeneralParticipants, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		context['title'] = _('Messages - Participants')
 		context['totals'] = self.totals
@@ -155,6 +159,8 @@ class SubjectParticipants(LoginRequiredMixin, LogMixin, generic.ListView):
 	def get_context_data(self, **kwargs):
 		context = super(SubjectParticipants, self).get_context_data(**kwargs)
 
+		context['statuses'] = get_statuses([participant.id for participant in context['participants']])
+
 		sub = self.kwargs.get('subject', 0)
 		subject = get_object_or_404(Subject, id = sub)
 
@@ -164,9 +170,9 @@ class SubjectParticipants(LoginRequiredMixin, LogMixin, generic.ListView):
 		self.log_context['search_by'] = self.request.GET.get('search', '')
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(SubjectParticipants, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+		log = super(SubjectParticipants, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		context['subject'] = subject
 		context['search'] = self.request.GET.get('search', '')
@@ -203,16 +209,18 @@ class SubjectView(LoginRequiredMixin, LogMixin, generic.ListView):
 		slug = self.kwargs.get('slug')
 		subject = get_object_or_404(Subject, slug = slug)
 
-		conversations = Conversation.objects.extra(select = {"most_recent": "select create_date from chat_talkmessages where chat_talkmessages.talk_id = chat_conversation.id order by create_date DESC LIMIT 1"}).filter((Q(user_one = user) & (Q(user_two__is_staff = True) | 
+		conversations = Conversation.objects.filter((Q(user_one = user) & (Q(user_two__is_staff = True) | 
 			Q(user_two__subject_student = subject) | Q(user_two__professors = subject) | Q(user_two__coordinators__subject_category = subject))) |
 			(Q(user_two = user) & (Q(user_one__is_staff = True) | Q(user_one__subject_student = subject) |
-			Q(user_one__professors = subject) | Q(user_one__coordinators__subject_category = subject)))).distinct().order_by('-most_recent')
+			Q(user_one__professors = subject) | Q(user_one__coordinators__subject_category = subject)))).distinct().select_related('user_one', 'user_two').order_by('-last_message_date')
 
 		return conversations
 
 	def get_context_data(self, **kwargs):
 		context = super(SubjectView, self).get_context_data(**kwargs)
 
+		context['statuses'] = get_statuses([chat.user_two_id if chat.user_one_id == self.request.user.id else chat.user_one_id for chat in context['conversations']])
+
 		slug = self.kwargs.get('slug', None)
 		subject = get_object_or_404(Subject, slug = slug)
 
@@ -221,9 +229,9 @@ class SubjectView(LoginRequiredMixin, LogMixin, generic.ListView):
 		self.log_context['subject_slug'] = subject.slug
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(SubjectView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+		log = super(SubjectView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		context['title'] = _('%s - Messages')%(str(subject))
 		context['subject'] = subject
@@ -0,0 +1,89 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from links.models import Link
+from log.models import Log
+from log.resources import get_cache
+from notifications.models import Notification
+from pendencies.models import Pendencies
+from subjects.models import Subject, Tag
+from topics.models import Topic
+from users.models import User
+
+from dashboards.utils import get_pend_graph, getAccessedTags, getTagAccessess, getOtherIndicators
+
+class SubjectMetricsTest(TestCase):
+
+	def setUp(self):
+		get_cache().clear()
+
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		self.topic = Topic.objects.create(name = "topic", subject = self.subject, visible = True)
+		self.link = Link.objects.create(name = "link", topic = self.topic, link_url = "http://amadeus.br", all_students = True)
+
+		self.tag = Tag.objects.create(name = "marker")
+		self.link.tags.add(self.tag)
+
+		self.student = User.objects.create(username = "student", email = "student@amadeus.br")
+		self.other = User.objects.create(username = "other", email = "other@amadeus.br")
+
+	def log(self, user, days, component = "resources", resource = "link"):
+		context = {'subject_id': self.subject.id}
+
+		if component == "resources":
+			context['link_id'] = self.link.id
+
+		Log.objects.create(component = component, action = "view", resource = resource, user = str(user), user_id = user.id,
+			user_email = user.email, context = context, datetime = timezone.now() - timedelta(days = days))
+
+	def test_metrics(self):
+		self.log(self.student, 1)
+		self.log(self.student, 2)
+		self.log(self.other, 1)
+		self.log(self.other, 1, "subject", "subject")
+		self.log(self.other, 2, "subject", "subject")
+		self.log(self.other, 2, "subject", "subject")
+		#Out of the week
+		self.log(self.student, 10)
+
+		tags = getAccessedTags(self.subject, self.student)
+
+		self.assertEqual([(item["tag_name"], item["qtd_access"], item["qtd_my_access"]) for item in tags], [("marker", 3, 2)])
+
+		resources = getTagAccessess(self.subject, self.tag, self.other)
+
+		self.assertEqual([(item["resource_name"], item["qtd_access"], item["qtd_my_access"]) for item in resources], [("link", 3, 1)])
+
+		indicators = getOtherIndicators(self.subject, self.student)
+
+		self.assertEqual([(item["max_access"], item["my_access"]) for item in indicators], [(3, 0), (2, 0), (2, 2), (1, 1), (0, 0)])
+
+	def test_pend_graph(self):
+		self.subject.students.add(self.student, self.other)
+
+		pendency = Pendencies.objects.create(action = "view", begin_date = timezone.now() - timedelta(days = 1), end_date = timezone.now() + timedelta(days = 1), resource = self.link)
+		Notification.objects.create(task = pendency, user = self.other, level = 1)
+
+		self.log(self.student, 0)
+
+		graph = get_pend_graph(self.student, self.subject)
+
+		self.assertEqual([(item["name"], item["percent"], item["done"]) for item in graph], [("link", 0.5, True)])
+		self.assertEqual(graph[0]["access_link"], str(self.link.access_link()))
+
+		self.assertFalse(get_pend_graph(self.other, self.subject)[0]["done"])
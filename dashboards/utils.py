@@ -1,37 +1,48 @@
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import caches
 from django.utils import formats, timezone
 from django.core.urlresolvers import reverse
 
-from subjects.models import Tag
 from topics.models import Resource
-from log.models import Log
+from log.models import Log, RESOURCE_TYPES
 
 from notifications.models import Notification
 
 from pendencies.models import Pendencies
 
-from notifications.utils import get_resource_users
+from notifications.utils import get_resources_users
 
-from django.db.models import Q, Max, Count
+from django.db.models import Q, Count
 from django.db.models.functions import TruncDate
 
-import operator
+def get_pend_graph(user, subject):
+    """
+        Progress of the pendencies of the subject: how many of their users were not notified today and if the user did each one.
+        The users, the notifications and the logs of all the pendencies are loaded at once
+    """
+    pendencies = list(Pendencies.objects.filter(resource__topic__subject = subject, resource__visible = True) \
+        .select_related('resource__topic__subject', *['resource__' + resource_type for resource_type in RESOURCE_TYPES]))
 
-def done_percent(pendency):
-    users = get_resource_users(pendency.resource)
-    notified = Notification.objects.filter(user__in = users.values_list('id', flat = True), creation_date = datetime.now(), task = pendency).count()
-    
-    number_users = users.count()
+    resources = {pendency.resource_id: pendency.resource for pendency in pendencies}
+    users = get_resources_users(list(resources.values()))
 
-    not_done = (notified * 100) / number_users
+    #Today notifications of the users of each pendency
+    notified = {}
 
-    return 100 - not_done
+    for task_id, user_id in Notification.objects.filter(task__in = pendencies, creation_date = date.today()).values_list('task_id', 'user_id'):
+        notified.setdefault(task_id, []).append(user_id)
+
+    #Actions the user did in the resources since the subject began
+    done = set(Log.objects.filter(user_id = user.id, resource_id__in = list(resources), datetime__date__gte = subject.init_date) \
+        .values_list('resource', 'resource_type', 'resource_id', 'action').distinct())
 
-def get_pend_graph(user, subject):
-    pendencies = Pendencies.objects.filter(resource__topic__subject = subject, resource__visible = True)
     graph = []
 
     for pendency in pendencies:
+        resource = pendency.resource
+        resource_users = users[resource.id]
+
         item = {}
         item["date"] = {}
         item["date"]["start"] = formats.date_format(pendency.begin_date, "m/d/Y H:i")
@@ -39,83 +50,164 @@ def get_pend_graph(user, subject):
         item["date"]["delay"] = formats.date_format(pendency.limit_date, "m/d/Y H:i") if pendency.limit_date else "infinity"
 
         item["action"] = pendency.get_action_display()
-        item["name"] = pendency.resource.name
+        item["name"] = resource.name
         
-        if pendency.begin_date <= timezone.now():
-            item["percent"] = done_percent(pendency)/100
+        if pendency.begin_date <= timezone.now() and resource_users:
+            not_done = len([user_id for user_id in notified.get(pendency.id, []) if user_id in resource_users]) / len(resource_users)
+
+            item["percent"] = 1 - not_done
         else:
             item["percent"] = 0
 
-        item["access_link"] = str(pendency.resource.access_link())
+        item["access_link"] = str(resource.access_link())
 
-        users = get_resource_users(pendency.resource)
-        subject_begin_date = pendency.resource.topic.subject.init_date
-        pend_action = pendency.action
-        resource_type = pendency.resource._my_subclass
-        resource_key = resource_type + "_id"
-        resource_id = pendency.resource.id
+        if user.id in resource_users:
+            resource_type = resource._my_subclass
 
-        if user in users:
-            has_action = Log.objects.filter(user_id = user.id, action = pend_action, resource = resource_type, context__contains = {resource_key: resource_id}, datetime__date__gte = subject_begin_date).exists()
+            item["done"] = (resource_type, resource_type, resource.id, pendency.action) in done
 
-            item["done"] = True
+        graph.append(item)
 
-            if not has_action:
-                item["done"] = False
+    return graph
 
-            """notifies = Notification.objects.filter(user = user, task = pendency).order_by("-creation_date")
+METRICS_KEY = "dashboard-metrics-%s-%s"
 
-            if notifies.count() > 0:
-                last = notifies[0]
+def get_week(today = None):
+    """
+        Returns the first and the last (not included) days of the week the dashboards show: the seven days before today
+    """
+    if today is None:
+        today = timezone.localtime(timezone.now()).date()
 
-                if not last.meta is None:
-                    item["date"]["delay"] = formats.date_format(last.meta, "m/d/Y H:i")"""
+    return today - timedelta(days = 7), today
 
-        graph.append(item)
+def count_by_user(rows):
+    counts = {}
 
-    return graph
+    for user_id, qtd in rows:
+        counts[user_id] = counts.get(user_id, 0) + qtd
 
-def getAccessedTags(subject, user):
-    tags = Tag.objects.all()
+    return counts
 
-    data = []
+def get_subject_metrics(subject):
+    """
+        Returns the accesses of every user to the subject and to its resources in the week, by user id.
+        They are computed by a few grouped queries and cached per subject and week for DASHBOARDS_TIMEOUT seconds
+    """
+    start, end = get_week()
 
-    logs = Log.objects.filter(datetime__date__gte = timezone.now() - timedelta(days = 7), datetime__date__lt = timezone.now())
+    cache = caches[getattr(settings, 'STATISTICS_CACHE', 'default')]
+    key = METRICS_KEY % (subject.id, end.isoformat())
 
-    for tag in tags:
-        if not tag.name == '':
-            resources = Resource.objects.filter(tags = tag, topic__subject = subject)
-            
-            qtd = 0
-            qtd_my = 0
+    metrics = cache.get(key)
 
-            item = {}
-            
-            item["tag_name"] = tag.name
-            item["details_url"] = reverse('dashboards:tag_accessess', args = (tag.id, subject.slug, user.email,), kwargs = {})
-            
-            if resources.count() > 0:
-                conds = Q()
-            
-                for res in resources:
-                    conds.add(Q(context__contains = {res._my_subclass+'_id': res.id}), Q.OR)
+    if metrics is None:
+        logs = Log.objects.filter(datetime__date__gte = start, datetime__date__lt = end).order_by()
+
+        #Tags of the resources of the subject
+        tags = {}
+
+        for resource_id, tag_id, tag_name in Resource.tags.through.objects.filter(resource__topic__subject = subject).values_list('resource_id', 'tag_id', 'tag__name'):
+            if not tag_name == '':
+                tags.setdefault((tag_id, tag_name), set()).add(resource_id)
+
+        resources_ids = set().union(*tags.values())
+
+        #Accesses to the resources, the ones of the tags are counted by resource_id only, the others by subject_id
+        resources = {}
+        tags_access = {}
+        resources_access = []
+
+        query = logs.filter(component = 'resources').filter(Q(subject_id = subject.id) | Q(resource_id__in = resources_ids)) \
+            .values_list('subject_id', 'resource_type', 'resource_id', 'user_id').annotate(qtd = Count('id'))
+
+        for subject_id, resource_type, resource_id, user_id, qtd in query:
+            if resource_id in resources_ids:
+                resources.setdefault((resource_type, resource_id), {})
+                resources[(resource_type, resource_id)][user_id] = resources[(resource_type, resource_id)].get(user_id, 0) + qtd
+
+                tags_access.setdefault(resource_id, []).append((user_id, qtd))
+
+            if subject_id == subject.id:
+                resources_access.append((user_id, (resource_type, resource_id), qtd))
+
+        distinct_resources = {}
+
+        for user_id, resource, qtd in resources_access:
+            distinct_resources.setdefault(user_id, set()).add(resource)
+
+        #Accesses to the subject and the days they were in
+        subject_access = {}
+        subject_days = {}
+
+        query = logs.filter(component = 'subject', resource = 'subject', subject_id = subject.id, action__in = ['access', 'view']) \
+            .values('user_id').annotate(qtd = Count('id'), days = Count(TruncDate('datetime'), distinct = True)).values_list('user_id', 'qtd', 'days')
+
+        for user_id, qtd, days in query:
+            subject_access[user_id] = qtd
+            subject_days[user_id] = days
+
+        #Actions of the pendencies whose end date was in the week
+        pendencies = set(Pendencies.objects.filter(resource__topic__subject = subject.id, resource__visible = True, end_date__date__lt = end, end_date__date__gte = start) \
+            .values_list('resource___my_subclass', 'resource_id', 'action'))
+
+        in_time = []
+
+        if pendencies:
+            query = logs.filter(resource_id__in = set(pend[1] for pend in pendencies)) \
+                .values_list('resource_type', 'resource_id', 'action', 'user_id').annotate(qtd = Count('id'))
+
+            in_time = [(user_id, qtd) for resource_type, resource_id, action, user_id, qtd in query if (resource_type, resource_id, action) in pendencies]
+
+        tags_counts = []
+
+        for (tag_id, tag_name), tag_resources in tags.items():
+            tag_access = [access for resource in tag_resources for access in tags_access.get(resource, [])]
+
+            tags_counts.append((tag_id, tag_name, count_by_user(tag_access)))
+
+        metrics = {
+            'tags': tags_counts,
+            'resources': resources,
+            'subject_access': subject_access,
+            'subject_days': subject_days,
+            'resources_access': count_by_user([(user_id, qtd) for user_id, resource, qtd in resources_access]),
+            'distinct_resources': {user_id: len(accessed) for user_id, accessed in distinct_resources.items()},
+            'in_time': count_by_user(in_time),
+        }
+
+        cache.set(key, metrics, getattr(settings, 'DASHBOARDS_TIMEOUT', 300))
 
-                query = logs.filter(Q(component = 'resources') & conds).distinct()
+    return metrics
 
-                qtd = qtd + query.count()
-                qtd_my = qtd_my + query.filter(user_id = user.id).count()
+def get_indicator(counts, user):
+    item = {}
+    item["max_access"] = max(counts.values()) if counts else 0
+    item["my_access"] = counts.get(user.id, 0)
+
+    return item
+
+def getAccessedTags(subject, user):
+    metrics = get_subject_metrics(subject)
+
+    data = []
 
-                item["qtd_access"] = qtd
-                item["qtd_my_access"] = qtd_my
+    for tag_id, tag_name, counts in sorted(metrics['tags']):
+        item = {}
+        
+        item["tag_name"] = tag_name
+        item["details_url"] = reverse('dashboards:tag_accessess', args = (tag_id, subject.slug, user.email,), kwargs = {})
+        item["qtd_access"] = sum(counts.values())
+        item["qtd_my_access"] = counts.get(user.id, 0)
             
-                data.append(item)
+        data.append(item)
 
     return data
 
 def getTagAccessess(subject, tag, user):
     resources = Resource.objects.filter(tags = tag, topic__subject = subject)
 
-    logs = Log.objects.filter(datetime__date__gte = timezone.now() - timedelta(days = 7), datetime__date__lt = timezone.now())
+    metrics = get_subject_metrics(subject)
 
     data = []
 
@@ -124,10 +216,10 @@ def getTagAccessess(subject, tag, user):
         
         item["resource_name"] = resource.name
 
-        history = logs.filter(component = 'resources', context__contains = {resource._my_subclass + '_id': resource.id})
+        history = metrics['resources'].get((resource._my_subclass, resource.id), {})
 
-        item["qtd_access"] = history.count()
-        item["qtd_my_access"] = history.filter(user_id = user.id).count()
+        item["qtd_access"] = sum(history.values())
+        item["qtd_my_access"] = history.get(user.id, 0)
         item["access_url"] = resource.access_link()
     
         data.append(item)
@@ -135,121 +227,23 @@ def getTagAccessess(subject, tag, user):
     return data
 
 def getOtherIndicators(subject, user):
-    logs = Log.objects.filter(datetime__date__gte = timezone.now() - timedelta(days = 7), datetime__date__lt = timezone.now())
+    metrics = get_subject_metrics(subject)
 
     data = []
 
-    sub_access = logs.filter(Q(component = 'subject') & Q(resource = 'subject') & Q(context__contains = {'subject_id': subject.id}) & (Q(action = 'access') | Q(action = 'view')))
+    #Subject access
+    data.append(get_indicator(metrics['subject_access'], user))
     
-    if sub_access:
-        #Subject access
-        item = {}
-        item["max_access"] = sub_access.values('user_id').annotate(c_user = Count('user_id')).aggregate(Max('c_user'))['c_user__max']
-        item["my_access"] = sub_access.filter(user_id = user.id).count()
-        
-        data.append(item)
-        
-        #Subject access distinct days
-        result = {}
-
-        for q in sub_access.extra({'date': "((datetime AT TIME ZONE 'America/Recife')::date)"}):
-            if q.user_id in result:
-                if not q.date in result[q.user_id]:
-                    result[q.user_id].append(q.date)
-            else:
-                result[q.user_id] = []
-
-        item = {}
-        item['max_access'] = max([len(x[1]) for x in result.items()]) if result else 0
-        item['my_access'] = len(result[user.id]) if user.id in result else 0
-
-        data.append(item)
-    else:
-        item = {}
-        item['max_access'] = 0
-        item['my_access'] = 0
-
-        data.append(item)
-        data.append(item)
+    #Subject access distinct days
+    data.append(get_indicator(metrics['subject_days'], user))
 
     #Resources access
-    resources_access = logs.filter(component = 'resources', context__contains = {'subject_id': subject.id})
-
-    if resources_access:
-        item = {}
-        item["max_access"] = resources_access.values('user_id').annotate(c_user = Count('user_id')).aggregate(Max('c_user'))['c_user__max']
-        item["my_access"] = resources_access.filter(user_id = user.id).count()
-    else:
-        item = {}
-        item['max_access'] = 0
-        item['my_access'] = 0
-
-    data.append(item)
+    data.append(get_indicator(metrics['resources_access'], user))
     
     #Resources distincts access
-    query = resources_access.extra({ \
-            'bulletins': "context->>'bulletin_id'", \
-            'filelinks': "context->>'filelink_id'", \
-            'goals': "context->>'goals_id'", \
-            'links': "context->>'link_id'", \
-            'pdffiles': "context->>'pdffile_id'", \
-            'questionarys': "context->>'questionary_id'", \
-            'ytvideos': "context->>'ytvideo_id'", \
-            'webconferences': "context->>'webconference_id'", \
-            'webpages': "context->>'webpage_id'", \
-        }).values('bulletins', 'filelinks', 'goals', 'links', 'pdffiles', 'questionarys', 'ytvideos', 'webconferences', 'webpages', 'user_id') \
-        .annotate(id_count = Count('id', distinct = True)).order_by()
-
-    result = {}
-
-    for q in query:
-        if q['user_id'] in result:
-            result[q['user_id']] = result[q['user_id']] + 1
-        else:
-            result[q['user_id']] = 1
-
-    item = {}
-
-    if len(result) > 0:
-        item["max_access"] = max(result.items(), key=operator.itemgetter(1))[1]
-    else:
-        item["max_access"] = 0
-
-    item["my_access"] = resources_access.filter(user_id = user.id).extra({ \
-            'bulletins': "context->>'bulletin_id'", \
-            'filelinks': "context->>'filelink_id'", \
-            'goals': "context->>'goals_id'", \
-            'links': "context->>'link_id'", \
-            'pdffiles': "context->>'pdffile_id'", \
-            'questionarys': "context->>'questionary_id'", \
-            'ytvideos': "context->>'ytvideo_id'", \
-            'webconferences': "context->>'webconference_id'", \
-            'webpages': "context->>'webpage_id'", \
-        }).values('bulletins', 'filelinks', 'goals', 'links', 'pdffiles', 'questionarys', 'ytvideos', 'webconferences', 'webpages') \
-        .annotate(id_count = Count('id', distinct = True)).order_by().count()
-
-    data.append(item)
+    data.append(get_indicator(metrics['distinct_resources'], user))
     
     #Resources in time
-    pend = Pendencies.objects.filter(resource__topic__subject = subject.id, resource__visible = True, end_date__date__lt = timezone.now(), end_date__date__gte = timezone.now() - timedelta(days = 7))
-
-    #query = Notification.objects.filter(task__id__in = pend, level__gte = 3).values('user_id', 'task_id').distinct()
-    item = {}
-
-    if pend.count() > 0:
-        conds = Q()
-
-        for p in pend:
-            conds.add((Q(context__contains = {p.resource._my_subclass+'_id': p.resource.id}) & Q(action = p.action)), Q.OR)
+    data.append(get_indicator(metrics['in_time'], user))
 
-        res_access = logs.filter(conds)
-
-        item["max_access"] = res_access.values('user_id').annotate(c_user = Count('user_id')).aggregate(Max('c_user'))['c_user__max'] if res_access else 0
-        item["my_access"] = res_access.filter(user_id = user.id).count()
-    else:
-        item["max_access"] = 0
-        item["my_access"] = 0
-    
-    data.append(item)
-
-    return data
\ No newline at end of file
+    return data
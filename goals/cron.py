@@ -11,10 +11,24 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 
+import logging
 import datetime
 from django_cron import CronJobBase, Schedule
 
-from .utils import set_goals
+from amadeus.jobs import ShardedJob, run_job, timings_report
+
+from .utils import get_closing_goals, set_goals
+
+logger = logging.getLogger(__name__)
+
+class GoalsJob(ShardedJob):
+	code = 'goals'
+
+	def get_shards(self):
+		return list(get_closing_goals().filter(goal__topic__subject__isnull = False).order_by().values_list('goal__topic__subject__id', flat = True).distinct())
+
+	def run_shard(self, shard):
+		set_goals(shard)
 
 class SetGoals(CronJobBase):
 	RUN_EVERY_MINS = 1440 # every day
@@ -23,7 +37,11 @@ class SetGoals(CronJobBase):
 	code = 'amadeus.goals_cron'    # a unique code
 
 	def do(self):
-		set_goals()
+		job = GoalsJob()
+
+		return timings_report(job, run_job(job))
 
 def setgoals_cron():
-	set_goals()
\ No newline at end of file
+	job = GoalsJob()
+
+	logger.info(timings_report(job, run_job(job)))
\ No newline at end of file
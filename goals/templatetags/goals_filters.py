@@ -45,7 +45,7 @@ def log_groups(user_id):
 
 @register.filter(name = 'creation_date')
 def creation_date(user, goal):
-	log = Log.objects.filter(user_id = user.id, action = 'submit', resource = 'goals', context__contains = {"goals_id": goal.id})
+	log = Log.objects.filter(user_id = user.id, action = 'submit', resource = 'goals', resource_type = 'goals', resource_id = goal.id)
 
 	if log.count() > 0:
 		return log[0].datetime
@@ -54,7 +54,7 @@ def creation_date(user, goal):
 
 @register.filter(name = 'update_date')
 def update_date(user, goal):
-	log = Log.objects.filter(user_id = user.id, action = 'update_submit', resource = 'goals', context__contains = {"goals_id": goal.id})
+	log = Log.objects.filter(user_id = user.id, action = 'update_submit', resource = 'goals', resource_type = 'goals', resource_id = goal.id)
 
 	if log.count() > 0:
 		return log[0].datetime
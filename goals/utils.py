@@ -30,16 +30,22 @@ from users.models import User
 
 from .models import GoalItem, MyGoals
 
-def set_goals():
-	specifications = GoalItem.objects.filter(goal__limit_submission_date__date = timezone.now())
+def get_closing_goals():
+	return GoalItem.objects.filter(goal__limit_submission_date__date = timezone.now()).select_related('goal__topic')
+
+def set_goals(subject_id = None):
+	specifications = get_closing_goals()
+
+	if not subject_id is None:
+		specifications = specifications.filter(goal__topic__subject__id = subject_id)
+
 	entries = []
 
 	for goal in specifications:
-		users = User.objects.filter(subject_student = goal.goal.topic.subject)
+		users = User.objects.filter(subject_student__id = goal.goal.topic.subject_id).exclude(user_goals__item = goal).values_list('id', flat = True)
 
-		for user in users:
-			if not MyGoals.objects.filter(user = user, item = goal).exists():
-				entries.append(MyGoals(user = user, item = goal, value = goal.ref_value))
+		for user_id in users:
+			entries.append(MyGoals(user_id = user_id, item = goal, value = goal.ref_value))
 
 	MyGoals.objects.bulk_create(entries)
 
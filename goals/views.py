@@ -21,6 +21,7 @@ from django.forms import formset_factory, modelformset_factory
 from django.http import JsonResponse
 
 from log.models import Log
+from topics.statistics import ResourceStatistics
 from log.mixins import LogMixin
 from log.decorators import log_decorator, log_decorator_ajax
 import time
@@ -42,7 +43,6 @@ from subjects.models import Subject
 
 from webpage.forms import FormModalMessage
 
-from django.db.models import Q
 from django.template.loader import render_to_string
 from django.utils import formats, timezone
 import textwrap
@@ -73,7 +73,7 @@ class Reports(LoginRequiredMixin, generic.ListView):
 
         users = goal.topic.subject.students.values_list('id')
 
-        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', context__contains = {"goals_id": goal.id}).values_list('user_id')
+        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', resource_type = 'goals', resource_id = goal.id).values_list('user_id')
 
         submited_users = User.objects.filter(id__in = submited)
 
@@ -110,7 +110,7 @@ class AnsweredReport(LoginRequiredMixin, generic.ListView):
 
         users = goal.topic.subject.students.values_list('id')
 
-        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', context__contains = {"goals_id": goal.id}).values_list('user_id')
+        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', resource_type = 'goals', resource_id = goal.id).values_list('user_id')
 
         submited_users = User.objects.filter(id__in = submited)
 
@@ -148,7 +148,7 @@ class UnansweredReport(LoginRequiredMixin, generic.ListView):
 
         users = goal.topic.subject.students.values_list('id', flat = True)
 
-        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', context__contains = {"goals_id": goal.id}).values_list('user_id', flat = True)
+        submited = Log.objects.filter(user_id__in = users, action = 'submit', resource = 'goals', resource_type = 'goals', resource_id = goal.id).values_list('user_id', flat = True)
 
         users = [i for i in users if i not in submited]
         
@@ -186,7 +186,7 @@ class HistoryReport(LoginRequiredMixin, generic.ListView):
         slug = self.kwargs.get('slug', '')
         goal = get_object_or_404(Goals, slug = slug)
 
-        rows = Log.objects.filter(context__contains = {"goals_id": goal.id}).exclude(action = 'view_reports')
+        rows = Log.objects.filter(resource_type = 'goals', resource_id = goal.id).exclude(action = 'view_reports')
         
         return rows
 
@@ -294,9 +294,9 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.ListView):
         self.log_context['goals_slug'] = goals.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+        log = super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -355,9 +355,9 @@ class NewWindowSubmit(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
         self.log_context['goals_slug'] = goals.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(NewWindowSubmit, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+        log = super(NewWindowSubmit, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         self.log_context = {}
         
@@ -494,9 +494,9 @@ class SubmitView(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
         self.log_context['goals_slug'] = goals.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(SubmitView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+        log = super(SubmitView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         self.log_context = {}
         
@@ -1066,7 +1066,7 @@ def reports_log(request, goal, report):
 
         request.log_context = log_context
 
-        log_id = Log.objects.latest('id').id
+        log_id = request.log_id
 
         return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -1125,47 +1125,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
             end_date = datetime.datetime.strptime(self.request.GET.get('end_date',''),date_format)
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = goal.students.all()
-        if goal.all_students :
-            alunos = goal.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'goals_id':goal.id},resource="goals",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1))).filter(Q(action="view") | Q(action="submit"))
+        statistics = ResourceStatistics(goal, "goals", ["view", "submit"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in goal.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
-
         column_view,column_submit = str(_('View')),str(_('Submitted'))
+        columns = [("view", column_view), ("submit", column_submit)]
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="view").distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in goal.topic.subject.group_subject.filter(participants__email=alun.email)]),column_view, str(alun.email)])
-            index += 1
-        
-        not_watch = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="submit").distinct("user_email")])
-        for alun in not_watch:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in goal.topic.subject.group_subject.filter(participants__email=alun.email)]),column_submit, str(alun.email)])
-            index += 1
-
-        json_n_did["data"] = data_n_did
+        context["json_n_did"] = {"data": statistics.get_not_did(columns)}
+        context["json_history"] = {"data": statistics.get_history()}
 
-
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.filter(action="view").distinct("user_email").count()
-        c_submit = vis_ou.filter(action="submit").distinct("user_email").count()
-        re.append([str(_('Goals')),did,n_did])
-        
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
-        re.append([column_submit,c_submit, alunos.count() - c_submit])
+        re = statistics.get_chart(str(_('Goals')), did, n_did, columns)
 
         context['view'] = column_view
         context['submit'] = column_submit
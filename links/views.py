@@ -22,7 +22,7 @@ from rolepermissions.mixins import HasRoleMixin
 
 from log.mixins import LogMixin
 from log.decorators import log_decorator_ajax
-from log.models import Log
+from topics.statistics import ResourceStatistics
 
 from django.contrib import messages
 from pendencies.forms import PendenciesForm
@@ -410,37 +410,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
             end_date = datetime.datetime.strptime(self.request.GET.get('end_date',''),date_format)
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = link.students.all()
-        if link.all_students :
-        	alunos = link.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'link_id':link.id},resource="link",action="view",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1)))
+        statistics = ResourceStatistics(link, "link", ["view"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in link.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
+        column_view = str(_('View'))
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in link.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('View')), str(alun.email)])
-            index += 1
-        json_n_did["data"] = data_n_did
+        context["json_n_did"] = {"data": statistics.get_not_did([("view", column_view)])}
+        context["json_history"] = {"data": statistics.get_history()}
 
+        re = statistics.get_chart(str(_('Links')), did, n_did, [("view", column_view)])
 
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.distinct("user_email").count()
-        column_view = str(_('View'))
-        re.append([str(_('Links')),did,n_did])
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
         context['topic'] = link.topic
         context['subject'] = link.topic.subject
         context['db_data'] = re
@@ -0,0 +1,171 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+import os
+import gzip
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Log
+from .partitions import month_bounds, partition_name, partition_month, is_partitioned, create_partition
+from .resources import touch_resources
+
+#Logs older than the retention period are kept as one gzip'd JSON lines file per month under MEDIA_ROOT
+def archive_dir():
+	return os.path.join(settings.MEDIA_ROOT, getattr(settings, 'LOG_ARCHIVE_DIR', 'log_archive'))
+
+def archive_path(month):
+	return os.path.join(archive_dir(), '%s.jsonl.gz' % partition_name(month))
+
+def month_logs(month):
+	start, end = month_bounds(month)
+
+	return Log.objects.filter(datetime__gte = start, datetime__lt = end)
+
+def write_archive(month):
+	path = archive_path(month)
+	temp_path = path + '.tmp'
+
+	os.makedirs(archive_dir(), exist_ok = True)
+
+	count = 0
+
+	with gzip.open(temp_path, 'wt', encoding = 'utf-8') as archive:
+		for log in month_logs(month).order_by('id').values().iterator():
+			archive.write(json.dumps(log, cls = DjangoJSONEncoder) + '\n')
+
+			count += 1
+
+	#gzip members can be concatenated, so a month archived twice keeps both parts
+	if os.path.exists(path):
+		with open(path, 'ab') as archive, open(temp_path, 'rb') as part:
+			archive.write(part.read())
+
+		os.remove(temp_path)
+	else:
+		os.rename(temp_path, path)
+
+	return count
+
+def read_archive(month):
+	path = archive_path(month)
+
+	if not os.path.exists(path):
+		return
+
+	with gzip.open(path, 'rt', encoding = 'utf-8') as archive:
+		for line in archive:
+			row = json.loads(line)
+			row['datetime'] = parse_datetime(row['datetime'])
+
+			yield Log(**row)
+
+def archived_months():
+	if not os.path.isdir(archive_dir()):
+		return []
+
+	months = [partition_month(name[:-len('.jsonl.gz')]) for name in os.listdir(archive_dir()) if name.endswith('.jsonl.gz')]
+
+	return sorted([month for month in months if not month is None])
+
+def aware_datetime(value):
+	#Dates are taken as the midnight of the day in the current timezone, as the datetime__range lookups do
+	if not isinstance(value, datetime):
+		value = datetime(value.year, value.month, value.day)
+
+	if timezone.is_naive(value):
+		value = timezone.make_aware(value)
+
+	return value
+
+def matches(log, filters):
+	for field, value in filters.items():
+		if field.endswith('__in'):
+			if not getattr(log, field[:-len('__in')]) in value:
+				return False
+		elif getattr(log, field) != value:
+			return False
+
+	return True
+
+def archived_logs(start, end, **filters):
+	"""
+		Yields the archived logs created between start and end (dates or datetimes, both included) whose fields
+		match the given values, or are in the given values for the '__in' ones.
+		Used by the query paths that need logs older than the retention period.
+	"""
+	start, end = aware_datetime(start), aware_datetime(end)
+
+	for month in archived_months():
+		month_begin, month_end = month_bounds(month)
+
+		if month_end <= start or month_begin > end:
+			continue
+
+		for log in read_archive(month):
+			if start <= log.datetime <= end and matches(log, filters):
+				yield log
+
+def is_archived(start):
+	"""
+		Tells whether logs created from start on may be on the archive, so the readers only open it when they need to
+	"""
+	months = archived_months()
+
+	return len(months) > 0 and aware_datetime(start) < month_bounds(months[-1])[1]
+
+def archive_month(month):
+	count = write_archive(month)
+
+	if is_partitioned():
+		with connection.cursor() as cursor:
+			cursor.execute("DROP TABLE IF EXISTS %s" % partition_name(month))
+	else:
+		month_logs(month).delete()
+
+	return count
+
+def restore_month(month, batch_size = 1000):
+	if not os.path.exists(archive_path(month)):
+		return 0
+
+	if is_partitioned():
+		create_partition(month)
+
+	batch = []
+	count = 0
+
+	for log in read_archive(month):
+		batch.append(log)
+
+		if len(batch) == batch_size:
+			Log.objects.bulk_create(batch)
+			touch_resources(batch)
+			count += len(batch)
+			batch = []
+
+	if batch:
+		Log.objects.bulk_create(batch)
+		touch_resources(batch)
+		count += len(batch)
+
+	os.remove(archive_path(month))
+
+	return count
@@ -11,12 +11,12 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 
-import json
-import time
 from functools import wraps
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 
 from .models import Log
+from .sink import log_sink
+from .utils import open_log, close_logs
 
 def log_decorator(log_component = '', log_action = '', log_resource = ''):
 
@@ -50,7 +50,7 @@ def log_decorator(log_component = '', log_action = '', log_resource = ''):
 				log.action = log_action
 				log.resource = log_resource
 
-				log.save()
+				request.log = log_sink.write(log)
 
 			return response
 
@@ -77,7 +77,11 @@ def log_decorator_ajax(log_component = '', log_action = '', log_resource = ''):
 					log.action = log_action
 					log.resource = log_resource
 
-					log.save()
+					log_sink.write(log, sync = True)
+
+					#Views return this id to the page so it can close the log later
+					request.log = log
+					request.log_id = log.id
 
 					response = view_function(request, *args, **kwargs)
 					
@@ -86,24 +90,16 @@ def log_decorator_ajax(log_component = '', log_action = '', log_resource = ''):
 					if hasattr(request, 'log_context'):
 						log_context = request.log_context
 
-					log = Log.objects.latest('id')
 					log.context = log_context
-					log.save()
+					log.save(update_fields = ['context'])
+
+					if type(log_context) == dict and log_context.get('timestamp_end') == '-1':
+						open_log(log)
 					
 			elif view_action == 'close':
 				if request.user.is_authenticated:
-					log = get_object_or_404(Log, id = request.GET.get('log_id'))
-
-					if type(log.context) == dict:
-						log_context = log.context
-					else:
-						log_context = json.loads(log.context)
-
-					log_context['timestamp_end'] = str(int(time.time()))
-
-					log.context = log_context
-
-					log.save()
+					if not close_logs([request.GET.get('log_id')]):
+						raise Http404
 
 					response = view_function(request, *args, **kwargs)
 
@@ -0,0 +1,45 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from log.archive import archive_month, month_logs
+from log.models import Log
+from log.partitions import add_months, get_partitions, is_partitioned, month_bounds, month_start
+
+class Command(BaseCommand):
+	help = "Moves the logs older than the retention period to gzip'd JSON lines files under MEDIA_ROOT"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--semesters', type = int, default = getattr(settings, 'LOG_RETENTION_SEMESTERS', None), help = "Number of semesters kept on the database, LOG_RETENTION_SEMESTERS by default")
+		parser.add_argument('--dry-run', action = 'store_true', help = "Only list the months that would be archived")
+
+	def handle(self, *args, **options):
+		if not options['semesters']:
+			raise CommandError("Log archiving is disabled, set LOG_RETENTION_SEMESTERS or pass --semesters")
+
+		cutoff = add_months(month_start(timezone.now()), -6 * options['semesters'])
+
+		if is_partitioned():
+			months = [month for month in get_partitions() if month < cutoff]
+		else:
+			months = [month_start(month) for month in Log.objects.filter(datetime__lt = month_bounds(cutoff)[0]).datetimes('datetime', 'month', tzinfo = timezone.utc)]
+
+		for month in months:
+			if options['dry_run']:
+				self.stdout.write("%s: %d logs" % (month.strftime('%Y-%m'), month_logs(month).count()))
+			else:
+				self.stdout.write("%s: %d logs archived" % (month.strftime('%Y-%m'), archive_month(month)))
@@ -0,0 +1,55 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from log.models import Log, RESOURCE_TYPES
+
+def context_int_sql(key):
+	return "CASE WHEN context->>'%s' ~ '^[0-9]+$' THEN (context->>'%s')::integer END" % (key, key)
+
+class Command(BaseCommand):
+	help = "Copies subject, category and resource ids from the context of existing logs to their indexed columns"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--batch-size', type = int, default = 50000, help = "Number of log ids updated per transaction")
+
+	def handle(self, *args, **options):
+		batch_size = options['batch_size']
+
+		ids = Log.objects.aggregate(first = Min('id'), last = Max('id'))
+
+		if ids['first'] is None:
+			return
+
+		resource_type = "CASE %s END" % " ".join(["WHEN context->>'%s_id' ~ '^[0-9]+$' THEN '%s'" % (rtype, rtype) for rtype in RESOURCE_TYPES])
+		resource_id = "COALESCE(%s)" % ", ".join([context_int_sql(rtype + '_id') for rtype in RESOURCE_TYPES])
+
+		sql = "UPDATE log_log SET subject_id = %s, category_id = %s, resource_type = %s, resource_id = %s " \
+			"WHERE id >= %%s AND id < %%s AND jsonb_typeof(context) = 'object'" % (context_int_sql('subject_id'), context_int_sql('category_id'), resource_type, resource_id)
+
+		updated = 0
+
+		for start in range(ids['first'], ids['last'] + 1, batch_size):
+			with transaction.atomic():
+				with connection.cursor() as cursor:
+					cursor.execute(sql, [start, start + batch_size])
+
+					updated += cursor.rowcount
+
+			self.stdout.write("Logs up to id %d done" % min(start + batch_size - 1, ids['last']))
+
+		self.stdout.write(self.style.SUCCESS("%d logs updated" % updated))
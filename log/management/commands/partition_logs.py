@@ -0,0 +1,44 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+from log.partitions import convert_table, ensure_partitions, is_partitioned, partition_name, supports_partitioning
+
+class Command(BaseCommand):
+	help = "Creates the upcoming monthly partitions of the log table, or converts it to a partitioned table with --convert"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--convert', action = 'store_true', help = "Recreate log_log as a partitioned table, keeping the old one as log_log_legacy")
+		parser.add_argument('--months-ahead', type = int, default = 3, help = "Number of future months that must have a partition")
+
+	def handle(self, *args, **options):
+		if not supports_partitioning():
+			raise CommandError("Partitioning the log table needs PostgreSQL 11 or newer")
+
+		if options['convert']:
+			if is_partitioned():
+				raise CommandError("The log table is already partitioned")
+
+			convert_table(options['months_ahead'])
+
+			self.stdout.write(self.style.SUCCESS("Log table partitioned. Check the data and drop log_log_legacy when done"))
+
+			return
+
+		if not is_partitioned():
+			raise CommandError("The log table is not partitioned, run this command with --convert first")
+
+		for month in ensure_partitions(options['months_ahead']):
+			self.stdout.write("Created %s" % partition_name(month))
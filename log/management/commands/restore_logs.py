@@ -0,0 +1,45 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.utils import rollup_month
+from log.archive import archived_months, restore_month
+from log.partitions import month_start
+
+class Command(BaseCommand):
+	help = "Loads archived months (YYYY-MM) back into the log table and summarizes their days again on the daily activity"
+
+	def add_arguments(self, parser):
+		parser.add_argument('months', nargs = '*', help = "Months to restore, all archived months are listed when none is given")
+
+	def handle(self, *args, **options):
+		if not options['months']:
+			for month in archived_months():
+				self.stdout.write(month.strftime('%Y-%m'))
+
+			return
+
+		for value in options['months']:
+			try:
+				month = month_start(datetime.strptime(value, '%Y-%m'))
+			except ValueError:
+				raise CommandError("Invalid month %s, use YYYY-MM" % value)
+
+			self.stdout.write("%s: %d logs restored" % (value, restore_month(month)))
+
+			#The daily activity of the month may have been summarized without them
+			rollup_month(month)
@@ -11,12 +11,9 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 
-import time
-import json
 from django.core.urlresolvers import resolve
-from django.shortcuts import get_object_or_404
 
-from .models import Log
+from .utils import close_logs, close_user_logs
 
 class TimeSpentMiddleware(object):
 	def __init__(self, get_response = None):
@@ -31,32 +28,10 @@ class TimeSpentMiddleware(object):
 					log_id = request.session.get('log_id', None)
 
 					if not log_id is None:
-						log = get_object_or_404(Log, id = log_id)
-
-						if type(log.context) == dict:
-							log_context = log.context
-						else:
-							log_context = json.loads(log.context)
-
-						log_context['timestamp_end'] = str(int(time.time()))
-
-						log.context = log_context
-
-						log.save()
-
 						request.session['log_id'] = None
 
+					#Closes the last viewed page and every log left open by the user in one update
 					if request.user.is_authenticated:
-						oppened_logs = Log.objects.filter(user = request.user, context__contains={'timestamp_end': '-1'})
-
-						for op_log in oppened_logs:
-							if type(op_log.context) == dict:
-								log_context = op_log.context
-							else:
-								log_context = json.loads(op_log.context)
-
-							log_context['timestamp_end'] = str(int(time.time()))
-
-							op_log.context = log_context
-
-							op_log.save()
\ No newline at end of file
+						close_user_logs(request.user.id, [log_id])
+					elif not log_id is None:
+						close_logs([log_id])
\ No newline at end of file
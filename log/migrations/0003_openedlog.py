@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 10:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('log', '0002_log_datetime_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpenedLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_id', models.IntegerField(unique=True, verbose_name='Log id')),
+                ('user_id', models.IntegerField(db_index=True, verbose_name='Actor id')),
+                ('timestamp_start', models.DateTimeField(auto_now_add=True, verbose_name='Opened at')),
+            ],
+            options={
+                'verbose_name': 'Opened log',
+                'verbose_name_plural': 'Opened logs',
+            },
+        ),
+        # Logs left open before the tracker existed
+        migrations.RunSQL(
+            "INSERT INTO log_openedlog (log_id, user_id, timestamp_start) SELECT id, user_id, datetime FROM log_log WHERE context @> '{\"timestamp_end\": \"-1\"}'",
+            migrations.RunSQL.noop,
+        ),
+    ]
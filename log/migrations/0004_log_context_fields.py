@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 11:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('log', '0003_openedlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='log',
+            name='category_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Category id'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='resource_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Resource id'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='resource_type',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name='Resource type'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='subject_id',
+            field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Subject id'),
+        ),
+        migrations.AlterIndexTogether(
+            name='log',
+            index_together=set([('user_id', 'datetime'), ('resource', 'action', 'datetime')]),
+        ),
+    ]
@@ -14,6 +14,7 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 import json
 
 from .models import Log
+from .sink import log_sink
 
 from users.models import User
 
@@ -47,7 +48,10 @@ class LogMixin(object):
 			else:
 				log.resource = log_resource
 
-			log.save()
+			#Logs tracked by the time spent middleware need their id right away
+			return log_sink.write(log, sync = 'timestamp_start' in log.context)
+
+		return None
 
 	def dispatch(self, request, *args, **kwargs):
 		return super(LogMixin, self).dispatch(request, *args, **kwargs)
\ No newline at end of file
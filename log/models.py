@@ -13,8 +13,28 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 
 from django.db import models
 from django.contrib.postgres.fields import JSONField
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from .resources import touch_resources
+
+#Resource subclasses logged as '<type>_id' keys of the context
+RESOURCE_TYPES = ['bulletin', 'filelink', 'goals', 'link', 'pdffile', 'questionary', 'webconference', 'webpage', 'ytvideo']
+
+#Columns copied from the context when the log is written
+CONTEXT_FIELDS = ['subject_id', 'category_id', 'resource_type', 'resource_id']
+
+def context_int(context, key):
+	value = context.get(key, None)
+
+	if type(value) == int:
+		return value
+
+	if type(value) == str and value.isdigit():
+		return int(value)
+
+	return None
+
 class Log(models.Model):
 	component = models.TextField(_('Component (Module / App)'))
 	context = JSONField(_('Context'), blank = True)
@@ -23,11 +43,61 @@ class Log(models.Model):
 	user = models.CharField(_('Actor'), max_length = 100)
 	user_id = models.IntegerField(_('Actor id'))
 	user_email = models.EmailField(_('Actor Mail'))
-	datetime = models.DateTimeField(_("Date and Time of action"), auto_now_add = True)
+	#Not auto_now_add so buffered and restored logs keep the time they were created
+	datetime = models.DateTimeField(_("Date and Time of action"), default = timezone.now, editable = False)
+	subject_id = models.IntegerField(_('Subject id'), null = True, blank = True, db_index = True)
+	category_id = models.IntegerField(_('Category id'), null = True, blank = True, db_index = True)
+	resource_type = models.CharField(_('Resource type'), max_length = 50, null = True, blank = True, db_index = True)
+	resource_id = models.IntegerField(_('Resource id'), null = True, blank = True, db_index = True)
 
 	class Meta:
 		verbose_name = _('Log')
 		verbose_name_plural = _('Logs')
+		index_together = [
+			['user_id', 'datetime'],
+			['resource', 'action', 'datetime'],
+		]
+
+	def __str__(self):
+		return str(self.user) + ' / ' + self.component
+
+	def set_context_fields(self):
+		context = self.context if type(self.context) == dict else {}
+
+		self.subject_id = context_int(context, 'subject_id')
+		self.category_id = context_int(context, 'category_id')
+		self.resource_type = None
+		self.resource_id = None
+
+		for resource_type in RESOURCE_TYPES:
+			resource_id = context_int(context, resource_type + '_id')
+
+			if not resource_id is None:
+				self.resource_type = resource_type
+				self.resource_id = resource_id
+
+				break
+
+	def save(self, *args, **kwargs):
+		self.set_context_fields()
+
+		update_fields = kwargs.get('update_fields', None)
+
+		if not update_fields is None and 'context' in update_fields:
+			kwargs['update_fields'] = list(update_fields) + CONTEXT_FIELDS
+
+		super(Log, self).save(*args, **kwargs)
+
+		touch_resources([self])
+
+class OpenedLog(models.Model):
+	log_id = models.IntegerField(_('Log id'), unique = True)
+	user_id = models.IntegerField(_('Actor id'), db_index = True)
+	timestamp_start = models.DateTimeField(_('Opened at'), auto_now_add = True)
+
+	class Meta:
+		verbose_name = _('Opened log')
+		verbose_name_plural = _('Opened logs')
 
 	def __str__(self):
-		return str(self.user) + ' / ' + self.component
\ No newline at end of file
+		return str(self.log_id)
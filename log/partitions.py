@@ -0,0 +1,134 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+import re
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+#Monthly range partitioning of log_log on the datetime column.
+#Partitions are named log_log_yYYYYmMM and rows outside of them land on log_log_default.
+TABLE = 'log_log'
+DEFAULT_PARTITION = 'log_log_default'
+LEGACY_TABLE = 'log_log_legacy'
+
+def month_start(value):
+	return date(value.year, value.month, 1)
+
+def add_months(month, months):
+	index = month.year * 12 + month.month - 1 + months
+
+	return date(index // 12, index % 12 + 1, 1)
+
+def month_bounds(month):
+	next_month = add_months(month, 1)
+
+	return (datetime(month.year, month.month, 1, tzinfo = timezone.utc), datetime(next_month.year, next_month.month, 1, tzinfo = timezone.utc))
+
+def partition_name(month):
+	return '%s_y%04dm%02d' % (TABLE, month.year, month.month)
+
+def partition_month(name):
+	match = re.match(r'^%s_y(\d{4})m(\d{2})$' % TABLE, name)
+
+	if match is None:
+		return None
+
+	return date(int(match.group(1)), int(match.group(2)), 1)
+
+#Declarative partitioning with a DEFAULT partition (and so ATTACH/DETACH of it) needs PostgreSQL 11
+MIN_SERVER_VERSION = 110000
+
+def supports_partitioning():
+	return connection.vendor == 'postgresql' and connection.pg_version >= MIN_SERVER_VERSION
+
+def is_partitioned():
+	if not supports_partitioning():
+		return False
+
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)", [TABLE])
+
+		return cursor.fetchone()[0]
+
+def get_partitions():
+	"""
+		Returns the months that have a partition, oldest first
+	"""
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass", [TABLE])
+
+		months = [partition_month(row[0]) for row in cursor.fetchall()]
+
+	return sorted([month for month in months if not month is None])
+
+def create_partition(month):
+	"""
+		Creates the partition of the given month, moving the rows of that month that were written on the default partition
+	"""
+	name = partition_name(month)
+	bounds = month_bounds(month)
+
+	with transaction.atomic():
+		with connection.cursor() as cursor:
+			cursor.execute("SELECT to_regclass(%s)", [name])
+
+			if not cursor.fetchone()[0] is None:
+				return False
+
+			cursor.execute("ALTER TABLE %s DETACH PARTITION %s" % (TABLE, DEFAULT_PARTITION))
+			cursor.execute("CREATE TABLE %s PARTITION OF %s FOR VALUES FROM ('%s') TO ('%s')" % (name, TABLE, bounds[0].isoformat(), bounds[1].isoformat()))
+			cursor.execute("WITH moved AS (DELETE FROM %s WHERE datetime >= %%s AND datetime < %%s RETURNING *) INSERT INTO %s SELECT * FROM moved" % (DEFAULT_PARTITION, TABLE), list(bounds))
+			cursor.execute("ALTER TABLE %s ATTACH PARTITION %s DEFAULT" % (TABLE, DEFAULT_PARTITION))
+
+	return True
+
+def ensure_partitions(months_ahead = 3):
+	current = month_start(timezone.now())
+
+	return [month for month in [add_months(current, i) for i in range(months_ahead + 1)] if create_partition(month)]
+
+def convert_table(months_ahead = 3):
+	"""
+		Moves log_log to log_log_legacy and recreates it as a partitioned table with the same columns and indexes.
+		Must run while the application is stopped, it copies every log row.
+	"""
+	with transaction.atomic():
+		with connection.cursor() as cursor:
+			cursor.execute("SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s", [TABLE, TABLE + '_pkey'])
+			indexes = [re.search(r'USING .*$', row[0]).group(0) for row in cursor.fetchall()]
+
+			cursor.execute("ALTER TABLE %s RENAME TO %s" % (TABLE, LEGACY_TABLE))
+			cursor.execute("CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS, PRIMARY KEY (id, datetime)) PARTITION BY RANGE (datetime)" % (TABLE, LEGACY_TABLE))
+			cursor.execute("ALTER SEQUENCE %s_id_seq OWNED BY %s.id" % (TABLE, TABLE))
+			cursor.execute("CREATE TABLE %s PARTITION OF %s DEFAULT" % (DEFAULT_PARTITION, TABLE))
+
+			for index in indexes:
+				cursor.execute("CREATE INDEX ON %s %s" % (TABLE, index))
+
+			cursor.execute("SELECT min(datetime) FROM %s" % LEGACY_TABLE)
+			first = cursor.fetchone()[0]
+
+			month = month_start(first if not first is None else timezone.now())
+			last = add_months(month_start(timezone.now()), months_ahead)
+
+			while month <= last:
+				bounds = month_bounds(month)
+
+				cursor.execute("CREATE TABLE %s PARTITION OF %s FOR VALUES FROM ('%s') TO ('%s')" % (partition_name(month), TABLE, bounds[0].isoformat(), bounds[1].isoformat()))
+
+				month = add_months(month, 1)
+
+			cursor.execute("INSERT INTO %s SELECT * FROM %s" % (TABLE, LEGACY_TABLE))
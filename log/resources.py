@@ -0,0 +1,49 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# Versions of the logs of each resource, used as part of the cache keys of data computed from them (see topics.statistics).
+# Writing a log of a resource changes its version, so what was cached from its older logs is no longer read
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = "resource-logs-%s-%s"
+
+def get_cache():
+	return caches[getattr(settings, 'STATISTICS_CACHE', 'default')]
+
+def get_version(resource_type, resource_id):
+	key = VERSION_KEY % (resource_type, resource_id)
+	version = get_cache().get(key)
+
+	if version is None:
+		version = str(time.time())
+
+		get_cache().add(key, version, None)
+
+		version = get_cache().get(key, version)
+
+	return version
+
+def touch_resources(logs):
+	"""
+		Changes the versions of the resources of the logs (their resource_type and resource_id columns)
+	"""
+	keys = set(VERSION_KEY % (log.resource_type, log.resource_id) for log in logs if log.resource_type and log.resource_id)
+
+	if keys:
+		version = str(time.time())
+
+		get_cache().set_many({key: version for key in keys}, None)
@@ -0,0 +1,114 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+import os
+import copy
+import queue
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import Log
+from .resources import touch_resources
+
+logger = logging.getLogger(__name__)
+
+class LogSink(object):
+	"""
+		Buffers Log rows in process and writes them with bulk_create, either when
+		the buffer reaches LOG_BUFFER_SIZE rows or every LOG_FLUSH_INTERVAL seconds
+	"""
+
+	def __init__(self):
+		self.queue = queue.Queue()
+		self.wakeup = threading.Event()
+		self.lock = threading.Lock()
+		self.worker = None
+		self.pid = None
+
+	@property
+	def enabled(self):
+		return getattr(settings, 'LOG_BUFFER_ENABLED', True)
+
+	@property
+	def batch_size(self):
+		return getattr(settings, 'LOG_BUFFER_SIZE', 200)
+
+	@property
+	def flush_interval(self):
+		return getattr(settings, 'LOG_FLUSH_INTERVAL', 5)
+
+	def write(self, log, sync = False):
+		if sync or not self.enabled:
+			log.save()
+
+			return log
+
+		#Views reuse the same context dict between requests, so keep a snapshot of it
+		log.context = copy.deepcopy(log.context)
+		log.set_context_fields()
+
+		self.start()
+		self.queue.put(log)
+
+		if self.queue.qsize() >= self.batch_size:
+			self.wakeup.set()
+
+		return log
+
+	def start(self):
+		#Restart the worker on forked processes (e.g. gunicorn workers)
+		if self.worker is not None and self.pid == os.getpid() and self.worker.is_alive():
+			return
+
+		with self.lock:
+			if self.worker is None or self.pid != os.getpid() or not self.worker.is_alive():
+				self.pid = os.getpid()
+				self.worker = threading.Thread(target = self.run, name = 'log-sink', daemon = True)
+				self.worker.start()
+
+	def run(self):
+		while True:
+			self.wakeup.wait(self.flush_interval)
+			self.wakeup.clear()
+
+			self.flush()
+
+	def flush(self):
+		logs = []
+
+		while True:
+			try:
+				logs.append(self.queue.get_nowait())
+			except queue.Empty:
+				break
+
+		for i in range(0, len(logs), self.batch_size):
+			batch = logs[i:i + self.batch_size]
+
+			try:
+				Log.objects.bulk_create(batch)
+
+				touch_resources(batch)
+			except DatabaseError:
+				logger.exception("Could not write %d buffered log rows", len(batch))
+
+		return len(logs)
+
+log_sink = LogSink()
+
+atexit.register(log_sink.flush)
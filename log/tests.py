@@ -11,6 +11,161 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users.models import User
+
+from .archive import archive_month, archived_logs, archived_months, is_archived, restore_month
+from .cron import archive_cron
+from .mixins import LogMixin
+from .models import Log, OpenedLog
+from .partitions import add_months, partition_name, partition_month
+from .sink import LogSink
+from .utils import open_log, close_user_logs
+
+class InlineLogSink(LogSink):
+	#Flushes are triggered by the test itself instead of the worker thread
+	def start(self):
+		pass
+
+@override_settings(LOG_BUFFER_ENABLED = True)
+class LogSinkTest(TestCase):
+
+	def setUp(self):
+		self.sink = InlineLogSink()
+
+	def new_log(self, context = None):
+		return Log(component = "test", action = "view", resource = "test", user = "tester", user_id = 1, user_email = "tester@amadeus.br", context = context or {})
+
+	def test_buffered_write(self):
+		context = {'subject_id': 1}
+
+		self.sink.write(self.new_log(context))
+		context['subject_id'] = 2
+
+		self.assertEqual(Log.objects.count(), 0)
+		self.assertEqual(self.sink.flush(), 1)
+		self.assertEqual(Log.objects.count(), 1)
+		self.assertEqual(Log.objects.get().context, {'subject_id': 1})
+
+	def test_buffered_time(self):
+		#Buffered rows keep the time they were created, not the time of the flush
+		log = self.new_log()
+		log.datetime = timezone.now() - timedelta(minutes = 1)
+
+		self.sink.write(log)
+		self.sink.flush()
+
+		self.assertEqual(Log.objects.get().datetime, log.datetime)
+
+	def test_sync_write(self):
+		log = self.sink.write(self.new_log(), sync = True)
+
+		self.assertIsNotNone(log.id)
+		self.assertEqual(self.sink.flush(), 0)
+
+	@override_settings(LOG_BUFFER_ENABLED = False)
+	def test_disabled_buffer(self):
+		self.sink.write(self.new_log())
+
+		self.assertEqual(Log.objects.count(), 1)
+
+
+class LogMixinTest(TestCase):
+
+	def setUp(self):
+		self.user = User.objects.create(username = "student01", email = "student01@amadeus.br")
+
+	def test_create_log_returns_tracked_log(self):
+		log = LogMixin().createLog(self.user, "subject", "view", "subject", {'subject_id': 1, 'timestamp_start': '0'})
+
+		self.assertIsNotNone(log.id)
+		self.assertEqual(Log.objects.get(id = log.id).context['subject_id'], 1)
+
+class TimeSpentTest(TestCase):
+
+	def new_log(self, user_id):
+		return Log.objects.create(component = "test", action = "view", resource = "test", user = "tester", user_id = user_id, user_email = "tester@amadeus.br", context = {'timestamp_start': '0', 'timestamp_end': '-1'})
+
+	def test_close_user_logs(self):
+		first = self.new_log(1)
+		second = self.new_log(1)
+		other = self.new_log(2)
+
+		for log in [first, second, other]:
+			open_log(log)
+
+		self.assertEqual(close_user_logs(1), 2)
+		self.assertEqual(OpenedLog.objects.filter(user_id = 1).count(), 0)
+		self.assertEqual(OpenedLog.objects.filter(user_id = 2).count(), 1)
+		self.assertNotEqual(Log.objects.get(id = first.id).context['timestamp_end'], '-1')
+		self.assertEqual(Log.objects.get(id = other.id).context['timestamp_end'], '-1')
+
+class ContextFieldsTest(TestCase):
+
+	def test_context_columns(self):
+		log = Log.objects.create(component = "resources", action = "view", resource = "ytvideo", user = "tester", user_id = 1, user_email = "tester@amadeus.br", context = {'subject_id': 2, 'category_id': '3', 'ytvideo_id': 4})
+
+		self.assertEqual((log.subject_id, log.category_id, log.resource_type, log.resource_id), (2, 3, 'ytvideo', 4))
+		self.assertEqual(Log.objects.filter(resource_type = 'ytvideo', resource_id = 4).count(), 1)
+
+class PartitionsTest(TestCase):
+
+	def test_months(self):
+		self.assertEqual(add_months(date(2018, 11, 1), 3), date(2019, 2, 1))
+		self.assertEqual(add_months(date(2018, 1, 1), -1), date(2017, 12, 1))
+		self.assertEqual(partition_name(date(2018, 3, 1)), 'log_log_y2018m03')
+		self.assertEqual(partition_month('log_log_y2018m03'), date(2018, 3, 1))
+		self.assertIsNone(partition_month('log_log_default'))
+
+class ArchiveTest(TestCase):
+
+	def setUp(self):
+		self.media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.media)
+
+		self.month = date(2015, 3, 1)
+		self.first = self.new_log(1, datetime(2015, 3, 2, 12, tzinfo = timezone.utc))
+		self.second = self.new_log(2, datetime(2015, 3, 20, 12, tzinfo = timezone.utc))
+		self.recent = self.new_log(1, timezone.now())
+
+	def new_log(self, user_id, when):
+		return Log.objects.create(component = "test", action = "view", resource = "test", user = "tester", user_id = user_id, user_email = "tester@amadeus.br", context = {'subject_id': 5}, datetime = when)
+
+	def test_disabled_by_default(self):
+		with self.settings(MEDIA_ROOT = self.media, LOG_RETENTION_SEMESTERS = None):
+			archive_cron()
+
+			self.assertEqual(Log.objects.count(), 3)
+			self.assertEqual(archived_months(), [])
+
+	def test_archive_cron(self):
+		with self.settings(MEDIA_ROOT = self.media, LOG_RETENTION_SEMESTERS = 2):
+			archive_cron()
+
+			self.assertEqual(list(Log.objects.values_list('id', flat = True)), [self.recent.id])
+			self.assertEqual(archived_months(), [self.month])
+
+	def test_archived_logs(self):
+		with self.settings(MEDIA_ROOT = self.media):
+			self.assertEqual(archive_month(self.month), 2)
+			self.assertEqual(Log.objects.count(), 1)
+
+			self.assertTrue(is_archived(date(2015, 1, 1)))
+			self.assertFalse(is_archived(date(2015, 4, 1)))
+
+			self.assertEqual([log.id for log in archived_logs(date(2015, 3, 1), date(2015, 3, 31), subject_id = 5, user_id__in = {1})], [self.first.id])
+			self.assertEqual(len(list(archived_logs(date(2015, 3, 10), date(2015, 3, 31)))), 1)
+
+	def test_restore(self):
+		with self.settings(MEDIA_ROOT = self.media):
+			archive_month(self.month)
+
+			self.assertEqual(restore_month(self.month), 2)
+			self.assertEqual(archived_months(), [])
+			self.assertEqual(Log.objects.get(id = self.first.id).datetime, self.first.datetime)
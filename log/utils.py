@@ -0,0 +1,48 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+import json
+import time
+
+from django.contrib.postgres.fields import JSONField
+from django.db.models import F, Func, Value
+
+from .models import Log, OpenedLog
+
+def open_log(log):
+	OpenedLog.objects.create(log_id = log.id, user_id = log.user_id)
+
+def close_logs(log_ids):
+	"""
+		Sets the timestamp_end of the given logs with a single UPDATE and drops them from the opened logs
+	"""
+	log_ids = [int(log_id) for log_id in log_ids if str(log_id).isdigit()]
+
+	if not log_ids:
+		return 0
+
+	timestamp_end = json.dumps(str(int(time.time())))
+
+	closed = Log.objects.filter(id__in = log_ids).extra(where = ["jsonb_typeof(context) = 'object'"]).update(
+		context = Func(F('context'), Value('{timestamp_end}'), Value(timestamp_end), function = 'jsonb_set', output_field = JSONField())
+	)
+
+	OpenedLog.objects.filter(log_id__in = log_ids).delete()
+
+	return closed
+
+def close_user_logs(user_id, log_ids = []):
+	opened = OpenedLog.objects.filter(user_id = user_id).values_list('log_id', flat = True)
+
+	return close_logs(list(opened) + list(log_ids))
@@ -14,13 +14,34 @@ from channels import Group
 from channels.sessions import channel_session
 from channels.auth import channel_session_user, channel_session_user_from_http
 
+from amadeus.websocket import get_user_groups
+from users.presence import touch
+
 # Connected to websocket.connect
 @channel_session_user_from_http
 def ws_add(message):
     # Accept connection
     message.reply_channel.send({"accept": True})
-    # Add them to the right group
-    Group("user-%s" % message.user.id).add(message.reply_channel)
+    # Add them to their own group and to the groups of the spaces they follow
+    if message.user.is_authenticated:
+        groups = get_user_groups(message.user)
+
+        for group in groups:
+            Group(group).add(message.reply_channel)
+
+        message.channel_session['groups'] = groups
+
+        touch(message.user.id)
+
+# Connected to websocket.disconnect
+@channel_session_user
+def ws_disconnect(message):
+    for group in message.channel_session.get('groups', []):
+        Group(group).discard(message.reply_channel)
+
+    # Closing a page is not a logout, only the last seen time changes
+    if message.user.is_authenticated:
+        touch(message.user.id)
 
 
 def ws_message(message):
@@ -0,0 +1,102 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from amadeus.counters import increment
+from amadeus.websocket import get_space_groups, send_to_groups, user_group
+
+from api.utils import sendMuralPushNotifications
+
+from .models import MuralFanout, MuralVisualizations
+from .utils import getSpace, getUsersBySpace
+
+def queue_fanout(user, post, notification, simple_notify = "", comment = None, visualize = False):
+	"""
+		Sends the websocket notification of a mural change to the groups of the post space and stores the rest of the
+		delivery (visualizations, pushes, per user messages), that the workers do in batches.
+		With visualize the receivers also get an unread visualization of the post (or of the comment, if given)
+	"""
+	space_type, space, resource = getSpace(post)
+	groups = get_space_groups(space_type, space, resource)
+
+	#The author is in the space groups too, its pages ignore the messages it sent
+	if user:
+		notification['sender'] = user.id
+
+	notification = json.dumps(notification)
+
+	if groups:
+		send_to_groups(groups, notification)
+
+		if not visualize and not simple_notify:
+			return None
+
+	return MuralFanout.objects.create(user = user, post = post if visualize and comment is None else None, comment = comment if visualize else None, space_type = space_type, space = space, resource = resource, notification = notification, simple_notify = simple_notify, visualize = visualize)
+
+def fanout_batch(job, batch_size):
+	users = list(getUsersBySpace(job.user_id, job.space_type, job.space, job.resource).filter(id__gt = job.last_user).order_by('id').values_list('id', flat = True)[:batch_size])
+
+	if not users:
+		job.delete()
+
+		return 0
+
+	#The post (or comment) may have been deleted before its turn came
+	if job.visualize and (job.post_id or job.comment_id):
+		MuralVisualizations.objects.bulk_create([MuralVisualizations(viewed = False, user_id = user, post_id = job.post_id, comment_id = job.comment_id) for user in users])
+
+		if job.space_type == "categorypost":
+			increment(users, 'mural', category = job.space)
+		elif job.space_type == "subjectpost":
+			increment(users, 'mural', subject = job.space, resource = job.resource)
+		else:
+			increment(users, 'mural')
+
+	if job.simple_notify and job.user:
+		sendMuralPushNotifications(users, job.user, job.simple_notify)
+
+	#Spaces without websocket groups are notified user by user
+	if not get_space_groups(job.space_type, job.space, job.resource):
+		send_to_groups([user_group(user) for user in users], job.notification)
+
+	job.last_user = users[-1]
+	job.save(update_fields = ['last_user'])
+
+	return len(users)
+
+def run_fanouts(limit = 100):
+	"""
+		Delivers up to limit batches, each one in its own transaction so an interrupted job resumes after its last delivered user
+	"""
+	batch_size = getattr(settings, 'MURAL_FANOUT_BATCH_SIZE', 500)
+	batches = 0
+
+	while batches < limit:
+		with transaction.atomic():
+			#Locked jobs are being delivered by another worker
+			jobs = list(MuralFanout.objects.raw("SELECT * FROM mural_muralfanout ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED"))
+
+			if not jobs:
+				break
+
+			fanout_batch(jobs[0], batch_size)
+
+		batches += 1
+
+	return batches
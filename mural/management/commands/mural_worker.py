@@ -0,0 +1,45 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from mural.fanout import run_fanouts
+
+class Command(BaseCommand):
+	help = "Delivers the queued mural posts, comments, editions and deletions to the space users in batches"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--once', action = 'store_true', help = "Deliver what is queued and exit")
+		parser.add_argument('--limit', type = int, default = 100, help = "Maximum batches delivered on each round")
+
+	def handle(self, *args, **options):
+		interval = getattr(settings, 'MURAL_FANOUT_POLL_INTERVAL', 1)
+
+		while True:
+			close_old_connections()
+
+			batches = run_fanouts(options['limit'])
+
+			if options['once']:
+				self.stdout.write("Delivered %d batches" % batches)
+
+				break
+
+			if batches < options['limit']:
+				time.sleep(interval)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 16:10
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('mural', '0009_muralvisualizations_date_viewed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuralFanout',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('space_type', models.CharField(max_length=20, verbose_name='Space type')),
+                ('space', models.IntegerField(default=0, verbose_name='Space')),
+                ('resource', models.IntegerField(null=True, verbose_name='Resource')),
+                ('notification', models.TextField(verbose_name='Notification')),
+                ('simple_notify', models.TextField(blank=True, verbose_name='Push message')),
+                ('visualize', models.BooleanField(default=False, verbose_name='Create visualizations')),
+                ('last_user', models.IntegerField(default=0, verbose_name='Last user delivered')),
+                ('create_date', models.DateTimeField(auto_now_add=True, verbose_name='Create Date')),
+                ('comment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fanout_comment', to='mural.Comment', verbose_name='Comment')),
+                ('post', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fanout_post', to='mural.Mural', verbose_name='Post')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mural_fanouts', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+        ),
+    ]
@@ -18,9 +18,11 @@ from django.utils.translation import ugettext_lazy as _, pgettext_lazy
 
 from topics.decorators import always_as_child
 
+from amadeus.counters import CounterQuerySet
+
 from categories.models import Category
 from subjects.models import Subject
-from topics.models import KnowsChild, Resource
+from topics.models import ChildQuerySet, KnowsChild, Resource
 from users.models import User
 
 valid_formats = ['image/jpeg','image/x-citrix-jpeg','image/png','image/x-citrix-png','image/x-png','image/gif']
@@ -39,6 +41,8 @@ class Mural(KnowsChild):
     last_update = models.DateTimeField(_('Last Update'), auto_now = True)
     edited = models.BooleanField(_('Edited'), default = False)
 
+    objects = ChildQuerySet.as_manager()
+
     @property
     def image_url(self):
         if self.image and hasattr(self.image, 'url'):
@@ -92,7 +96,7 @@ class CategoryPost(Mural):
         return self.id
 
     def get_space(self):
-        return self.space.id
+        return self.space_id
 
     def get_space_slug(self):
         return self.space.slug
@@ -111,7 +115,7 @@ class SubjectPost(Mural):
         return self.id
 
     def get_space(self):
-        return self.space.id
+        return self.space_id
 
     def get_space_slug(self):
         return self.space.slug
@@ -149,9 +153,27 @@ class MuralVisualizations(models.Model):
     user = models.ForeignKey(User, verbose_name = _('User'), related_name = "visualization_user", null = True)
     date_viewed = models.DateTimeField(_('Date/Time Viewed'), null = True, blank = True)
 
+    objects = CounterQuerySet.as_manager()
+
 """
     Model to handle users favorite posts
 """
 class MuralFavorites(models.Model):
     post = models.ForeignKey(Mural, verbose_name = _('Post'), related_name = 'favorites_post', null = True)
     user = models.ForeignKey(User, verbose_name = _('User'), related_name = "favorites_user", null = True)
+
+"""
+    Model to handle the delivery of a post, comment, edition or deletion to the space users (see mural.fanout)
+"""
+class MuralFanout(models.Model):
+    user = models.ForeignKey(User, verbose_name = _('User'), related_name = "mural_fanouts", null = True, on_delete = models.SET_NULL)
+    post = models.ForeignKey(Mural, verbose_name = _('Post'), related_name = 'fanout_post', null = True, on_delete = models.SET_NULL)
+    comment = models.ForeignKey(Comment, verbose_name = _('Comment'), related_name = 'fanout_comment', null = True, on_delete = models.SET_NULL)
+    space_type = models.CharField(_('Space type'), max_length = 20)
+    space = models.IntegerField(_('Space'), default = 0)
+    resource = models.IntegerField(_('Resource'), null = True)
+    notification = models.TextField(_('Notification'))
+    simple_notify = models.TextField(_('Push message'), blank = True)
+    visualize = models.BooleanField(_('Create visualizations'), default = False)
+    last_user = models.IntegerField(_('Last user delivered'), default = 0)
+    create_date = models.DateTimeField(_('Create Date'), auto_now_add = True)
@@ -28,9 +28,20 @@ class MuralSerializer(serializers.ModelSerializer):
     comments = serializers.SerializerMethodField()
 
     def get_comments(self, post):
+        #Listings put the comments totals and the favorite ids of the whole page in the context
+        comments = self.context.get("comments", None)
+
+        if not comments is None:
+            return comments.get(post.id, 0)
+
         return Comment.objects.filter(Q(post = post)).count()
 
     def get_favorite(self, post):
+        favorites = self.context.get("favorites", None)
+
+        if not favorites is None:
+            return post.id in favorites
+
         user = self.context.get("request_user", None)
 
         if not user is None:
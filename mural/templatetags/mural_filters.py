@@ -11,15 +11,12 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 from django import template
-from django.conf import settings
-from django.utils import timezone
-from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from django.contrib.sessions.models import Session
 
-from log.models import Log
+from amadeus.counters import get_count
+from users.presence import get_user_status
 
-from mural.models import MuralFavorites, MuralVisualizations
+from mural.models import MuralFavorites
 
 register = template.Library()
 
@@ -64,15 +61,11 @@ def fav_class(post, user):
 
 @register.filter(name = 'unviewed')
 def unviewed(category, user):
-	count = MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(post__categorypost__space = category) | Q(comment__post__categorypost__space = category))).count()
-
-	return count
+	return get_count(user, 'mural', 'category', category.id)
 
 @register.filter(name = 'sub_unviewed')
 def sub_unviewed(subject, user):
-	count = MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(post__subjectpost__space = subject) | Q(comment__post__subjectpost__space = subject))).count()
-
-	return count
+	return get_count(user, 'mural', 'subject', subject.id)
 
 @register.filter(name = 'show_settings')
 def show_settings(post, user):
@@ -124,23 +117,15 @@ def has_resource(post):
 
 	return ""
 
-@register.assignment_tag(name = 'is_online')
-def is_online(user):
-	expire_time = settings.SESSION_SECURITY_EXPIRE_AFTER
-	now = timezone.now()
-	
-	activities = Log.objects.filter(user_id = user.id).order_by('-datetime')
-
-	if activities.count() > 0:
-		last_activity = activities[0]
-
-		if last_activity.action != 'logout':
-			if (now - last_activity.datetime).total_seconds() < expire_time:
-				return "active"
-			else:
-				return "away"
-	
-	return ""
+@register.assignment_tag(name = 'is_online', takes_context = True)
+def is_online(context, user):
+	#Views that list many users put the statuses of the whole page in the context (see users.presence.get_statuses)
+	statuses = context.get('statuses', {})
+
+	if user.id in statuses:
+		return statuses[user.id]
+
+	return get_user_status(user.id)
 
 @register.filter(name = 'status_text')
 def status_text(status):
@@ -10,6 +10,153 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-from django.test import TestCase
 
-# Create your tests here.
+import json
+
+from django.test import TestCase, override_settings
+
+from channels import Group
+from channels.tests import ChannelTestCase
+
+from amadeus.counters import get_cache, get_count, increment, invalidate
+from amadeus.websocket import GENERAL_GROUP, STAFF_GROUP, get_user_groups, user_group
+from users.models import User
+
+from .fanout import queue_fanout, run_fanouts
+from .models import Comment, GeneralPost, Mural, MuralFanout, MuralVisualizations
+
+@override_settings(MURAL_FANOUT_BATCH_SIZE = 2)
+class FanoutTest(TestCase):
+
+	def setUp(self):
+		self.users = [User.objects.create(username = "mural%d" % i, email = "mural%d@amadeus.br" % i) for i in range(5)]
+		self.post = GeneralPost.objects.create(user = self.users[0], post = "Hello")
+
+	def test_post_fanout(self):
+		queue_fanout(self.users[0], self.post, {"type": "mural"}, visualize = True)
+
+		#4 receivers in batches of 2, plus the round that finds no one left
+		self.assertEqual(run_fanouts(), 3)
+		self.assertEqual(MuralFanout.objects.count(), 0)
+		self.assertEqual(set(MuralVisualizations.objects.values_list('user_id', flat = True)), set(user.id for user in self.users[1:]))
+
+	def test_resume(self):
+		queue_fanout(self.users[0], self.post, {"type": "mural"}, visualize = True)
+
+		self.assertEqual(run_fanouts(limit = 1), 1)
+		self.assertEqual(MuralFanout.objects.get().last_user, self.users[2].id)
+
+		run_fanouts()
+
+		self.assertEqual(MuralVisualizations.objects.count(), 4)
+
+	def test_group_only(self):
+		#Editions of a general post are a single group send, nothing is left for the workers
+		self.assertIsNone(queue_fanout(self.users[0], self.post, {"type": "mural_update"}))
+		self.assertEqual(MuralFanout.objects.count(), 0)
+
+	def test_deleted_post(self):
+		queue_fanout(self.users[0], self.post, {"type": "mural"}, visualize = True)
+
+		self.post.delete()
+		run_fanouts()
+
+		self.assertEqual(MuralFanout.objects.count(), 0)
+		self.assertEqual(MuralVisualizations.objects.count(), 0)
+
+class ListTest(TestCase):
+
+	def setUp(self):
+		self.user = User.objects.create(username = "lister", email = "lister@amadeus.br")
+		self.post = GeneralPost.objects.create(user = self.user, post = "Hello")
+
+	def test_posts_children(self):
+		posts = list(Mural.objects.all())
+
+		with self.assertNumQueries(0):
+			self.assertIsInstance(posts[0].as_child(), GeneralPost)
+
+	def test_comments(self):
+		comment = Comment.objects.create(user = self.user, post = self.post, comment = "Hi")
+
+		self.assertEqual(list(Comment.objects.filter(post = self.post)), [comment])
+		self.assertEqual(list(self.post.comment_post.all()), [comment])
+
+class SpaceGroupsTest(ChannelTestCase):
+
+	def setUp(self):
+		self.author = User.objects.create(username = "author", email = "author@amadeus.br")
+		self.staff = User.objects.create(username = "staff", email = "staff@amadeus.br", is_staff = True)
+
+	def test_user_groups(self):
+		self.assertEqual(get_user_groups(self.author), [user_group(self.author.id), GENERAL_GROUP])
+		self.assertIn(STAFF_GROUP, get_user_groups(self.staff))
+
+	def test_single_group_send(self):
+		Group(GENERAL_GROUP).add("test-reader")
+
+		post = GeneralPost.objects.create(user = self.author, post = "Hello")
+
+		queue_fanout(self.author, post, {"type": "mural", "subtype": "post"}, visualize = True)
+		run_fanouts()
+
+		message = self.get_next_message("test-reader", require = True)
+
+		self.assertEqual(json.loads(message['text'])['sender'], self.author.id)
+		self.assertIsNone(self.get_next_message("test-reader"))
+
+@override_settings(COUNTERS_CACHE = 'default')
+class CountersTest(TestCase):
+
+	def setUp(self):
+		get_cache().clear()
+
+		self.author = User.objects.create(username = "writer", email = "writer@amadeus.br")
+		self.reader = User.objects.create(username = "reader", email = "reader@amadeus.br")
+		self.post = GeneralPost.objects.create(user = self.author, post = "Hello")
+
+	def fresh_reader(self):
+		#Counters are memoized on the user object for the request
+		return User.objects.get(id = self.reader.id)
+
+	def test_fanout_increment(self):
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 0)
+
+		queue_fanout(self.author, self.post, {"type": "mural"}, visualize = True)
+		run_fanouts()
+
+		with self.assertNumQueries(0):
+			self.assertEqual(get_count(self.reader, 'mural'), 1)
+
+	def test_viewed_invalidates(self):
+		MuralVisualizations.objects.create(viewed = False, user = self.reader, post = self.post)
+
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 1)
+
+		MuralVisualizations.objects.filter(user = self.reader).update(viewed = True)
+
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 0)
+
+	def test_scoped_increment(self):
+		self.assertEqual(get_count(self.fresh_reader(), 'mural', 'category', 7), 0)
+
+		increment([self.reader.id], 'mural', category = 7)
+		increment([self.reader.id, self.author.id], 'mural', category = 7)
+
+		reader = self.fresh_reader()
+
+		self.assertEqual(get_count(reader, 'mural'), 2)
+		self.assertEqual(get_count(reader, 'mural', 'category', 7), 2)
+		self.assertEqual(get_count(reader, 'mural', 'category', 8), 0)
+
+	def test_recompute(self):
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 0)
+
+		#Rows written without an increment are only seen once the counters are computed again
+		MuralVisualizations.objects.create(viewed = False, user = self.reader, post = self.post)
+
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 0)
+
+		invalidate([self.reader.id])
+
+		self.assertEqual(get_count(self.fresh_reader(), 'mural'), 1)
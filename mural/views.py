@@ -23,25 +23,20 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Count
 
-from channels import Group
-import json
-
 from categories.models import Category
 from subjects.models import Subject
 from topics.models import Resource
 from users.models import User
 
-from log.models import Log
 from log.mixins import LogMixin
 from log.decorators import log_decorator, log_decorator_ajax
 import time
 from datetime import datetime
 
-from api.utils import sendMuralPushNotification
-
 from .models import Mural, GeneralPost, CategoryPost, SubjectPost, MuralVisualizations, MuralFavorites, Comment
 from .forms import GeneralPostForm, CategoryPostForm, SubjectPostForm, ResourcePostForm, CommentForm
-from .utils import getSpaceUsers, getSubjectPosts
+from .utils import getSubjectPosts
+from .fanout import queue_fanout
 
 from amadeus.permissions import has_subject_view_permissions, has_resource_permissions
 
@@ -108,9 +103,9 @@ class GeneralIndex(LoginRequiredMixin, LogMixin, generic.ListView):
 		else:
 			self.log_context['timestamp_start'] = str(int(time.time()))
 
-			super(GeneralIndex, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+			log = super(GeneralIndex, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-			self.request.session['log_id'] = Log.objects.latest('id').id
+			self.request.session['log_id'] = log.id
 
 		context['title'] = _('Mural')
 		context['totals'] = self.totals
@@ -155,9 +150,6 @@ class GeneralCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 
 		self.object.save()
 
-		users = User.objects.all().exclude(id = self.request.user.id)
-		entries = []
-
 		paths = [reverse("mural:manage_general")]
 
 		simple_notify = _("%s has made a post in General")%(str(self.object.user))
@@ -174,14 +166,7 @@ class GeneralCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 			"post_type": "general"
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			entries.append(MuralVisualizations(viewed = False, user = user, post = self.object))
-			sendMuralPushNotification(user, self.object.user, simple_notify)
-			Group("user-%s" % user.id).send({'text': notification})
-
-		MuralVisualizations.objects.bulk_create(entries)
+		queue_fanout(self.request.user, self.object, notification, simple_notify, visualize = True)
 
 		super(GeneralCreate, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
@@ -223,8 +208,6 @@ class GeneralUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 
 		self.object.save()
 
-		users = User.objects.all().exclude(id = self.request.user.id)
-
 		paths = [reverse("mural:manage_general")]
 
 		notification = {
@@ -235,10 +218,7 @@ class GeneralUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = str(self.object.id)
 
@@ -277,8 +257,6 @@ class GeneralDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 		return context
 
 	def get_success_url(self):
-		users = User.objects.all().exclude(id = self.request.user.id)
-
 		paths = [reverse("mural:manage_general")]
 
 		notification = {
@@ -288,10 +266,7 @@ class GeneralDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = str(self.object.id)
 
@@ -415,9 +390,6 @@ class CategoryCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object)
-		entries = []
-
 		paths = [reverse("mural:manage_category")]
 
 		simple_notify = _("%s has made a post in %s")%(str(self.object.user), str(self.object.space))
@@ -434,14 +406,7 @@ class CategoryCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 			"post_type": "categories"
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			entries.append(MuralVisualizations(viewed = False, user = user, post = self.object))
-			sendMuralPushNotification(user, self.object.user, simple_notify)
-			Group("user-%s" % user.id).send({'text': notification})
-
-		MuralVisualizations.objects.bulk_create(entries)
+		queue_fanout(self.request.user, self.object, notification, simple_notify, visualize = True)
 
 		self.log_context['category_id'] = self.object.space.id
 		self.log_context['category_name'] = self.object.space.name
@@ -487,8 +452,6 @@ class CategoryUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object)
-
 		paths = [reverse("mural:manage_category")]
 
 		notification = {
@@ -499,10 +462,7 @@ class CategoryUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = self.object.id
 		self.log_context['category_id'] = self.object.space.id
@@ -544,8 +504,6 @@ class CategoryDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 		return context
 
 	def get_success_url(self):
-		users = getSpaceUsers(self.request.user.id, self.object)
-
 		paths = [reverse("mural:manage_category")]
 
 		notification = {
@@ -555,10 +513,7 @@ class CategoryDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = self.object.id
 		self.log_context['category_id'] = self.object.space.id
@@ -585,7 +540,7 @@ def mural_category_log(request, category):
 
 		request.log_context = log_context
 
-		log_id = Log.objects.latest('id').id
+		log_id = request.log_id
 
 		return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -709,9 +664,6 @@ class SubjectCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object)
-		entries = []
-
 		paths = [
 			reverse("mural:manage_subject"),
 			reverse("mural:subject_view", args = (), kwargs = {'slug': self.object.space.slug})
@@ -734,14 +686,7 @@ class SubjectCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 			"post_type": "subjects"
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			entries.append(MuralVisualizations(viewed = False, user = user, post = self.object))
-			sendMuralPushNotification(user, self.object.user, simple_notify)
-			Group("user-%s" % user.id).send({'text': notification})
-
-		MuralVisualizations.objects.bulk_create(entries)
+		queue_fanout(self.request.user, self.object, notification, simple_notify, visualize = True)
 
 		self.log_context['subject_id'] = self.object.space.id
 		self.log_context['subject_name'] = self.object.space.name
@@ -806,8 +751,6 @@ class SubjectUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object)
-
 		paths = [
 			reverse("mural:manage_subject"),
 			reverse("mural:subject_view", args = (), kwargs = {'slug': self.object.space.slug})
@@ -824,10 +767,7 @@ class SubjectUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = self.object.id
 		self.log_context['subject_id'] = self.object.space.id
@@ -874,8 +814,6 @@ class SubjectDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 		return context
 
 	def get_success_url(self):
-		users = getSpaceUsers(self.request.user.id, self.object)
-
 		paths = [
 			reverse("mural:manage_subject"),
 			reverse("mural:subject_view", args = (), kwargs = {'slug': self.object.space.slug})
@@ -891,10 +829,7 @@ class SubjectDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 			"container": "#post-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object, notification)
 
 		self.log_context['post_id'] = self.object.id
 		self.log_context['subject_id'] = self.object.space.id
@@ -967,9 +902,9 @@ class SubjectView(LoginRequiredMixin, LogMixin, generic.ListView):
 			self.log_context['subject_slug'] = subject.slug
 			self.log_context['timestamp_start'] = str(int(time.time()))
 
-			super(SubjectView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+			log = super(SubjectView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-			self.request.session['log_id'] = Log.objects.latest('id').id
+			self.request.session['log_id'] = log.id
 
 		context['title'] = _('%s - Mural')%(str(subject))
 		context['subject'] = subject
@@ -1004,7 +939,7 @@ def mural_subject_log(request, subject):
 
 		request.log_context = log_context
 
-		log_id = Log.objects.latest('id').id
+		log_id = request.log_id
 
 		return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -1115,9 +1050,9 @@ class ResourceView(LoginRequiredMixin, LogMixin, generic.ListView):
 			self.log_context['resource_slug'] = resource.slug
 			self.log_context['timestamp_start'] = str(int(time.time()))
 
-			super(ResourceView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+			log = super(ResourceView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-			self.request.session['log_id'] = Log.objects.latest('id').id
+			self.request.session['log_id'] = log.id
 
 		context['title'] = _('%s - Mural')%(str(resource))
 		context['subject'] = resource.topic.subject
@@ -1170,9 +1105,6 @@ class ResourceCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object)
-		entries = []
-
 		paths = [
 			reverse("mural:manage_subject"),
 			reverse("mural:subject_view", args = (), kwargs = {'slug': self.object.space.slug})
@@ -1195,14 +1127,7 @@ class ResourceCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 			"post_type": "subjects"
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			entries.append(MuralVisualizations(viewed = False, user = user, post = self.object))
-			sendMuralPushNotification(user, self.object.user, simple_notify)
-			Group("user-%s" % user.id).send({'text': notification})
-
-		MuralVisualizations.objects.bulk_create(entries)
+		queue_fanout(self.request.user, self.object, notification, simple_notify, visualize = True)
 
 		self.log_context['subject_id'] = self.object.space.id
 		self.log_context['subject_name'] = self.object.space.name
@@ -1301,9 +1226,6 @@ class CommentCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, post)
-		entries = []
-
 		paths = [
 			reverse("mural:manage_general"),
 			reverse("mural:manage_category"),
@@ -1330,14 +1252,7 @@ class CommentCreate(LoginRequiredMixin, LogMixin, generic.edit.CreateView):
 			"type_slug": post.get_space_slug()
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			entries.append(MuralVisualizations(viewed = False, user = user, comment = self.object))
-			sendMuralPushNotification(user, self.object.user, simple_notify)
-			Group("user-%s" % user.id).send({'text': notification})
-
-		MuralVisualizations.objects.bulk_create(entries)
+		queue_fanout(self.request.user, post, notification, simple_notify, comment = self.object, visualize = True)
 
 		self.log_context = {}
 		self.log_context['post_id'] = str(post.id)
@@ -1403,8 +1318,6 @@ class CommentUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 
 		self.object.save()
 
-		users = getSpaceUsers(self.request.user.id, self.object.post)
-
 		paths = [
 			reverse("mural:manage_general"),
 			reverse("mural:manage_category"),
@@ -1425,10 +1338,7 @@ class CommentUpdate(LoginRequiredMixin, LogMixin, generic.UpdateView):
 			"container": "#comment-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object.post, notification)
 
 		self.log_context = {}
 		self.log_context['post_id'] = str(self.object.post.id)
@@ -1488,8 +1398,6 @@ class CommentDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 		return context
 
 	def get_success_url(self):
-		users = getSpaceUsers(self.request.user.id, self.object.post)
-
 		paths = [
 			reverse("mural:manage_general"),
 			reverse("mural:manage_category"),
@@ -1509,10 +1417,7 @@ class CommentDelete(LoginRequiredMixin, LogMixin, generic.DeleteView):
 			"container": "#comment-" + str(self.object.id),
 		}
 
-		notification = json.dumps(notification)
-
-		for user in users:
-			Group("user-%s" % user.id).send({'text': notification})
+		queue_fanout(self.request.user, self.object.post, notification)
 
 		self.log_context = {}
 		self.log_context['post_id'] = str(self.object.post.id)
@@ -10,38 +10,52 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+import logging
 import datetime
 from django_cron import CronJobBase, Schedule
 
-from .utils import set_notifications
+from amadeus.jobs import ShardedJob, run_job, timings_report
+
+from .utils import get_active_pendencies, set_subject_notifications, notificate
 
 from log.models import Log
 from users.models import User
 
-class Notify(CronJobBase):
-	RUN_EVERY_MINS = 1440 # every day
+logger = logging.getLogger(__name__)
 
-	schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
-	code = 'amadeus.notification_cron'    # a unique code
+class NotificationJob(ShardedJob):
+	code = 'notifications'
 
-	def do(self):
-		set_notifications()
+	def get_shards(self):
+		return list(get_active_pendencies().filter(resource__topic__subject__isnull = False).order_by().values_list('resource__topic__subject__id', flat = True).distinct())
+
+	def run_shard(self, shard):
+		set_subject_notifications(shard)
+
+	def finish(self, timings):
+		#A rerun of a finished day creates no notifications, so the users are not pushed again
+		if timings:
+			notificate()
 		
 		admins = User.objects.filter(is_staff = True)
 		
 		if admins.count() > 0:
 			admin = admins[0]
 
-			log = Log(component = "notifications", action = "cron", resource = "notifications", user = str(admin), user_id = admin.id, user_email = admin.email, context = {})
-			log.save()
+			Log.objects.create(component = "notifications", action = "cron", resource = "notifications", user = str(admin), user_id = admin.id, user_email = admin.email, context = {})
 
+class Notify(CronJobBase):
+	RUN_EVERY_MINS = 1440 # every day
 
-def notification_cron():
-	set_notifications()
+	schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+	code = 'amadeus.notification_cron'    # a unique code
+
+	def do(self):
+		job = NotificationJob()
 
-	admins = User.objects.filter(is_staff = True)
+		return timings_report(job, run_job(job))
 
-	if admins.count() > 0:
-		admin = admins[0]
+def notification_cron():
+	job = NotificationJob()
 
-		Log.objects.create(component = "notifications", action = "cron", resource = "notifications", user = str(admin), user_id = admin.id, user_email = admin.email, context = {})
\ No newline at end of file
+	logger.info(timings_report(job, run_job(job)))
@@ -13,6 +13,7 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
+from amadeus.counters import CounterQuerySet
 from users.models import User
 from pendencies.models import Pendencies
 
@@ -24,5 +25,7 @@ class Notification(models.Model):
 	viewed = models.BooleanField(_('Visualized'), default = False)
 	creation_date = models.DateField(_('Creation Date'), auto_now_add = True)
 
+	objects = CounterQuerySet.as_manager()
+
 	def __str__(self):
 		return self.task.get_action_display() + " " + str(self.task.resource)
@@ -10,6 +10,104 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-from django.test import TestCase
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from fcm_django.models import FCMDevice
+
+from amadeus.jobs import run_job
+from api.models import PushJob
+from links.models import Link
+from log.models import Log
+from pendencies.models import Pendencies
+from subjects.models import Subject
+from topics.models import Topic
+from users.models import User
+
+from .cron import NotificationJob
+from .models import Notification
+from .utils import create_notifications, get_pendency_notifications
+
+@override_settings(COUNTERS_CACHE = 'default')
+class PendencyTestCase(TestCase):
+
+	def setUp(self):
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		topic = Topic.objects.create(name = "topic", subject = self.subject, visible = True)
+		self.link = Link.objects.create(name = "link", topic = topic, link_url = "http://amadeus.br", all_students = True)
+
+		self.pendency = Pendencies.objects.create(action = "view", resource = self.link, begin_date = timezone.now() - timedelta(days = 1),
+			end_date = timezone.now() + timedelta(days = 1))
+
+		self.student = User.objects.create(username = "student", email = "student@amadeus.br")
+		self.subject.students.add(self.student)
+
+		FCMDevice.objects.create(user = self.student, registration_id = "token", type = "android")
+
+	def get_levels(self):
+		return [notification.level for notification in get_pendency_notifications(self.pendency)]
+
+class PendencyNotificationsTest(PendencyTestCase):
+
+	def test_levels(self):
+		self.assertEqual(self.get_levels(), [1])
+
+		#Past the end date, then past the limit date
+		self.pendency.end_date = timezone.now() - timedelta(hours = 1)
+		self.pendency.limit_date = timezone.now() + timedelta(days = 1)
+		self.pendency.save()
+
+		self.assertEqual(self.get_levels(), [3])
+
+		self.pendency.limit_date = timezone.now() - timedelta(minutes = 1)
+		self.pendency.save()
+
+		self.assertEqual(self.get_levels(), [4])
+
+	def test_done(self):
+		Log.objects.create(component = "resources", action = "view", resource = "link", user = str(self.student), user_id = self.student.id,
+			user_email = self.student.email, context = {'subject_id': self.subject.id, 'link_id': self.link.id})
+
+		self.assertEqual(self.get_levels(), [])
+
+	def test_same_day(self):
+		create_notifications(self.pendency)
+
+		#Users notified today are not notified again by a rerun
+		self.assertEqual(self.get_levels(), [])
+
+		#A notification of an earlier day waits for the goal date the user set on it
+		Notification.objects.update(creation_date = date.today() - timedelta(days = 1), meta = timezone.now() + timedelta(days = 2))
+
+		self.assertEqual(self.get_levels(), [])
+
+		#Once it is past the user is notified again, on the next level
+		Notification.objects.update(meta = timezone.now() - timedelta(days = 1))
+
+		self.assertEqual(self.get_levels(), [2])
+
+class NotificationJobTest(PendencyTestCase):
+
+	def test_run_job(self):
+		job = NotificationJob()
+
+		self.assertEqual([shard for shard, duration in run_job(job, processes = 1, run = "day")], [self.subject.id])
+		self.assertEqual(Notification.objects.filter(user = self.student, level = 1).count(), 1)
+		self.assertEqual(PushJob.objects.count(), 1)
+
+		#The checkpointed shard is skipped and nobody is pushed again
+		self.assertEqual(run_job(job, processes = 1, run = "day"), [])
+		self.assertEqual(Notification.objects.count(), 1)
+		self.assertEqual(PushJob.objects.count(), 1)
+
+	def test_new_run(self):
+		job = NotificationJob()
+
+		run_job(job, processes = 1, run = "day")
+
+		#Another run of the same day processes the shard again, but the users already notified today are skipped
+		self.assertEqual(len(run_job(job, processes = 1, run = "rerun")), 1)
+		self.assertEqual(Notification.objects.count(), 1)
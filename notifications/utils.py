@@ -12,17 +12,19 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 
 from datetime import date
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, Count
 from dateutil.parser import parse
 from datetime import datetime
 from django.utils import formats
 
 from log.models import Log
 from pendencies.models import Pendencies
+from subjects.models import Subject
+from topics.models import Resource
 from users.models import User
 
-from fcm_django.models import FCMDevice
-from fcm_django.fcm import fcm_send_message
+from amadeus.counters import increment
+from api.push import queue_user_pushes
 
 from .models import Notification
 
@@ -32,67 +34,115 @@ def get_resource_users(resource):
 
 	return User.objects.filter(Q(resource_students = resource) | Q(group_participants__resource_groups = resource)).distinct()
 
+def get_resources_users(resources):
+	"""
+		Ids of the users of each resource (by id), the same ones of get_resource_users for all the resources in three queries
+	"""
+	users = {resource.id: set() for resource in resources}
+	subjects = {}
+
+	for resource in resources:
+		if resource.all_students:
+			subjects.setdefault(resource.topic.subject_id, []).append(resource.id)
+
+	for subject_id, user_id in Subject.students.through.objects.filter(subject_id__in = list(subjects)).values_list('subject_id', 'user_id'):
+		for resource_id in subjects[subject_id]:
+			users[resource_id].add(user_id)
+
+	others = [resource.id for resource in resources if not resource.all_students]
+
+	if others:
+		students = Resource.students.through.objects.filter(resource_id__in = others).values_list('resource_id', 'user_id')
+		participants = Resource.groups.through.objects.filter(resource_id__in = others).values_list('resource_id', 'studentsgroup__participants')
+
+		for resource_id, user_id in list(students) + list(participants):
+			if not user_id is None:
+				users[resource_id].add(user_id)
+
+	return users
+
 def notificate():
-	users = User.objects.all()
+	unread = Notification.objects.filter(viewed = False, creation_date = timezone.now()).values('user_id').annotate(total = Count('id')).order_by()
+
+	queue_user_pushes({row['user_id']: (None, None, {"body": row['total'], "type": "pendency"}) for row in unread})
+
+def get_users_done(pendency):
+	"""
+		Ids of the users that already did the pendency action since the subject began, in one grouped query
+	"""
+	resource = pendency.resource
+	resource_type = resource._my_subclass
 
-	for user in users:
-		notifications = Notification.objects.filter(user = user, viewed = False, creation_date = timezone.now()).count()
+	logs = Log.objects.filter(action = pendency.action, resource = resource_type, resource_type = resource_type, resource_id = resource.id, datetime__date__gte = resource.topic.subject.init_date)
 
-		if notifications > 0:
-			device = FCMDevice.objects.filter(user = user, active = True).first()
+	return set(logs.values_list('user_id', flat = True).distinct())
 
-			if not device is None:
-				device.send_message(data = {"body": notifications, "type": "pendency"})
+def get_last_notifications(pendency):
+	"""
+		Last notification of each user for the pendency, keyed by user id
+	"""
+	notifications = Notification.objects.filter(task = pendency).order_by('user_id', '-creation_date', '-id').distinct('user_id').only('user_id', 'creation_date', 'meta')
 
-def set_notifications():
-	pendencies = Pendencies.objects.filter(begin_date__date__lte = timezone.now(), resource__visible = True)
+	return {notification.user_id: notification for notification in notifications}
 
-	for pendency in pendencies:
-		users = get_resource_users(pendency.resource)
-		subject_begin_date = pendency.resource.topic.subject.init_date
-		pend_action = pendency.action
-		resource_type = pendency.resource._my_subclass
-		resource_key = resource_type + "_id"
-		resource_id = pendency.resource.id
+def get_pendency_notifications(pendency):
+	users = get_resource_users(pendency.resource).values_list('id', flat = True)
 
-		for user in users:
-			prev_notify = Notification.objects.filter(user = user, task = pendency).order_by("-creation_date")
-			notify_type = 1
-			meta = None
+	if not users:
+		return []
 
-			if prev_notify.count() > 0:
-				last_notify = prev_notify[0]
+	today = date.today()
+	now = timezone.now()
 
-				if last_notify.creation_date == date.today():
+	done = get_users_done(pendency)
+	last_notifications = get_last_notifications(pendency)
+
+	late_type = 1
+
+	if pendency.end_date and now > pendency.end_date:
+		late_type = 3
+
+	if pendency.limit_date and now > pendency.limit_date:
+		late_type = 4
+
+	notifications = []
+
+	for user_id in users:
+		if user_id in done:
+			continue
+
+		notify_type = late_type
+		meta = None
+		last_notify = last_notifications.get(user_id, None)
+
+		if not last_notify is None:
+			if last_notify.creation_date == today:
+				continue
+
+			if last_notify.meta:
+				if last_notify.creation_date < today < last_notify.meta.date():
 					continue
 
-				if last_notify.meta:
-					if last_notify.creation_date < date.today() < last_notify.meta.date():
-						continue
+				meta = last_notify.meta
 
-					meta = last_notify.meta
+				if late_type == 1:
 					notify_type = 2
 
-			has_action = Log.objects.filter(user_id = user.id, action = pend_action, resource = resource_type, context__contains = {resource_key: resource_id}, datetime__date__gte = subject_begin_date).exists()
+		notifications.append(Notification(user_id = user_id, level = notify_type, task = pendency, meta = meta))
+
+	return notifications
 
-			if not has_action:
-				if pendency.end_date:
-					if timezone.now() > pendency.end_date:
-						notify_type = 3
+def get_active_pendencies():
+	return Pendencies.objects.filter(begin_date__date__lte = timezone.now(), resource__visible = True).select_related('resource__topic__subject')
 
-				if pendency.limit_date:
-					if timezone.now() > pendency.limit_date:
-						notify_type = 4
-				
-				notification = Notification()
-				notification.user = user
-				notification.level = notify_type
-				notification.task = pendency
-				notification.meta = meta
+def create_notifications(pendency):
+	notifications = Notification.objects.bulk_create(get_pendency_notifications(pendency), batch_size = 1000)
 
-				notification.save()
+	increment([notification.user_id for notification in notifications], 'notifications', subject = pendency.resource.topic.subject_id)
 
-	notificate()
+def set_subject_notifications(subject_id):
+	for pendency in get_active_pendencies().filter(resource__topic__subject__id = subject_id):
+		create_notifications(pendency)
 
 def get_order_by(order):
 	if order is None or order == "":
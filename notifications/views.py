@@ -128,9 +128,9 @@ class SubjectNotifications(LoginRequiredMixin, LogMixin, generic.ListView):
         self.log_context['view_page'] = self.request.GET.get("page", 1)
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(SubjectNotifications, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+        log = super(SubjectNotifications, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -252,9 +252,9 @@ class SubjectHistory(LoginRequiredMixin, LogMixin, generic.ListView):
         self.log_context['searched'] = self.request.GET.get("search", "")
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(SubjectHistory, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+        log = super(SubjectHistory, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -442,7 +442,7 @@ def pendencies_view_log(request, subject):
 
         request.log_context = log_context
 
-        log_id = Log.objects.latest('id').id
+        log_id = request.log_id
 
         return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -464,7 +464,7 @@ def pendencies_hist_log(request, subject):
 
         request.log_context = log_context
 
-        log_id = Log.objects.latest('id').id
+        log_id = request.log_id
 
         return JsonResponse({'message': 'ok', 'log_id': log_id})
 
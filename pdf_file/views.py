@@ -23,7 +23,7 @@ from amadeus.permissions import has_subject_permissions, has_resource_permission
 from .forms import PDFFileForm
 from os import path
 import datetime
-from log.models import Log
+from topics.statistics import ResourceStatistics
 from django.http import HttpResponse, Http404
 
 from log.mixins import LogMixin
@@ -440,38 +440,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
 
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = pdf_file.students.all()
-        if pdf_file.all_students :
-        	alunos = pdf_file.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'pdffile_id':pdf_file.id},resource="pdffile",action="view",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1)))
+        statistics = ResourceStatistics(pdf_file, "pdffile", ["view"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in pdf_file.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
+        column_view = str(_('View'))
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in pdf_file.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('View')), str(alun.email)])
-            index += 1
-        json_n_did["data"] = data_n_did
+        context["json_n_did"] = {"data": statistics.get_not_did([("view", column_view)])}
+        context["json_history"] = {"data": statistics.get_history()}
 
+        re = statistics.get_chart(str(_('PDF File')), did, n_did, [("view", column_view)])
 
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.distinct("user_email").count()
-        column_view = str(_('View'))
-        re.append([str(_('PDF File')),did,n_did])
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
         context['topic'] = pdf_file.topic
         context['subject'] = pdf_file.topic.subject
         context['db_data'] = re
@@ -0,0 +1,45 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from amadeus.jobs import ShardedJob, run_job, timings_report
+
+from .utils import get_upcoming_questionaries, pregenerate_attempts
+
+logger = logging.getLogger(__name__)
+
+class PregenerateJob(ShardedJob):
+	code = 'questionary_attempts'
+	#pregenerate_attempts commits every batch of students, a rerun creates the ones left
+	atomic = False
+
+	def get_run(self):
+		#Every cron slot is a run of its own, so students enrolled later and attempts removed by an edition are created on the next one
+		interval = getattr(settings, 'QUESTIONARY_PREGENERATE_INTERVAL', 15)
+		now = timezone.localtime(timezone.now())
+
+		return now.replace(minute = now.minute - now.minute % interval, second = 0, microsecond = 0).strftime('%Y-%m-%d %H:%M')
+
+	def get_shards(self):
+		return list(get_upcoming_questionaries().order_by('data_ini').values_list('id', flat = True))
+
+	def run_shard(self, shard):
+		pregenerate_attempts(shard)
+
+def pregenerate_cron():
+	job = PregenerateJob()
+
+	logger.info(timings_report(job, run_job(job)))
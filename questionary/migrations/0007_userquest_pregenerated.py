@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 20:15
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionary', '0006_useranswer_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userquest',
+            name='pregenerated',
+            field=models.BooleanField(default=False, verbose_name='Pregenerated'),
+        ),
+    ]
@@ -64,6 +64,8 @@ class UserQuest(models.Model):
     student = models.ForeignKey(User, verbose_name = _('User'), related_name = 'userquest_user', null = True)
     data_ini = models.DateTimeField(_('Init Date'), auto_now_add = True)
     last_update = models.DateTimeField(_('Last update'), auto_now_add = True)
+    #Created by the questionary cron before the questionary began and not opened by the student yet
+    pregenerated = models.BooleanField(_('Pregenerated'), default = False)
 
 class UserAnswer(models.Model):
     user_quest = models.ForeignKey(UserQuest, verbose_name = _('User Questionary'), related_name = 'useranswer_userquest', null = True)
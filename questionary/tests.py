@@ -1,3 +1,89 @@
+from datetime import datetime, timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from amadeus.jobs import run_job
+from banco_questoes.models import Question
+from subjects.models import Subject, Tag
+from topics.models import Topic
+from users.models import User
+
+from .cron import PregenerateJob
+from .models import Questionary, Specification, UserAnswer, UserQuest
+from .utils import create_attempt, get_attempt, get_upcoming_questionaries, open_attempt, pregenerate_attempts
+
+class PregenerateAttemptsTest(TestCase):
+
+    def setUp(self):
+        subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+            subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+        topic = Topic.objects.create(name = "topic", subject = subject, visible = True)
+
+        self.questionary = Questionary.objects.create(name = "exam", topic = topic, all_students = True,
+            data_ini = timezone.now() + timedelta(hours = 2), data_end = timezone.now() + timedelta(hours = 4))
+
+        tag = Tag.objects.create(name = "math")
+
+        for i in range(3):
+            question = Question.objects.create(enunciado = "question %d" % i, subject = subject)
+            question.categories.add(tag)
+
+        spec = Specification.objects.create(questionary = self.questionary, n_questions = 2)
+        spec.categories.add(tag)
+
+        self.students = [User.objects.create(username = "student%d" % i, email = "student%d@amadeus.br" % i) for i in range(3)]
+        subject.students.add(*self.students)
+
+    def test_pregenerate(self):
+        self.assertEqual(list(get_upcoming_questionaries()), [self.questionary])
+
+        #A late joiner (or an early visitor) already has its attempt
+        create_attempt(self.students[0], self.questionary)
+
+        self.assertEqual(pregenerate_attempts(self.questionary.id), 2)
+        self.assertEqual(pregenerate_attempts(self.questionary.id), 0)
+
+        attempts = UserQuest.objects.filter(questionary = self.questionary, pregenerated = True)
+
+        self.assertEqual(attempts.count(), 2)
+
+        for attempt in attempts:
+            self.assertEqual(sorted(UserAnswer.objects.filter(user_quest = attempt).values_list('order', flat = True)), [1, 2])
+
+        open_attempt(attempts[0])
+
+        self.assertEqual(UserQuest.objects.filter(questionary = self.questionary, pregenerated = True).count(), 1)
+
+    def test_late_enrollment(self):
+        job = PregenerateJob()
+
+        run_job(job, run = "2026-01-01 10:00")
+
+        late = User.objects.create(username = "late", email = "late@amadeus.br")
+        self.questionary.topic.subject.students.add(late)
+
+        #The same slot is checkpointed, the next one creates the attempt of the late student
+        run_job(job, run = "2026-01-01 10:00")
+        self.assertFalse(UserQuest.objects.filter(student = late).exists())
+
+        run_job(job, run = "2026-01-01 10:15")
+        self.assertTrue(UserQuest.objects.filter(student = late, pregenerated = True).exists())
+
+    def test_opened_attempt_wins(self):
+        student = self.students[0]
+
+        #The student opened the exam while the batch with its attempt was still being written
+        opened = create_attempt(student, self.questionary)
+        UserQuest.objects.create(student = student, questionary = self.questionary, pregenerated = True)
+
+        self.assertEqual(get_attempt(student, self.questionary), opened)
+        self.assertEqual(list(UserQuest.objects.filter(student = student)), [opened])
+
+    def test_get_pregenerated(self):
+        pregenerate_attempts(self.questionary.id)
+
+        attempt = get_attempt(self.students[1], self.questionary)
 
-# Create your tests here.
+        self.assertFalse(attempt.pregenerated)
+        self.assertEqual(UserQuest.objects.filter(student = self.students[1]).count(), 1)
@@ -0,0 +1,119 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from banco_questoes.utils import draw_questions
+from notifications.utils import get_resource_users
+
+from .models import Questionary, UserAnswer, UserQuest
+
+def get_specifications(questionary):
+    """
+        Returns the (categories ids, number of questions) of each specification of the questionary
+    """
+    return [([tag.id for tag in spec.categories.all()], spec.n_questions) for spec in questionary.spec_questionary.prefetch_related('categories')]
+
+def draw_answers(userquest, specifications):
+    """
+        Returns the (unsaved) answers of the attempt: the questions drawn for each specification, in a random order
+    """
+    q_ids = [0]
+
+    for categories, n_questions in specifications:
+        q_ids = q_ids + draw_questions(categories, n_questions, q_ids)
+
+    q_ids = q_ids[1:]
+
+    orders = list(range(1, len(q_ids) + 1))
+    random.shuffle(orders)
+
+    return [UserAnswer(user_quest = userquest, question_id = question, order = order) for question, order in zip(q_ids, orders)]
+
+def create_attempt(student, questionary):
+    userquest = UserQuest.objects.create(student = student, questionary = questionary)
+
+    UserAnswer.objects.bulk_create(draw_answers(userquest, get_specifications(questionary)))
+
+    return userquest
+
+def open_attempt(userquest):
+    """
+        Marks a pregenerated attempt as opened by the student now
+    """
+    now = timezone.now()
+
+    UserQuest.objects.filter(id = userquest.id).update(pregenerated = False, data_ini = now, last_update = now)
+    UserAnswer.objects.filter(user_quest = userquest).update(created_at = now)
+
+    userquest.pregenerated = False
+    userquest.data_ini = now
+    userquest.last_update = now
+
+def get_attempt(student, questionary):
+    """
+        Returns the attempt of the student, opening the pregenerated one or creating it when there is none.
+        An attempt the student already opened wins over one of a batch that committed after it, which is dropped
+    """
+    attempts = list(UserQuest.objects.filter(student = student, questionary = questionary).order_by('pregenerated', 'id'))
+
+    if not attempts:
+        return create_attempt(student, questionary)
+
+    userquest = attempts[0]
+    extra = [attempt.id for attempt in attempts[1:] if attempt.pregenerated]
+
+    if extra:
+        UserQuest.objects.filter(id__in = extra).delete()
+
+    if userquest.pregenerated:
+        open_attempt(userquest)
+
+    return userquest
+
+def get_upcoming_questionaries():
+    """
+        Questionaries that begin in the next QUESTIONARY_PREGENERATE_AHEAD hours
+    """
+    now = timezone.now()
+    ahead = timedelta(hours = getattr(settings, 'QUESTIONARY_PREGENERATE_AHEAD', 24))
+
+    return Questionary.objects.filter(visible = True, data_ini__gt = now, data_ini__lte = now + ahead)
+
+def pregenerate_attempts(questionary_id):
+    """
+        Creates the attempts of the students of the questionary that don't have one yet, QUESTIONARY_PREGENERATE_BATCH
+        students at a time, each batch in its own transaction. Returns how many were created
+    """
+    questionary = Questionary.objects.select_related('topic__subject').get(id = questionary_id)
+    specifications = get_specifications(questionary)
+
+    students = list(get_resource_users(questionary).exclude(userquest_user__questionary = questionary).values_list('id', flat = True))
+    batch = getattr(settings, 'QUESTIONARY_PREGENERATE_BATCH', 200)
+
+    for i in range(0, len(students), batch):
+        with transaction.atomic():
+            userquests = UserQuest.objects.bulk_create([UserQuest(student_id = student, questionary = questionary, pregenerated = True) for student in students[i:i + batch]])
+
+            answers = []
+
+            for userquest in userquests:
+                answers.extend(draw_answers(userquest, specifications))
+
+            UserAnswer.objects.bulk_create(answers, batch_size = 1000)
+
+    return len(students)
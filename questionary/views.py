@@ -10,22 +10,21 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-import random
 import time
 import textwrap
 import json
 
 from datetime import datetime, timedelta
-from django.db.models import Q
 
 from .forms import InlinePendenciesFormset, InlineSpecificationFormset, \
     QuestionaryForm
 from .models import Questionary, UserAnswer, UserQuest
+from .utils import get_attempt
 from banco_questoes.models import Alternative, Question
+from banco_questoes.utils import count_questions, get_tag_ids
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.urlresolvers import reverse, reverse_lazy
-from django.db import connection
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import formats, timezone
@@ -44,6 +43,8 @@ from amadeus.permissions import has_resource_permissions, \
 from log.decorators import log_decorator
 from log.mixins import LogMixin
 from log.models import Log
+from topics.statistics import ResourceStatistics
+from log.sink import log_sink
 from topics.models import Resource, Topic
 from users.models import User
 
@@ -74,51 +75,16 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.ListView):
             else:
                 self.students = User.objects.filter(resource_students = questionary).order_by('social_name', 'username')
 
-            self.userquest = UserQuest.objects.filter(student = self.students.first(), questionary = questionary)
+            self.userquest = UserQuest.objects.filter(student = self.students.first(), questionary = questionary, pregenerated = False)
             
             if self.userquest:
                 self.userquest = self.userquest.get()
                 self.userquestions = UserAnswer.objects.filter(user_quest = self.userquest).order_by('order')
         else:
-            self.userquest = UserQuest.objects.filter(student = self.request.user, questionary = questionary)
-            if self.userquest:
-                self.userquest = self.userquest.get()
-                self.userquestions = UserAnswer.objects.filter(user_quest = self.userquest).order_by('order')
-            else:
-                self.userquest = UserQuest.objects.create(student = self.request.user, questionary = questionary)
-                q_ids = [0]
-                entries = []
-
-                for specs in questionary.spec_questionary.all():
-                    cats = list(specs.categories.values_list('id', flat = True))
-                    n_questions = specs.n_questions
-
-                    with connection.cursor() as cursor:
-                        cursor.execute('SELECT DISTINCT question_id FROM banco_questoes_question_categories AS a WHERE %s <@ (SELECT array_agg(tag_id) FROM public.banco_questoes_question_categories AS c WHERE c.question_id = a.question_id) AND NOT a.question_id = any(%s)', [cats, q_ids])
-                        rows = cursor.fetchall()
-
-                        list_q = []
-
-                        for row in rows:
-                            list_q.append(row[0])
-
-                        random.shuffle(list_q)
-
-                        q_ids = q_ids + (list_q[0:n_questions])
-                
-                questions = Question.objects.filter(pk__in = q_ids)
-
-                orders = list(range(1, questions.count()+1))
-                random.shuffle(orders)
-
-                for question in questions.all():
-                    entries.append(UserAnswer(user_quest = self.userquest, question = question, order = orders[0]))
-
-                    orders.pop(0)
+            #The attempts of the students are usually created ahead by the questionary cron (see questionary.utils)
+            self.userquest = get_attempt(self.request.user, questionary)
 
-                UserAnswer.objects.bulk_create(entries)
-
-                self.userquestions = UserAnswer.objects.filter(user_quest = self.userquest).order_by('order')
+            self.userquestions = UserAnswer.objects.filter(user_quest = self.userquest).order_by('order')
 
         return questionary
 
@@ -137,13 +103,13 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.ListView):
                 self.students = User.objects.filter(resource_students = questionary).order_by('social_name', 'username')
 
             if not user is None:
-                self.userquest = UserQuest.objects.filter(student__email = user, questionary = questionary)
+                self.userquest = UserQuest.objects.filter(student__email = user, questionary = questionary, pregenerated = False)
 
                 if self.userquest:
                     self.userquest = self.userquest.get()
                     self.userquestions = UserAnswer.objects.filter(user_quest = self.userquest).order_by('order')
             else:
-                self.userquest = UserQuest.objects.filter(student = self.students.first(), questionary = questionary)
+                self.userquest = UserQuest.objects.filter(student = self.students.first(), questionary = questionary, pregenerated = False)
                 
                 if self.userquest:
                     self.userquest = self.userquest.get()
@@ -214,9 +180,9 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.ListView):
         self.log_context['questionary_slug'] = questionary.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+        log = super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -460,6 +426,9 @@ class UpdateView(LoginRequiredMixin, LogMixin, generic.UpdateView):
 
             if not spec_form.n_questions or spec_form.n_questions == "":
                spec_form.delete()
+
+        #The attempts created ahead may not follow the new specifications, the students get new ones when they open it
+        UserQuest.objects.filter(questionary = self.object, pregenerated = True).delete()
         
         self.log_context['category_id'] = self.object.topic.subject.category.id
         self.log_context['category_name'] = self.object.topic.subject.category.name
@@ -552,11 +521,10 @@ def countQuestions(request):
     total = 0
 
     if tags:
-        tags = tags.split(',')
-        with connection.cursor() as cursor:
-            cursor.execute('SELECT COUNT(DISTINCT question_id) FROM banco_questoes_question_categories AS a WHERE %s <@ (SELECT array_agg(CAST(tag_id as text)) FROM public.banco_questoes_question_categories AS c WHERE c.question_id = a.question_id)', [tags])
-            total = cursor.fetchone()
-            total = total[0]
+        tags = get_tag_ids(tags.split(','))
+
+        if not tags is None:
+            total = count_questions(tags)
         
     return JsonResponse({'total': total})
 
@@ -616,7 +584,7 @@ def answer(request):
         log.context['questionary_id'] = questionary_data.id
         log.context['questionary_name'] = questionary_data.name
         log.context['questionary_slug'] = questionary_data.slug
-        log.save()
+        log_sink.write(log)
 
     return JsonResponse({'last_update': formats.date_format(userquest.last_update, "SHORT_DATETIME_FORMAT"), 'answered': userquest.useranswer_userquest.filter(answer__isnull = False).count()})
 
@@ -675,72 +643,37 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
         context["init_date"] = start_date
         context["end_date"] = end_date
         
-        alunos = questionary.students.all()
-        
-        if questionary.all_students :
-            alunos = questionary.topic.subject.students.all()
-
-        vis_ou = Log.objects.filter(context__contains={'questionary_id':questionary.id},resource="questionary",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + timedelta(minutes = 1))).filter(Q(action="view") | Q(action="finish") | Q(action="start"))
+        statistics = ResourceStatistics(questionary, "questionary", ["view", "finish", "start"], start_date, end_date + timedelta(minutes = 1))
         
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
+        data_history = []
 
-        for log_al in vis_ou.order_by("datetime"):
-            if log_al.action == 'view':
-                if any(log_al.user in x for x in data_history):
+        for log_user, group, action, date in statistics.get_history(lambda email, user: user):
+            if action == 'view':
+                if any(log_user in x for x in data_history):
                     continue
-            elif log_al.action == 'finish':
+            elif action == 'finish':
                 index = None
 
                 for dh in data_history:
-                    if log_al.user in dh:
+                    if log_user in dh:
                         index = dh
                         break
 
                 if not index is None:
                     data_history.remove(index)
                     
-            data_history.append([log_al.user,
-            ", ".join([str(x) for x in questionary.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
-
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="view").distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in questionary.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('View')), str(alun.email)])
-            index += 1
-
-        not_start = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="start").distinct("user_email")])
-        for alun in not_start:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in questionary.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('Start')), str(alun.email)])
-            index += 1
-
-        not_finish = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="finish").distinct("user_email")])
-        for alun in not_finish:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in questionary.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('Finish')), str(alun.email)])
-            index += 1
-
-        json_n_did["data"] = data_n_did
-
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
+            data_history.append([log_user, group, action, date])
         
-        c_visualizou = vis_ou.filter(action="view").distinct("user_email").count()
-        c_start = vis_ou.filter(action="start").distinct("user_email").count()
-        c_finish = vis_ou.filter(action="finish").distinct("user_email").count()
-
         column_view = str(_('View'))
         column_start = str(_('Start'))
         column_finish = str(_('Finish'))
+        columns = [("view", column_view), ("start", column_start), ("finish", column_finish)]
+
+        context["json_n_did"] = {"data": statistics.get_not_did(columns)}
+        context["json_history"] = {"data": data_history}
         
-        re.append([str(_('Questionary')),did,n_did])
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
-        re.append([column_start,c_start, alunos.count() - c_start])
-        re.append([column_finish,c_finish, alunos.count() - c_finish])
+        re = statistics.get_chart(str(_('Questionary')), did, n_did, columns)
         
         context['topic'] = questionary.topic
         context['subject'] = questionary.topic.subject
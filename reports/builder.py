@@ -0,0 +1,436 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# Interaction reports built by the report_worker: every variable is computed for all the students at once with
+# grouped queries and the rows are written straight to the csv and xlsx files of the job
+
+import csv
+import math
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractHour, ExtractWeekDay
+from django.utils import timezone, translation
+from django.utils.translation import ugettext as _, ugettext_noop
+from openpyxl import Workbook
+
+from chat.models import TalkMessages
+from log.archive import archived_logs, is_archived
+from log.models import Log
+from mural.models import Comment, MuralVisualizations, SubjectPost
+from subjects.models import Tag
+from topics.models import Resource, Topic
+
+from .models import ReportJob
+
+#Ranges of hours (as in datetime__hour__range) of the accesses to the subject
+HOUR_RANGES = [
+    (ugettext_noop('Number of access to mural between 6 a.m to 12a.m. .'), 5, 11),
+    (ugettext_noop('Number of access to mural between 0 p.m to 6p.m. .'), 11, 17),
+    (ugettext_noop('Number of access to mural between 6 p.m to 12p.m. .'), 17, 23),
+    (ugettext_noop('Number of access to mural between 0 a.m to 6a.m. .'), 23, 5),
+]
+
+#Indexed by the week day of the database (1 is sunday)
+DAY_NAMES = [ugettext_noop("sunday"), ugettext_noop("monday"), ugettext_noop("tuesday"), ugettext_noop("wednesday"),
+             ugettext_noop("thursday"), ugettext_noop("friday"), ugettext_noop("saturday")]
+
+
+def process_date(init_date, end_date):
+    # so it accepts english and portuguese date formats
+    date_formats = ["%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d"]
+
+    for fmt in date_formats:
+        try:
+            init_date = datetime.strptime(init_date, fmt).date()
+            end_date = datetime.strptime(end_date, fmt).date()
+        except ValueError:
+            pass
+
+    # so the system can gather data up to end_date 11h59 p.m.
+    end_date = end_date + timedelta(days=1)
+
+    return init_date, end_date
+
+
+def local_week_day(value):
+    # as ExtractWeekDay, 1 is sunday
+    return timezone.localtime(value).isoweekday() % 7 + 1
+
+
+def count_by(queryset, field):
+    return dict(queryset.values_list(field).annotate(total=Count('id')).order_by())
+
+
+def resource_names():
+    return {
+        'pdffile': _('PDF File'),
+        'goals': _('Topic Goals'),
+        'link': _('Link to Website'),
+        'filelink': _('File Link'),
+        'webconference': _('Web Conference'),
+        'ytvideo': _('YouTube Video'),
+        'webpage': _('WebPage'),
+        'questionary': _('Questionary')}
+
+
+def calculateHoursViewed(hours_viewed, init_time, end_time, resource_init_field, resource_end_time_field):
+    begin_time = int(init_time.context[resource_init_field])
+    end_time = int(end_time.context[resource_end_time_field])
+    time_delta = math.fabs(end_time - begin_time)
+    hours_viewed += time_delta / 3600
+    return hours_viewed
+
+
+def calculateHoursViewedTimeDelta(hours_viewed, watch_time, resource_init_field, resource_end_time_field):
+    begin_time = timedelta(microseconds=int(watch_time.context[resource_init_field]))
+    end_time = timedelta(microseconds=int(watch_time.context[resource_end_time_field]))
+    time_delta = end_time - begin_time
+    hours_viewed += time_delta.microseconds / 3600
+    return hours_viewed
+
+
+class InteractionReport(object):
+    """
+        Interaction variables of the students of a subject, from the parameters of the report form (the query string
+        the report view receives, as a dict of lists). The variables are columns of values by student id
+    """
+
+    def __init__(self, subject, params):
+        self.subject = subject
+        self.from_mural = params['from_mural'][0] == "True"
+        self.from_messages = params['from_messages'][0] == "True"
+        self.resources_types = params.get('resource', [])
+        self.tags = params.get('tag', [])
+        self.init_date, self.end_date = process_date(params['init_date'][0], params['end_date'][0])
+
+        if params['topic'][0] == _("All"):
+            self.topic = None
+            self.topics = subject.topic_subject.all()
+        else:
+            self.topic = Topic.objects.get(id=int(params['topic'][0]))
+            self.topics = [self.topic]
+
+        self.students = list(subject.students.all())
+        self.student_ids = [student.id for student in self.students]
+        self.professor_ids = set(subject.professor.values_list('id', flat=True))
+
+        self.columns = OrderedDict()
+
+    def add_column(self, label, values, default=0):
+        self.columns[str(label)] = (values, default)
+
+    def logs(self, **kwargs):
+        return Log.objects.filter(subject_id=self.subject.id, user_id__in=self.student_ids,
+                                  datetime__range=(self.init_date, self.end_date), **kwargs)
+
+    def archived_logs(self, **kwargs):
+        # the logs older than the retention period are read from the archive files
+        if not is_archived(self.init_date):
+            return []
+
+        return list(archived_logs(self.init_date, self.end_date, subject_id=self.subject.id,
+                                  user_id__in=set(self.student_ids), **kwargs))
+
+    def add_mural_columns(self):
+        dates = (self.init_date, self.end_date)
+        help_posts = SubjectPost.objects.filter(action="help", space=self.subject, create_date__range=dates)
+        comments = Comment.objects.filter(post__in=help_posts, create_date__range=dates)
+
+        commented_by_teachers = Comment.objects.filter(user__in=self.professor_ids).values('post')
+        commented_by_others = Comment.objects.filter(user__in=self.student_ids).exclude(user=F('post__user')).values('post')
+
+        self.add_column(_('Number of help posts created by the user.'), count_by(help_posts, 'user'))
+        self.add_column(_('Amount of comments on help posts created by the student.'), count_by(comments, 'post__user'))
+        self.add_column(_('Amount of comments made by the student on teachers help posts.'),
+                        count_by(comments.filter(post__user__in=self.professor_ids), 'user'))
+        self.add_column(_('Amount of comments made by the student on other students help posts.'),
+                        count_by(comments.exclude(post__user=F('user')), 'user'))
+        self.add_column(_('Number of help posts created by the user that the teacher commented on.'),
+                        count_by(help_posts.filter(id__in=commented_by_teachers), 'user'))
+        self.add_column(_('Number of help posts created by the user others students commented on.'),
+                        count_by(help_posts.filter(id__in=commented_by_others), 'user'))
+
+        posts = SubjectPost.objects.filter(space=self.subject, create_date__range=dates)
+
+        self.add_column(_('Number of student visualizations on the mural of the subject.'),
+                        count_by(MuralVisualizations.objects.filter(post__in=posts, user__in=self.student_ids), 'user'))
+
+    def add_messages_columns(self):
+        students = set(self.student_ids)
+        participants = students | self.professor_ids
+
+        sent_students, received_students, sent_professors, received_professors = {}, {}, {}, {}
+        contacts = {}
+
+        messages = TalkMessages.objects.filter(subject=self.subject, talk__isnull=False, user__in=participants)\
+            .values_list('user', 'talk__user_one', 'talk__user_two').annotate(total=Count('id')).order_by()
+
+        for sender, user_one, user_two, total in messages:
+            if sender == user_one:
+                other = user_two
+            elif sender == user_two:
+                other = user_one
+            else:
+                continue
+
+            if sender in students and other in students and other != sender:
+                sent_students[sender] = sent_students.get(sender, 0) + total
+                received_students[other] = received_students.get(other, 0) + total
+                contacts.setdefault(sender, set()).add(other)
+
+            if sender in students and other in self.professor_ids:
+                sent_professors[sender] = sent_professors.get(sender, 0) + total
+
+            if sender in self.professor_ids and other in students:
+                received_professors[other] = received_professors.get(other, 0) + total
+
+        self.add_column(_(" amount of messages sent to other students"), sent_students)
+        self.add_column(_("amount of messages received from other students"), received_students)
+        self.add_column(_("amount of distinct students to whom sent messages"),
+                        {student: len(others) for student, others in contacts.items()})
+        self.add_column(_("amount messages sent to professors"), sent_professors)
+        self.add_column(_("amount of messages received from professors"), received_professors)
+
+    def get_tagged_resources(self, resource_type, tag):
+        if tag == "-1":
+            # every tag of the resources of this kind in the topics
+            tags = Tag.objects.filter(resource_tags__topic__in=self.topics, resource_tags___my_subclass=resource_type)\
+                .exclude(name="").values('id')
+        else:
+            tags = [int(tag)]
+
+        return list(Resource.objects.filter(tags__in=tags, topic__in=self.topics).values_list('id', flat=True).distinct())
+
+    def add_resources_columns(self):
+        names = resource_names()
+
+        for resource_type, tag in zip(self.resources_types, self.tags):
+            resource_type = resource_type.lower()
+            resources = self.get_tagged_resources(resource_type, tag)
+
+            logs = self.logs(resource=resource_type, resource_type=resource_type, resource_id__in=resources)
+            archived = self.archived_logs(resource=resource_type, resource_type=resource_type, resource_id__in=set(resources))
+            views = logs.filter(action="view")
+            archived_views = [log for log in archived if log.action == "view"]
+
+            # the views of a single topic are the ones made from it
+            if not self.topic is None:
+                views = views.filter(context__contains={'topic_id': self.topic.id})
+                archived_views = [log for log in archived_views if log.context.get('topic_id') == self.topic.id]
+
+            views = list(views.annotate(week_day=ExtractWeekDay('datetime')).values_list('user_id', 'resource_id', 'week_day')
+                         .annotate(total=Count('id')).order_by())
+            views += [(log.user_id, log.resource_id, local_week_day(log.datetime), 1) for log in archived_views]
+
+            totals, viewed, days = {}, {}, {}
+
+            for user, resource, week_day, total in views:
+                totals[user] = totals.get(user, 0) + total
+                viewed.setdefault(user, set()).add(resource)
+                days.setdefault(user, set()).add((resource, week_day))
+
+            if tag != "-1":
+                suffix = _(" with tag ") + Tag.objects.get(id=int(tag)).name
+            else:
+                suffix = ""
+
+            self.add_column(_("number of visualizations of ") + names[resource_type] + suffix, totals)
+            self.add_column(_("number of visualizations of distintic ") + names[resource_type] + suffix,
+                            {user: len(resources) for user, resources in viewed.items()})
+            self.add_column(_("distintic days ") + names[resource_type] + suffix,
+                            {user: len(resource_days) for user, resource_days in days.items()})
+
+            if resource_type in ["ytvideo", "webconference"]:
+                self.add_column(_("hours viewed of ") + resource_type + suffix, self.get_hours_viewed(resource_type, logs, archived))
+
+    def get_hours_viewed(self, resource_type, logs, archived):
+        hours = {}
+
+        def with_archived(queryset, action):
+            return list(queryset) + [log for log in archived if log.action == action]
+
+        if resource_type == "ytvideo":
+            for watch_time in with_archived(logs.filter(action="watch").only('user_id', 'context'), "watch"):
+                hours[watch_time.user_id] = calculateHoursViewedTimeDelta(hours.get(watch_time.user_id, 0), watch_time,
+                                                                          'timestamp_start', 'timestamp_end')
+        else:
+            # every session of a resource is measured up to the first participation logged on it
+            end_times = {}
+
+            participations = with_archived(logs.filter(action="participate").only('user_id', 'resource_id', 'context'), "participate")
+
+            for end_time in sorted(participations, key=lambda log: log.id):
+                end_times.setdefault((end_time.user_id, end_time.resource_id), end_time)
+
+            for init_time in with_archived(logs.filter(action="initwebconference").only('user_id', 'resource_id', 'context'), "initwebconference"):
+                end_time = end_times.get((init_time.user_id, init_time.resource_id), None)
+
+                if not end_time is None:
+                    hours[init_time.user_id] = calculateHoursViewed(hours.get(init_time.user_id, 0), init_time, end_time,
+                                                                    'webconference_init', 'webconference_finish')
+
+        return hours
+
+    def add_access_columns(self):
+        accesses = self.logs(action="access", resource="subject")\
+            .annotate(hour=ExtractHour('datetime'), week_day=ExtractWeekDay('datetime'))\
+            .values_list('user_id', 'hour', 'week_day').annotate(total=Count('id')).order_by()
+
+        accesses = list(accesses) + [(log.user_id, timezone.localtime(log.datetime).hour, local_week_day(log.datetime), 1)
+                                     for log in self.archived_logs(action="access", resource="subject")]
+
+        hours = [{} for hour_range in HOUR_RANGES]
+        week_days = [{} for day in DAY_NAMES]
+
+        for user, hour, week_day, total in accesses:
+            for i, (label, start, end) in enumerate(HOUR_RANGES):
+                if start <= hour <= end:
+                    hours[i][user] = hours[i].get(user, 0) + total
+
+            week_days[week_day - 1][user] = week_days[week_day - 1].get(user, 0) + total
+
+        for (label, start, end), values in zip(HOUR_RANGES, hours):
+            self.add_column(_(label), values)
+
+        for day, values in zip(DAY_NAMES, week_days):
+            self.add_column(_('Number of access to the subject on ') + _(day), values)
+
+        distinct_days = {}
+
+        for values in week_days:
+            for user in values.keys():
+                distinct_days[user] = distinct_days.get(user, 0) + 1
+
+        self.add_column(_('Number of distinct days the user access the subject. '), distinct_days)
+
+    def build(self):
+        if self.from_mural:
+            self.add_mural_columns()
+
+        if self.from_messages:
+            self.add_messages_columns()
+
+        if len(self.resources_types) > 0:
+            self.add_resources_columns()
+
+        self.add_access_columns()
+
+        self.add_column(_("Class"), {}, _("Undefined"))
+        self.add_column(_("Performance"), {}, _("Undefined"))
+
+    def get_header(self):
+        return [_('User')] + list(self.columns.keys())
+
+    def get_rows(self):
+        for student in self.students:
+            row = [student.social_name if len(student.social_name) > 0 else student.username]
+
+            for values, default in self.columns.values():
+                row.append(values.get(student.id, default))
+
+            yield row
+
+
+def build_report(job):
+    """
+        Computes the report of the job and writes its rows to the csv and xlsx files, one row at a time
+    """
+    with translation.override(job.params.get('language', [settings.LANGUAGE_CODE])[0]):
+        report = InteractionReport(job.subject, job.params)
+        report.build()
+
+        folder = os.path.join(settings.MEDIA_ROOT, 'reports')
+
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        csv_name = os.path.join('reports', 'report%d.csv' % job.id)
+        xls_name = os.path.join('reports', 'report%d.xlsx' % job.id)
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('first_sheet')
+
+        rows = 0
+
+        with open(os.path.join(settings.MEDIA_ROOT, csv_name), 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+
+            header = report.get_header()
+
+            writer.writerow(header)
+            sheet.append(header)
+
+            for row in report.get_rows():
+                writer.writerow(row)
+                sheet.append(row)
+
+                rows += 1
+
+        workbook.save(os.path.join(settings.MEDIA_ROOT, xls_name))
+
+    job.csv_file.name = csv_name
+    job.xls_file.name = xls_name
+    job.rows = rows
+
+
+def claim_report():
+    """
+        Marks the oldest pending job as running and returns it, None when there is none. Jobs left running by an interrupted
+        worker for more than REPORT_TIMEOUT seconds are taken again
+    """
+    stale = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_TIMEOUT', 1800))
+
+    with transaction.atomic():
+        #Locked jobs are being claimed by another worker
+        jobs = list(ReportJob.objects.raw("SELECT * FROM reports_reportjob WHERE status = %s OR (status = %s AND start_date < %s) ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED",
+                                          [ReportJob.PENDING, ReportJob.RUNNING, stale]))
+
+        if not jobs:
+            return None
+
+        job = jobs[0]
+        job.status = ReportJob.RUNNING
+        job.start_date = timezone.now()
+        job.save(update_fields=['status', 'start_date'])
+
+    return job
+
+
+def run_reports(limit=10):
+    built = 0
+
+    while built < limit:
+        job = claim_report()
+
+        if job is None:
+            break
+
+        try:
+            build_report(job)
+
+            job.status = ReportJob.DONE
+        except Exception as e:
+            job.status = ReportJob.FAILED
+            job.error = str(e)
+
+        job.end_date = timezone.now()
+        job.save()
+
+        built += 1
+
+    return built
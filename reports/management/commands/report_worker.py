@@ -0,0 +1,43 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from reports.builder import run_reports
+
+class Command(BaseCommand):
+	help = "Builds the interaction reports requested by the users"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--once', action = 'store_true', help = "Build what is queued and exit")
+		parser.add_argument('--limit', type = int, default = 10, help = "Maximum reports built on each round")
+
+	def handle(self, *args, **options):
+		interval = getattr(settings, 'REPORT_POLL_INTERVAL', 2)
+
+		while True:
+			close_old_connections()
+
+			built = run_reports(options['limit'])
+
+			if options['once']:
+				self.stdout.write("Built %d reports" % built)
+
+				break
+
+			if built < options['limit']:
+				time.sleep(interval)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.4 on 2026-10-18 17:40
+from __future__ import unicode_literals
+
+from django.conf import settings
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('subjects', '0017_auto_20180830_1121'),
+        ('reports', '0006_auto_20170323_1629'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('params', django.contrib.postgres.fields.jsonb.JSONField(verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10, verbose_name='Status')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('rows', models.IntegerField(default=0, verbose_name='Rows')),
+                ('csv_file', models.FileField(blank=True, upload_to='reports/', verbose_name='CSV File')),
+                ('xls_file', models.FileField(blank=True, upload_to='reports/', verbose_name='XLSX File')),
+                ('create_date', models.DateTimeField(auto_now_add=True, verbose_name='Create Date')),
+                ('start_date', models.DateTimeField(blank=True, null=True, verbose_name='Start Date')),
+                ('end_date', models.DateTimeField(blank=True, null=True, verbose_name='End Date')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='subjects.Subject', verbose_name='Subject')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Report job',
+                'verbose_name_plural': 'Report jobs',
+            },
+        ),
+    ]
@@ -10,7 +10,11 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+from django.contrib.postgres.fields import JSONField
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+from subjects.models import Subject
 from users.models import User
 # Create your models here.
 class ReportCSV(models.Model):
@@ -37,4 +41,45 @@ class ReportXLS(models.Model):
 
     def __str__(self):
         pass
-    
\ No newline at end of file
+
+
+class ReportJob(models.Model):
+    """
+        Interaction report requested by a user, built in background by the report_worker (see reports.builder)
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    )
+
+    user = models.ForeignKey(User, verbose_name = _('User'), related_name = 'report_jobs')
+    subject = models.ForeignKey(Subject, verbose_name = _('Subject'), related_name = 'report_jobs')
+    params = JSONField(_('Parameters'))
+    status = models.CharField(_('Status'), max_length = 10, choices = STATUS_CHOICES, default = PENDING, db_index = True)
+    error = models.TextField(_('Error'), blank = True)
+    rows = models.IntegerField(_('Rows'), default = 0)
+    csv_file = models.FileField(_('CSV File'), upload_to = 'reports/', blank = True)
+    xls_file = models.FileField(_('XLSX File'), upload_to = 'reports/', blank = True)
+    create_date = models.DateTimeField(_('Create Date'), auto_now_add = True)
+    start_date = models.DateTimeField(_('Start Date'), null = True, blank = True)
+    end_date = models.DateTimeField(_('End Date'), null = True, blank = True)
+
+    class Meta:
+        verbose_name = _('Report job')
+        verbose_name_plural = _('Report jobs')
+
+    def __str__(self):
+        return "%s - %s (%s)" % (self.subject, self.user, self.status)
+
+    def delete(self, *args, **kwargs):
+        self.csv_file.delete(save = False)
+        self.xls_file.delete(save = False)
+
+        super(ReportJob, self).delete(*args, **kwargs)
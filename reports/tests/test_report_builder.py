@@ -0,0 +1,82 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from chat.models import Conversation, TalkMessages
+from log.models import Log
+from reports.builder import InteractionReport
+from subjects.models import Subject
+from users.models import User
+
+#The variables are named in the active language
+@override_settings(LANGUAGE_CODE = 'en')
+class ReportBuilderTest(TestCase):
+
+	def setUp(self):
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+
+		self.student = User.objects.create(username = "student01", email = "student01@amadeus.br")
+		self.other = User.objects.create(username = "student02", email = "student02@amadeus.br")
+		self.professor = User.objects.create(username = "professor01", email = "professor01@amadeus.br")
+
+		self.subject.students.add(self.student, self.other)
+		self.subject.professor.add(self.professor)
+
+		today = date.today().strftime("%Y-%m-%d")
+
+		self.params = {'topic': ["All"], 'init_date': [(date.today() - timedelta(days = 7)).strftime("%Y-%m-%d")], 'end_date': [today],
+			'from_mural': ["False"], 'from_messages': ["True"], 'subject_id': [str(self.subject.id)]}
+
+	def get_row(self, report, user):
+		header = report.get_header()
+
+		for row in report.get_rows():
+			if row[0] == user.username:
+				return dict(zip(header, row))
+
+	def test_messages_columns(self):
+		talk = Conversation.objects.create(user_one = self.student, user_two = self.other)
+		TalkMessages.objects.create(text = "hi", talk = talk, subject = self.subject, user = self.student)
+		TalkMessages.objects.create(text = "hello", talk = talk, subject = self.subject, user = self.student)
+		TalkMessages.objects.create(text = "hey", talk = talk, subject = self.subject, user = self.other)
+
+		talk = Conversation.objects.create(user_one = self.professor, user_two = self.student)
+		TalkMessages.objects.create(text = "welcome", talk = talk, subject = self.subject, user = self.professor)
+
+		report = InteractionReport(self.subject, self.params)
+		report.build()
+
+		row = self.get_row(report, self.student)
+
+		self.assertEqual(row[" amount of messages sent to other students"], 2)
+		self.assertEqual(row["amount of messages received from other students"], 1)
+		self.assertEqual(row["amount of distinct students to whom sent messages"], 1)
+		self.assertEqual(row["amount of messages received from professors"], 1)
+		self.assertEqual(self.get_row(report, self.other)["amount of messages received from other students"], 2)
+
+	def test_access_columns(self):
+		Log.objects.create(component = "subject", action = "access", resource = "subject", user = str(self.student), user_id = self.student.id,
+			user_email = self.student.email, context = {'subject_id': self.subject.id}, datetime = timezone.now() - timedelta(days = 1))
+
+		report = InteractionReport(self.subject, self.params)
+		report.build()
+
+		row = self.get_row(report, self.student)
+
+		self.assertEqual(row["Number of distinct days the user access the subject. "], 1)
+		self.assertEqual(self.get_row(report, self.other)["Number of distinct days the user access the subject. "], 0)
@@ -17,8 +17,10 @@ from . import views
 urlpatterns = [
     url(r'^create/interactions/$', views.ReportView.as_view(), name='create_interaction'),
     url(r'^view/interactions/$', views.ViewReportView.as_view(), name='view_report'),
+    url(r'^view/interactions/(?P<job>[\d]+)/$', views.ReportJobView.as_view(), name='report_job'),
+    url(r'^view/interactions/(?P<job>[\d]+)/status/$', views.report_status, name='report_status'),
     url(r'^get/resources/$', views.get_resources, name='get_resource_and_tags'),
     url(r'^get/tags/$', views.get_tags, name='get_tags'),
-    url(r'^post/download_report/$', views.download_report_csv, name="download_report_csv"),
-    url(r'^post/download_report/excel$', views.download_report_xls, name="download_report_xls"),
+    url(r'^post/download_report/(?P<job>[\d]+)/$', views.download_report_csv, name="download_report_csv"),
+    url(r'^post/download_report/(?P<job>[\d]+)/excel$', views.download_report_xls, name="download_report_xls"),
 ]
\ No newline at end of file
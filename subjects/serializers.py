@@ -10,14 +10,9 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
-import datetime
-from django.db.models import Q
-
 from rest_framework import serializers
 
-from chat.models import ChatVisualizations
-from mural.models import MuralVisualizations
-from notifications.models import Notification
+from amadeus.counters import get_count
 
 from .models import Subject, Tag
 
@@ -49,11 +44,12 @@ class SubjectSerializer(serializers.ModelSerializer):
     notifications = serializers.SerializerMethodField()
     pendencies = serializers.SerializerMethodField()
 
+    #The totals come from the cached unread counters of the user, shared by all the subjects serialized in a request
     def get_mural(self, subject):
         user = self.context.get("request_user", None)
 
         if user is not None:
-            return MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(post__subjectpost__space = subject) | Q(comment__post__subjectpost__space = subject))).count()
+            return get_count(user, 'mural', 'subject', subject.id)
 
         return 0
 
@@ -61,11 +57,7 @@ class SubjectSerializer(serializers.ModelSerializer):
         user = self.context.get("request_user", None)
 
         if user is not None:
-            return ChatVisualizations.objects.filter(Q(user=user) & Q(viewed=False) & Q(message__subject=subject)
-                                                     & (Q(user__is_staff=True) | Q(message__subject__students=user)
-                                                        | Q(message__subject__professor=user)
-                                                        | Q(message__subject__category__coordinators=user)))\
-                .distinct().count()
+            return get_count(user, 'chat', 'subject', subject.id)
 
         return 0
 
@@ -73,9 +65,7 @@ class SubjectSerializer(serializers.ModelSerializer):
         user = self.context.get("request_user", None)
 
         if user is not None:
-            return Notification.objects.filter(Q(user = user) & Q(viewed = False) 
-                                            & Q(task__resource__topic__subject = subject)
-                                            & Q(creation_date = datetime.datetime.now())).count()
+            return get_count(user, 'notifications', 'subject', subject.id)
 
         return 0
 
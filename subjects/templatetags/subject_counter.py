@@ -12,11 +12,8 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 
 import datetime
 from django import template
-from django.db.models import Q
 
-from chat.models import ChatVisualizations
-from mural.models import MuralVisualizations
-from notifications.models import Notification
+from amadeus.counters import get_count
 
 register = template.Library()
 
@@ -37,7 +34,7 @@ def subject_count(category, user):
 def notifies_number(subject, user):
 	context = {}
 
-	context['number'] = Notification.objects.filter(task__resource__topic__subject = subject, creation_date = datetime.datetime.now(), viewed = False, user = user).count()
+	context['number'] = get_count(user, 'notifications', 'subject', subject.id)
 	context['custom_class'] = 'pendencies_notify'
 	
 	return context
@@ -46,7 +43,7 @@ def notifies_number(subject, user):
 def mural_number(subject, user):
 	context = {}
 
-	context['number'] = MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(post__subjectpost__space = subject) | Q(comment__post__subjectpost__space = subject))).count()
+	context['number'] = get_count(user, 'mural', 'subject', subject.id)
 	context['custom_class'] = 'mural_notify'
 	
 	return context
@@ -55,7 +52,7 @@ def mural_number(subject, user):
 def chat_number(subject, user):
 	context = {}
 
-	context['number'] = ChatVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & Q(message__subject = subject) & (Q(user__is_staff = True) | Q(message__subject__students = user) | Q(message__subject__professor = user) | Q(message__subject__category__coordinators = user))).distinct().count()
+	context['number'] = get_count(user, 'chat', 'subject', subject.id)
 	context['custom_class'] = 'chat_notify'
 	
 	return context
@@ -64,7 +61,7 @@ def chat_number(subject, user):
 def resource_mural_number(resource, user):
 	context = {}
 
-	context['number'] = MuralVisualizations.objects.filter(Q(user = user) & Q(viewed = False) & (Q(post__subjectpost__resource = resource) | Q(comment__post__subjectpost__resource = resource))).count()
+	context['number'] = get_count(user, 'mural', 'resource', resource.id)
 	context['custom_class'] = 'mural_resource_notify'
 	
 	return context
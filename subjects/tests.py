@@ -10,6 +10,48 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+from datetime import date
+
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-# Create your tests here.
+from amadeus.permissions import has_category_permissions, has_subject_permissions, has_subject_view_permissions
+from categories.models import Category
+from users.models import User
+
+from .models import Subject
+
+class PermissionsTest(TestCase):
+
+    def setUp(self):
+        self.coordinator = User.objects.create(username = "coordinator", email = "coordinator@amadeus.br")
+        self.student = User.objects.create(username = "student", email = "student@amadeus.br")
+
+        self.category = Category.objects.create(name = "Category")
+        self.category.coordinators.add(self.coordinator)
+
+        self.subjects = [Subject.objects.create(name = "Subject %d" % i, visible = True, init_date = date.today(), end_date = date.today(), subscribe_begin = date.today(), subscribe_end = date.today(), category = self.category) for i in range(10)]
+        self.subjects[0].students.add(self.student)
+
+    def test_coordinator(self):
+        self.assertTrue(has_category_permissions(self.coordinator, self.category))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(all(has_subject_permissions(self.coordinator, subject) for subject in self.subjects))
+
+    def test_student(self):
+        self.assertFalse(has_category_permissions(self.student, self.category))
+
+        #The role sets are loaded once and reused by every check
+        with self.assertNumQueries(2):
+            views = [has_subject_view_permissions(self.student, subject) for subject in self.subjects]
+
+        self.assertEqual(views, [True] + [False] * 9)
+        self.assertFalse(has_subject_permissions(self.student, self.subjects[0]))
+
+    def test_anonymous(self):
+        anonymous = AnonymousUser()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(any(has_subject_view_permissions(anonymous, subject) for subject in self.subjects))
+            self.assertFalse(has_category_permissions(anonymous, self.category))
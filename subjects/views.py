@@ -33,7 +33,6 @@ from collections import namedtuple
 
 from log.mixins import LogMixin
 from log.decorators import log_decorator_ajax
-from log.models import Log
 from itertools import chain
 from .models import Tag
 import time
@@ -42,7 +41,9 @@ from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from .forms import CreateSubjectForm, UpdateSubjectForm
 from .utils import has_student_profile, has_professor_profile, count_subjects, get_category_page
 from users.models import User
+from users.presence import get_statuses
 from topics.models import Topic, Resource
+from topics.versions import touch_subject
 from news.models import News
 
 import os
@@ -76,7 +77,7 @@ from webconference.models import Webconference
 from questionary.serializers import SimpleQuestionarySerializer, CompleteQuestionarySerializer
 from questionary.models import Questionary
 
-from amadeus.permissions import has_category_permissions, has_subject_permissions, has_subject_view_permissions, has_resource_permissions
+from amadeus.permissions import has_category_permissions, has_subject_permissions, has_subject_view_permissions, get_accessible_resources, clear_roles
 
 
 class HomeView(LoginRequiredMixin, ListView):
@@ -446,6 +447,8 @@ class SubjectUpdateView(LoginRequiredMixin, LogMixin, UpdateView):
             Topic.objects.filter(subject=self.object, repository=False).update(visible=False)
             Resource.objects.filter(topic__subject=self.object, topic__repository=False).update(visible=False)
 
+            touch_subject(self.object.id)
+
         self.log_context['category_id'] = self.object.category.id
         self.log_context['category_name'] = self.object.category.name
         self.log_context['category_slug'] = self.object.category.slug
@@ -597,10 +600,10 @@ class SubjectDetailView(LoginRequiredMixin, LogMixin, DetailView):
         self.log_context['subject_slug'] = self.object.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(SubjectDetailView, self).createLog(self.request.user, self.log_component, self.log_action,
-                                                 self.log_resource, self.log_context)
+        log = super(SubjectDetailView, self).createLog(self.request.user, self.log_component, self.log_action,
+                                                       self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -640,6 +643,8 @@ class SubjectSubscribeView(LoginRequiredMixin, LogMixin, TemplateView):
 
             subject.students.add(request.user)
             subject.save()
+
+            clear_roles(request.user)
             messages.success(self.request, _('Subscription was successfull!'))
 
         return redirect(reverse_lazy('subjects:view', kwargs={"slug": subject.slug}))
@@ -687,10 +692,8 @@ class SubjectSearchView(LoginRequiredMixin, LogMixin, ListView):
 
         subjects = Subject.objects.filter(q).distinct()
 
-        self.resources = Resource.objects.select_related('link', 'filelink', 'webpage', 'ytvideo', 'pdffile')\
-            .filter(q).distinct()
-        self.resources = [resource.id for resource in self.resources if has_resource_permissions(self.request.user,
-                                                                                                 resource)]
+        self.resources = Resource.objects.select_related('topic').filter(q).distinct()
+        self.resources = [resource.id for resource in get_accessible_resources(self.request.user, self.resources)]
         self.resources = Resource.objects.select_related('link', 'filelink', 'webpage', 'ytvideo', 'pdffile')\
             .filter(id__in=self.resources)
 
@@ -748,7 +751,7 @@ def subject_view_log(request, subject):
 
         request.log_context = log_context
 
-        log_id = Log.objects.latest('id').id
+        log_id = request.log_id
 
         return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -758,22 +761,24 @@ def subject_view_log(request, subject):
 def get_participants(request, subject):
     sub = subject
 
-    status_query = "SELECT CASE WHEN action = 'logout' AND EXTRACT(EPOCH FROM(NOW() - datetime::timestamp)) " \
-                    "< 1200 THEN 2 WHEN action = 'logout' AND EXTRACT(EPOCH FROM(NOW() - datetime::timestamp)) " \
-                    ">= 1200 THEN 1 ELSE 0 END FROM log_log WHERE log_log.user_id = users_user.id " \
-                    "ORDER BY datetime DESC LIMIT 1"
-
-    expire_time = settings.SESSION_SECURITY_EXPIRE_AFTER
-
     context = {}
 
     context['subject'] = get_object_or_404(Subject, slug = sub)
 
-    context['participants'] = User.objects.filter(
+    participants = list(User.objects.filter(
         Q(subject_student__slug=sub) |
         Q(professors__slug=sub)
-        ).extra(select={'status': status_query}, select_params=(expire_time, expire_time,),).distinct()\
-        .order_by('status', 'social_name', 'username').exclude(email=request.user.email)
+        ).distinct().exclude(email=request.user.email))
+
+    statuses = get_statuses([participant.id for participant in participants])
+
+    # Online users first, then the away and the offline ones
+    order = {"active": 0, "away": 1, "": 2}
+
+    participants.sort(key = lambda participant: (order[statuses[participant.id]], participant.social_name is None, participant.social_name or "", participant.username))
+
+    context['participants'] = participants
+    context['statuses'] = statuses
 
     return render(request, 'subjects/_participants.html', context)
 
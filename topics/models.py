@@ -11,6 +11,7 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 from django.db import models
+from django.db.models.query import ModelIterable
 from autoslug.fields import AutoSlugField
 from django.utils.translation import ugettext_lazy as _
 
@@ -19,6 +20,7 @@ from students_group.models import StudentsGroup
 from users.models import User
 
 from .decorators import always_as_child
+from .versions import touch_subject
 
 class Topic(models.Model):
 	name = models.CharField(_('Name'), max_length = 200)
@@ -39,6 +41,54 @@ class Topic(models.Model):
 	def __str__(self):
 		return self.name
 
+	def save(self, *args, **kwargs):
+		super(Topic, self).save(*args, **kwargs)
+
+		touch_subject(self.subject_id)
+
+	def delete(self, *args, **kwargs):
+		subject_id = self.subject_id
+
+		result = super(Topic, self).delete(*args, **kwargs)
+
+		touch_subject(subject_id)
+
+		return result
+
+def load_children(instances):
+	"""
+		Fetches the children of the KnowsChild instances with one query by subclass and keeps each one in its parent,
+		where as_child finds it
+	"""
+	parents = {}
+
+	for instance in instances:
+		if isinstance(instance, KnowsChild) and instance._my_subclass and not instance.is_child():
+			cache_name = instance._meta.get_field(instance._my_subclass).get_cache_name()
+
+			if not hasattr(instance, cache_name):
+				parents.setdefault(instance._my_subclass, []).append(instance)
+
+	for subclass, subclass_parents in parents.items():
+		related = subclass_parents[0]._meta.get_field(subclass)
+		children = related.related_model._base_manager.in_bulk([parent.pk for parent in subclass_parents])
+
+		for parent in subclass_parents:
+			if parent.pk in children:
+				setattr(parent, related.get_cache_name(), children[parent.pk])
+
+class ChildQuerySet(models.QuerySet):
+	"""
+		QuerySet of the KnowsChild models that loads the children of its results along with them (see load_children)
+	"""
+	def _fetch_all(self):
+		load = self._result_cache is None
+
+		super(ChildQuerySet, self)._fetch_all()
+
+		if load and self._iterable_class is ModelIterable:
+			load_children(self._result_cache)
+
 """
 	Abstract model to make easier to know which kind of Resource we are dealing with
 """
@@ -49,7 +99,13 @@ class KnowsChild(models.Model):
     class Meta:
         abstract = True
  
+    def is_child(self):
+        return self.__class__.__name__.lower() == self._my_subclass
+
     def as_child(self):
+        if self.is_child():
+            return self
+
         return getattr(self, self._my_subclass)
  
     def save(self, *args, **kwargs):
@@ -74,6 +130,8 @@ class Resource(KnowsChild):
 	create_date = models.DateTimeField(_('Create Date'), auto_now_add = True)
 	last_update = models.DateTimeField(_('Last Update'), auto_now = True)
 
+	objects = ChildQuerySet.as_manager()
+
 	class Meta:
 		verbose_name = _('Resource')
 		verbose_name_plural = _('Resources')
@@ -82,6 +140,23 @@ class Resource(KnowsChild):
 	def __str__(self):
 		return self.name
 
+	def get_subject_id(self):
+		return self.topic.subject_id if self.topic_id else None
+
+	def save(self, *args, **kwargs):
+		super(Resource, self).save(*args, **kwargs)
+
+		touch_subject(self.get_subject_id())
+
+	def delete(self, *args, **kwargs):
+		subject_id = self.get_subject_id()
+
+		result = super(Resource, self).delete(*args, **kwargs)
+
+		touch_subject(subject_id)
+
+		return result
+
 	"""
 		Method to get the appropriated view link
 		Must override in the child models
@@ -0,0 +1,135 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# Statistics of the resources (who did or didn't each action, history of the actions) shown in their reports tab
+
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone
+
+from log.archive import archived_logs, is_archived
+from log.models import Log
+from log.resources import get_cache, get_version
+from students_group.models import StudentsGroup
+
+LOGS_KEY = "resource-statistics-%s-%s-%s-%s-%s-%s-%s"
+
+def get_resource_logs(resource_type, resource_id, actions, start_date, end_date, emails):
+	"""
+		Returns the (user email, user name, action, datetime) of the logs of the actions on the resource made by the users
+		with the given emails between the dates (both included), ordered by date.
+		They are cached until a new log of the resource is written
+	"""
+	#The default range of the reports ends now, whole minutes let the visits of the same minute share the cached logs
+	start_date = start_date.replace(second = 0, microsecond = 0)
+	end_date = end_date.replace(second = 0, microsecond = 0)
+
+	users = hashlib.md5(",".join(sorted(emails)).encode('utf-8')).hexdigest()
+	key = LOGS_KEY % (resource_type, resource_id, ",".join(actions), int(start_date.timestamp()), int(end_date.timestamp()), users, get_version(resource_type, resource_id))
+	logs = get_cache().get(key)
+
+	if logs is None:
+		logs = list(Log.objects.filter(resource_type = resource_type, resource_id = resource_id, resource = resource_type, action__in = actions,
+			datetime__range = (start_date, end_date), user_email__in = list(emails)).order_by('datetime').values_list('user_email', 'user', 'action', 'datetime'))
+
+		get_cache().set(key, logs, getattr(settings, 'STATISTICS_TIMEOUT', 3600))
+
+	return logs
+
+def get_groups_names(subject, students):
+	"""
+		Returns the names of the groups of the subject of each student (by id) joined by commas
+	"""
+	groups = {}
+
+	for student, name in StudentsGroup.objects.filter(subject = subject, participants__in = students).order_by('name').values_list('participants', 'name'):
+		groups.setdefault(student, []).append(name)
+
+	return {student: ", ".join(names) for student, names in groups.items()}
+
+class ResourceStatistics(object):
+	"""
+		Actions of the students of a resource (all of the subject ones if the resource is for all students) between two dates
+	"""
+	def __init__(self, resource, resource_type, actions, start_date, end_date):
+		if resource.all_students:
+			students = resource.topic.subject.students.all()
+		else:
+			students = resource.students.all()
+
+		self.students = list(students)
+		self.by_email = {student.email: student for student in self.students}
+		self.groups = get_groups_names(resource.topic.subject, self.students)
+
+		#The dates of the reports forms are naive, as in datetime__range they are in the current timezone
+		if timezone.is_naive(start_date):
+			start_date = timezone.make_aware(start_date)
+
+		if timezone.is_naive(end_date):
+			end_date = timezone.make_aware(end_date)
+
+		self.logs = get_resource_logs(resource_type, resource.id, actions, start_date, end_date, self.by_email.keys())
+
+		#Logs older than the retention period are only on the archive files
+		if is_archived(start_date):
+			archived = archived_logs(start_date, end_date, resource_type = resource_type, resource_id = resource.id, resource = resource_type, action__in = actions, user_email__in = self.by_email)
+
+			self.logs = sorted([(log.user_email, log.user, log.action, log.datetime) for log in archived] + self.logs, key = lambda log: log[3])
+
+		self.did = {action: set() for action in actions}
+		self.first_access = {}
+		self.last_access = {}
+
+		for email, user, action, date in self.logs:
+			self.did[action].add(email)
+			self.first_access.setdefault(email, date)
+			self.last_access[email] = date
+
+	def get_group(self, student):
+		return self.groups.get(student.id, "")
+
+	def get_history(self, name = None):
+		"""
+			Rows (name, groups, action, date) of the actions in the order they were done, the name is the one of the student
+			unless a function of the log (user email, user name) is given
+		"""
+		history = []
+
+		for email, user, action, date in self.logs:
+			student = self.by_email[email]
+
+			history.append([str(student) if name is None else name(email, user), self.get_group(student), action, date])
+
+		return history
+
+	def get_not_did(self, columns):
+		"""
+			Rows of the students that didn't do each action, columns are (action, label) pairs
+		"""
+		rows = []
+
+		for action, label in columns:
+			for student in self.students:
+				if not student.email in self.did[action]:
+					rows.append([len(rows), str(student), self.get_group(student), label, str(student.email)])
+
+		return rows
+
+	def get_chart(self, title, did, n_did, columns):
+		chart = [[title, did, n_did]]
+
+		for action, label in columns:
+			chart.append([label, len(self.did[action]), len(self.students) - len(self.did[action])])
+
+		return chart
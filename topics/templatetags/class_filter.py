@@ -11,7 +11,6 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 from django import template
-from links.models import Link
 register = template.Library()
 
 @register.filter('class_name')
@@ -20,5 +19,4 @@ def class_name(obj):
 
 @register.filter('resource_link')
 def resource_link(resource):
-	link = Link.objects.get(id=resource.id)
-	return link.link_url
\ No newline at end of file
+	return resource.as_child().link_url
\ No newline at end of file
@@ -10,6 +10,156 @@ Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA
 Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
 """
 
+from datetime import datetime, timedelta
+
+import json
+
+from django.core.urlresolvers import reverse
 from django.test import TestCase
+from django.utils import timezone
+
+from links.models import Link
+from log.models import Log
+from log.resources import get_cache
+from students_group.models import StudentsGroup
+from subjects.models import Subject
+from users.models import User
+
+from .models import Resource, Topic
+from .statistics import ResourceStatistics, get_resource_logs
+from .tree import render_topics
+from .versions import get_cache as get_topics_cache
+
+class ResourceStatisticsTest(TestCase):
+
+	def setUp(self):
+		get_cache().clear()
+
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		self.topic = Topic.objects.create(name = "topic", subject = self.subject, visible = True)
+		self.link = Link.objects.create(name = "link", topic = self.topic, link_url = "http://amadeus.br", all_students = True)
+
+		self.viewer = User.objects.create(username = "viewer", email = "viewer@amadeus.br")
+		self.absent = User.objects.create(username = "absent", email = "absent@amadeus.br")
+		self.subject.students.add(self.viewer, self.absent)
+
+		group = StudentsGroup.objects.create(name = "Group A", subject = self.subject)
+		group.participants.add(self.viewer)
+
+	def view(self, user):
+		Log.objects.create(component = "resources", action = "view", resource = "link", user = str(user), user_id = user.id,
+			user_email = user.email, context = {'subject_id': self.subject.id, 'link_id': self.link.id})
+
+	def get_statistics(self):
+		return ResourceStatistics(self.link, "link", ["view"], datetime.now() - timedelta(days = 1), datetime.now() + timedelta(minutes = 1))
+
+	def test_did_and_groups(self):
+		self.view(self.viewer)
+
+		statistics = self.get_statistics()
+
+		self.assertEqual(statistics.get_chart("Link", "did", "n_did", [("view", "View")])[1], ["View", 1, 1])
+		self.assertEqual([row[1:] for row in statistics.get_not_did([("view", "View")])], [[str(self.absent), "", "View", self.absent.email]])
+		self.assertEqual(statistics.get_history()[0][:3], [str(self.viewer), "Group A", "view"])
+
+	def test_new_log_invalidates(self):
+		self.view(self.viewer)
+		self.assertEqual(len(self.get_statistics().logs), 1)
+
+		self.view(self.absent)
+		self.assertEqual(len(self.get_statistics().logs), 2)
+
+	def test_same_minute_cached(self):
+		self.view(self.viewer)
+
+		end = (timezone.now() + timedelta(minutes = 2)).replace(second = 10)
+		get_resource_logs("link", self.link.id, ["view"], end - timedelta(days = 1), end, [self.viewer.email])
+
+		#The default range ends now, later visits of the same minute reuse the logs
+		with self.assertNumQueries(0):
+			logs = get_resource_logs("link", self.link.id, ["view"], end - timedelta(days = 1, seconds = -30), end + timedelta(seconds = 30), [self.viewer.email])
+
+		self.assertEqual(len(logs), 1)
+
+class ChildQuerySetTest(TestCase):
+
+	def setUp(self):
+		subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		self.topic = Topic.objects.create(name = "topic", subject = subject, visible = True)
+
+		for i in range(3):
+			Link.objects.create(name = "link %d" % i, topic = self.topic, link_url = "http://amadeus.br/%d" % i)
+
+	def test_children_loaded_once(self):
+		#The resources and one query for the links
+		with self.assertNumQueries(2):
+			resources = list(self.topic.resource_topic.all())
+
+		with self.assertNumQueries(0):
+			links = [str(resource.access_link()) for resource in resources]
+
+		self.assertEqual(sorted(links), sorted([str(link.access_link()) for link in Link.objects.filter(topic = self.topic)]))
+		self.assertEqual(Resource.objects.values_list('name', flat = True).count(), 3)
+
+class SubjectTopicsTest(TestCase):
+
+	def setUp(self):
+		get_topics_cache().clear()
+
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		self.topic = Topic.objects.create(name = "topic", subject = self.subject, visible = True)
+
+		self.open_link = Link.objects.create(name = "open link", topic = self.topic, link_url = "http://amadeus.br", all_students = True)
+		self.closed_link = Link.objects.create(name = "closed link", topic = self.topic, link_url = "http://amadeus.br")
+
+		self.student = User.objects.create(username = "student", email = "student@amadeus.br")
+		self.subject.students.add(self.student)
+
+	def test_filtered_and_invalidated(self):
+		html = render_topics(self.student, self.subject)
+
+		self.assertIn("open link", html)
+		self.assertNotIn("closed link", html)
+
+		#The roles are kept on the user and the tree and the list of this version are cached
+		with self.assertNumQueries(0):
+			render_topics(self.student, self.subject)
+
+		self.open_link.name = "renamed link"
+		self.open_link.save()
+
+		self.assertIn("renamed link", render_topics(self.student, self.subject))
+
+class UpdateOrderTest(TestCase):
+
+	def setUp(self):
+		self.subject = Subject.objects.create(name = "subject", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		self.topic = Topic.objects.create(name = "topic", subject = self.subject, visible = True)
+		self.links = [Link.objects.create(name = "link %d" % i, topic = self.topic, link_url = "http://amadeus.br", order = i) for i in range(3)]
+
+		admin = User.objects.create(username = "admin", email = "admin@amadeus.br", is_staff = True)
+		self.client.force_login(admin)
+
+	def post(self, resources):
+		data = json.dumps([{'resource_id': resource.id, 'resource_order': order} for order, resource in enumerate(resources, 1)])
+
+		return self.client.post(reverse('topics:update_resource_order'), {'data': data})
+
+	def test_reorder(self):
+		response = self.post(list(reversed(self.links)))
+
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual([link.id for link in Resource.objects.filter(topic = self.topic).order_by('order')], [link.id for link in reversed(self.links)])
+
+	def test_other_subject(self):
+		subject = Subject.objects.create(name = "other", visible = True, init_date = datetime.now(), end_date = datetime.now(),
+			subscribe_begin = datetime.now(), subscribe_end = datetime.now())
+		topic = Topic.objects.create(name = "other topic", subject = subject, visible = True)
+		other = Link.objects.create(name = "other link", topic = topic, link_url = "http://amadeus.br")
 
-# Create your tests here.
+		self.assertEqual(self.post(self.links + [other]).status_code, 400)
+		self.assertEqual(self.post(self.links[:1]).status_code, 200)
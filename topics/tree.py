@@ -0,0 +1,100 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+# Topics and resources tree of the subject page. The tree (visibility and audience of each topic and resource) is
+# cached per subject version, the user filtering runs in memory over it and the rendered list is cached per
+# subject version and set of visible topics and resources, so the users who see the same ones share it
+
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from amadeus.permissions import get_roles
+
+from .models import Resource, Topic
+from .versions import get_cache, get_version
+
+TREE_KEY = "subject-tree-%s-%s"
+LIST_KEY = "subject-topics-list-%s-%s-%s-%s"
+
+TreeTopic = namedtuple('TreeTopic', ['id', 'subject_id', 'visible', 'repository', 'resources'])
+TreeResource = namedtuple('TreeResource', ['id', 'visible', 'all_students'])
+
+def get_tree(subject, version):
+	"""
+		Returns the topics of the subject, in their order, with their resources
+	"""
+	key = TREE_KEY % (subject.id, version)
+	tree = get_cache().get(key)
+
+	if tree is None:
+		resources = {}
+
+		for resource_id, topic_id, visible, all_students in Resource.objects.filter(topic__subject = subject).values_list('id', 'topic_id', 'visible', 'all_students'):
+			resources.setdefault(topic_id, []).append(TreeResource(resource_id, visible, all_students))
+
+		tree = [TreeTopic(topic_id, subject.id, visible, repository, resources.get(topic_id, [])) for topic_id, visible, repository in Topic.objects.filter(subject = subject).values_list('id', 'visible', 'repository')]
+
+		get_cache().set(key, tree, getattr(settings, 'TOPICS_TIMEOUT', 3600))
+
+	return tree
+
+def get_visible_tree(user, subject, tree):
+	"""
+		Returns if the user manages the subject and the (topic id, resources ids) of the tree the user can see
+	"""
+	roles = get_roles(user)
+	manager = roles.manages_subject(subject.id)
+
+	visible = []
+
+	for topic in tree:
+		if not topic.repository and topic.visible or manager:
+			visible.append((topic.id, [resource.id for resource in topic.resources if roles.can_access_resource(resource, topic)]))
+
+	return manager, visible
+
+def render_topics(user, subject):
+	"""
+		Returns the topics list of the subject page (topics/list.html) for the user. It doesn't depend on the request,
+		so it is rendered without the context processors
+	"""
+	version = get_version(subject.id)
+
+	manager, visible = get_visible_tree(user, subject, get_tree(subject, version))
+
+	signature = hashlib.md5(repr((manager, visible)).encode('utf-8')).hexdigest()
+	key = LIST_KEY % (subject.id, version, get_language(), signature)
+
+	html = get_cache().get(key)
+
+	if html is None:
+		topics = Topic.objects.in_bulk([topic_id for topic_id, resources_ids in visible])
+		resources = Resource.objects.in_bulk([resource_id for topic_id, resources_ids in visible for resource_id in resources_ids])
+
+		topics_list = []
+
+		for topic_id, resources_ids in visible:
+			topic = topics[topic_id]
+			topic.subject = subject
+			topic.resources = [resources[resource_id] for resource_id in resources_ids]
+
+			topics_list.append(topic)
+
+		html = render_to_string('topics/list.html', {'subject': subject, 'topics': topics_list, 'has_subject_permissions': manager})
+
+		get_cache().set(key, html, getattr(settings, 'TOPICS_TIMEOUT', 3600))
+
+	return html
@@ -0,0 +1,41 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+# Versions of the topics of each subject, used as part of the cache keys of what is rendered from them (see topics.tree).
+# Saving or deleting a topic or a resource changes the version of its subject, so what was cached before is no longer read
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = "subject-topics-%s"
+
+def get_cache():
+	return caches[getattr(settings, 'TOPICS_CACHE', 'default')]
+
+def get_version(subject_id):
+	key = VERSION_KEY % subject_id
+	version = get_cache().get(key)
+
+	if version is None:
+		version = str(time.time())
+
+		get_cache().add(key, version, None)
+
+		version = get_cache().get(key, version)
+
+	return version
+
+def touch_subject(subject_id):
+	if subject_id:
+		get_cache().set(VERSION_KEY % subject_id, str(time.time()), None)
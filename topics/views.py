@@ -13,7 +13,9 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import generic
 from django.contrib import messages
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Case, PositiveSmallIntegerField, Value, When
+from django.http import Http404, JsonResponse
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -22,7 +24,6 @@ from django.views.decorators.csrf import csrf_exempt
 import json
 import time
 
-from log.models import Log
 from log.mixins import LogMixin
 from log.decorators import log_decorator_ajax
 
@@ -31,6 +32,7 @@ from amadeus.permissions import has_subject_permissions
 from subjects.models import Subject
 
 from .models import Topic, Resource
+from .versions import touch_subject
 from .forms import TopicForm
 
 
@@ -162,6 +164,8 @@ class UpdateView(LoginRequiredMixin, LogMixin, generic.UpdateView):
 		if not self.object.visible and not self.object.repository:
 			Resource.objects.filter(topic = self.object).update(visible = False)
 
+			touch_subject(self.object.subject_id)
+
 		messages.success(self.request, _('Topic "%s" was updated on virtual enviroment "%s" successfully!')%(self.object.name, self.object.subject.name))
 
 		self.log_context['category_id'] = self.object.subject.category.id
@@ -251,24 +255,64 @@ def topic_view_log(request, topic):
 
 		request.log_context = log_context
 
-		log_id = Log.objects.latest('id').id
+		log_id = request.log_id
 
 		return JsonResponse({'message': 'ok', 'log_id': log_id})
 
 	return JsonResponse({'message': 'ok'})
 
+def get_orders(data, id_key, order_key):
+	"""
+		Returns the {id: order} of the posted JSON list, None if it is not valid
+	"""
+	try:
+		orders = {int(item[id_key]): int(item[order_key]) for item in json.loads(data)}
+	except (ValueError, TypeError, KeyError):
+		return None
+
+	if not all(0 <= order <= 32767 for order in orders.values()):
+		return None
+
+	return orders
+
+def set_orders(request, queryset, orders, subject_field):
+	"""
+		Sets the orders of the objects of the queryset in one UPDATE ... CASE statement, if they all exist, are from the same
+		subject and the user can change it
+	"""
+	with transaction.atomic():
+		objects = queryset.filter(id__in = orders.keys())
+		subjects = dict(objects.values_list('id', subject_field))
+
+		if len(subjects) < len(orders):
+			raise Http404
+
+		subjects = set(subjects.values())
+
+		if len(subjects) > 1:
+			return JsonResponse({'message': 'Objects of different subjects'}, status = 400)
+
+		subject = get_object_or_404(Subject, id = subjects.pop())
+
+		if not has_subject_permissions(request.user, subject):
+			return JsonResponse({'message': 'Forbidden'}, status = 403)
+
+		objects.update(order = Case(*[When(id = obj_id, then = Value(order)) for obj_id, order in orders.items()], output_field = PositiveSmallIntegerField()))
+
+	touch_subject(subject.id)
+
+	return JsonResponse({'message': 'ok'})
+
 def update_order(request):
 	data = request.GET.get('data', None)
 
 	if not data is None:
-		data = json.loads(data)
+		orders = get_orders(data, 'topic_id', 'topic_order')
 
-		for t_data in data:
-			topic = get_object_or_404(Topic, id = t_data['topic_id'])
-			topic.order = t_data['topic_order']
-			topic.save()
+		if not orders:
+			return JsonResponse({'message': 'Invalid data'}, status = 400)
 
-		return JsonResponse({'message': 'ok'})
+		return set_orders(request, Topic.objects.all(), orders, 'subject_id')
 
 	return JsonResponse({'message': 'No data received'})
 
@@ -277,14 +321,12 @@ def update_resource_order(request):
 	data = request.POST.get('data', None)
 
 	if not data is None:
-		data = json.loads(data)
-		
-		for t_data in data:
-			resource = get_object_or_404(Resource, id = t_data['resource_id'])
-			resource.order = t_data['resource_order']
-			resource.save()
-
-		return JsonResponse({'message': 'ok'})
+		orders = get_orders(data, 'resource_id', 'resource_order')
+
+		if not orders:
+			return JsonResponse({'message': 'Invalid data'}, status = 400)
+
+		return set_orders(request, Resource.objects.all(), orders, 'topic__subject_id')
 
 	return JsonResponse({'message': 'No data received'})
 
@@ -11,7 +11,7 @@ Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título
 """
 
 """
-	Middleware to register a log event for a session expire
+	Middleware to register a log event for a session expire and to refresh the user last seen time (see users.presence)
 	Called before session_security package clears the session and log out the user
 """
 
@@ -20,11 +20,11 @@ from session_security.settings import EXPIRE_AFTER
 from session_security.utils import get_last_activity, set_last_activity
 
 from log.models import Log
+from log.sink import log_sink
 
-from .models import User
-from django.utils.translation import ugettext as _u
-from channels import Group
-import json
+from django.conf import settings
+
+from .presence import touch, set_offline, notify_status
 
 class SessionExpireMiddleware(object):
 
@@ -50,19 +50,15 @@ class SessionExpireMiddleware(object):
 			log.action = "logout"
 			log.resource = "system"
 
-			log.save()
-
-			users = User.objects.all().exclude(email = request.user.email)
+			log_sink.write(log)
 
-			notification = {
-				"type": "user_status",
-				"user_id": str(request.user.id),
-				"status": _u("Offline"),
-				"status_class": "",
-				"remove_class": "away"
-			}
+			set_offline(request.user.id)
+			notify_status(request.user, False)
+		else:
+			#The last seen time is refreshed at most once per interval to spare the cache
+			last_touch = request.session.get('_presence_touch', 0)
 
-			notification = json.dumps(notification)
+			if now.timestamp() - last_touch >= getattr(settings, 'PRESENCE_TOUCH_INTERVAL', 60):
+				touch(request.user.id)
 
-			for u in users:
-				Group("user-%s" % u.id).send({'text': notification})
\ No newline at end of file
+				request.session['_presence_touch'] = now.timestamp()
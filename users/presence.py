@@ -0,0 +1,114 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+# File used to store the users presence: a last seen map kept in the cache and updated by the middleware and the websocket handlers
+
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils.translation import ugettext as _u
+
+from amadeus.websocket import STAFF_GROUP, send_to_groups, subject_group, user_group
+
+PRESENCE_KEY = "presence-%s"
+
+def get_cache():
+	return caches[getattr(settings, 'PRESENCE_CACHE', 'default')]
+
+def touch(user_id, online = True):
+	get_cache().set(PRESENCE_KEY % user_id, {'seen': time.time(), 'online': online}, None)
+
+def set_offline(user_id):
+	touch(user_id, online = False)
+
+def load_from_logs(user_ids):
+	"""
+		Builds the presence of users missing from the cache with their last log, in one query
+	"""
+	from log.models import Log
+
+	entries = {user_id: {'seen': 0, 'online': False} for user_id in user_ids}
+
+	last_logs = Log.objects.filter(user_id__in = user_ids).order_by('user_id', '-datetime').distinct('user_id').values('user_id', 'action', 'datetime')
+
+	for log in last_logs:
+		entries[log['user_id']] = {'seen': log['datetime'].timestamp(), 'online': log['action'] != 'logout'}
+
+	get_cache().set_many({PRESENCE_KEY % user_id: entry for user_id, entry in entries.items()}, None)
+
+	return entries
+
+def get_status(entry, now = None):
+	if now is None:
+		now = time.time()
+
+	if entry['online']:
+		if now - entry['seen'] < settings.SESSION_SECURITY_EXPIRE_AFTER:
+			return "active"
+
+		return "away"
+
+	return ""
+
+def get_statuses(user_ids):
+	"""
+		Returns the status ("active", "away" or "" when offline) of each user, with one cache lookup for all of them
+	"""
+	user_ids = set(user_ids)
+
+	cached = get_cache().get_many([PRESENCE_KEY % user_id for user_id in user_ids])
+	entries = {user_id: cached[PRESENCE_KEY % user_id] for user_id in user_ids if PRESENCE_KEY % user_id in cached}
+
+	missing = user_ids - set(entries.keys())
+
+	if missing:
+		entries.update(load_from_logs(list(missing)))
+
+	now = time.time()
+
+	return {user_id: get_status(entry, now) for user_id, entry in entries.items()}
+
+def get_user_status(user_id):
+	return get_statuses([user_id])[user_id]
+
+"""
+	Function to get the groups interested in a user status: the subjects the user belongs to, the staff
+	and the users it has talked to
+"""
+def get_presence_groups(user):
+	from chat.models import Conversation
+	from subjects.models import Subject
+
+	subjects = Subject.objects.filter(Q(professor = user) | Q(students = user) | Q(category__coordinators = user)).distinct().values_list('id', flat = True)
+	talks = Conversation.objects.filter(Q(user_one = user) | Q(user_two = user)).values_list('user_one_id', 'user_two_id')
+
+	groups = [STAFF_GROUP]
+	groups.extend(subject_group(subject) for subject in subjects)
+	groups.extend(set(user_group(one if one != user.id else two) for one, two in talks))
+
+	return groups
+
+def notify_status(user, online):
+	notification = {
+		"type": "user_status",
+		"sender": user.id,
+		"user_id": str(user.id),
+		"status": _u("Online") if online else _u("Offline"),
+		"status_class": "active" if online else "",
+		"remove_class": "away"
+	}
+
+	send_to_groups(get_presence_groups(user), json.dumps(notification))
@@ -80,12 +80,18 @@ class UserSerializer(serializers.ModelSerializer):
 		user = self.context.get('request_user', None)
 
 		if not user is None:
-			chat = Conversation.objects.filter((Q(user_one__email = user) & Q(user_two = user_to)) | (Q(user_one = user_to) & Q(user_two__email = user)))
+			#The same users repeat along a page of messages, the totals are kept in the serializer context
+			unseen = self.context.setdefault('unseen_msgs', {})
 
-			if chat.count() > 0:
-				chat = chat[0]
-				
-				return ChatVisualizations.objects.filter(message__talk = chat, user__email = user, viewed = False).count()
+			if not user_to.id in unseen:
+				chat = Conversation.objects.filter((Q(user_one__email = user) & Q(user_two = user_to)) | (Q(user_one = user_to) & Q(user_two__email = user))).first()
+
+				unseen[user_to.id] = 0
+
+				if not chat is None:
+					unseen[user_to.id] = ChatVisualizations.objects.filter(message__talk = chat, user__email = user, viewed = False).count()
+
+			return unseen[user_to.id]
 
 		return 0
 
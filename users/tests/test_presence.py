@@ -0,0 +1,56 @@
+""" 
+Copyright 2016, 2017 UFPE - Universidade Federal de Pernambuco
+ 
+Este arquivo é parte do programa Amadeus Sistema de Gestão de Aprendizagem, ou simplesmente Amadeus LMS
+ 
+O Amadeus LMS é um software livre; você pode redistribui-lo e/ou modifica-lo dentro dos termos da Licença Pública Geral GNU como publicada pela Fundação do Software Livre (FSF); na versão 2 da Licença.
+ 
+Este programa é distribuído na esperança que possa ser útil, mas SEM NENHUMA GARANTIA; sem uma garantia implícita de ADEQUAÇÃO a qualquer MERCADO ou APLICAÇÃO EM PARTICULAR. Veja a Licença Pública Geral GNU para maiores detalhes.
+ 
+Você deve ter recebido uma cópia da Licença Pública Geral GNU, sob o título "LICENSE", junto com este programa, se não, escreva para a Fundação do Software Livre (FSF) Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA.
+"""
+
+
+import time
+
+from django.test import TestCase, override_settings
+
+from log.models import Log
+
+from ..models import User
+from ..presence import get_cache, get_statuses, set_offline, touch
+
+@override_settings(PRESENCE_CACHE = 'default')
+class Presence_Test(TestCase):
+
+	def setUp(self):
+		get_cache().clear()
+
+		self.users = [User.objects.create(username = 'presence%d' % i, email = 'presence%d@amadeus.br' % i) for i in range(3)]
+
+	def test_touch(self):
+		touch(self.users[0].id)
+		set_offline(self.users[1].id)
+
+		statuses = get_statuses([user.id for user in self.users])
+
+		self.assertEqual(statuses[self.users[0].id], "active")
+		self.assertEqual(statuses[self.users[1].id], "")
+		self.assertEqual(statuses[self.users[2].id], "")
+
+	def test_away(self):
+		get_cache().set('presence-%s' % self.users[0].id, {'seen': time.time() - 7200, 'online': True})
+
+		self.assertEqual(get_statuses([self.users[0].id])[self.users[0].id], "away")
+
+	def test_logs_fallback(self):
+		Log.objects.create(component = "user", action = "view", resource = "system", user = str(self.users[0]), user_id = self.users[0].id, user_email = self.users[0].email, context = {})
+
+		with self.assertNumQueries(1):
+			statuses = get_statuses([user.id for user in self.users])
+
+		self.assertEqual(statuses[self.users[0].id], "active")
+
+		#Loaded users are kept in the cache
+		with self.assertNumQueries(0):
+			get_statuses([user.id for user in self.users])
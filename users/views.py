@@ -17,7 +17,6 @@ from django.contrib.auth import authenticate, login as login_user, logout as log
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.utils.translation import ugettext_lazy as _
-from django.utils.translation import ugettext as _u
 from django.db.models import Q, Count
 
 from braces import views as braces_mixins
@@ -33,8 +32,7 @@ from .utils import has_dependencies
 from .forms import RegisterUserForm, ProfileForm, UserForm, ChangePassForm, PassResetRequest, SetPasswordForm
 
 #USER STATUS NOTIFICATION
-from channels import Group
-import json
+from .presence import touch, set_offline, notify_status
 
 #RECOVER PASS IMPORTS
 from django.contrib.auth.tokens import default_token_generator
@@ -528,20 +526,8 @@ def login(request):
 			if not security.maintence or user.is_staff:
 				login_user(request, user)
 
-				users = User.objects.all().exclude(email = username)
-
-				notification = {
-					"type": "user_status",
-					"user_id": str(user.id),
-					"status": _u("Online"),
-					"status_class": "active",
-					"remove_class": "away"
-				}
-
-				notification = json.dumps(notification)
-
-				for u in users:
-					Group("user-%s" % u.id).send({'text': notification})
+				touch(user.id)
+				notify_status(user, True)
 
 				next_url = request.GET.get('next', None)
 
@@ -562,31 +548,15 @@ def login(request):
 @log_decorator('user', 'logout', 'system')
 def logout(request, next_page = None):
 	if not request.user.is_anonymous:
-		user_email = request.user.email
-		user_id = request.user.id
+		user = request.user
 	else:
-		user_email = None
-		user_id = 0
+		user = None
 
 	logout_user(request)
 
-	if not user_email is None:
-		users = User.objects.all().exclude(email = user_email)
-	else:
-		users = User.objects.all()
-
-	notification = {
-		"type": "user_status",
-		"user_id": str(user_id),
-		"status": _u("Offline"),
-		"status_class": "",
-		"remove_class": "away"
-	}
-
-	notification = json.dumps(notification)
-
-	for u in users:
-		Group("user-%s" % u.id).send({'text': notification})
+	if not user is None:
+		set_offline(user.id)
+		notify_status(user, False)
 
 	if next_page:
 		return redirect(next_page)
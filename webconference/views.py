@@ -22,7 +22,6 @@ from webpage.forms import FormModalMessage
 from chat.models import Conversation, TalkMessages, ChatVisualizations
 import textwrap
 import json
-from django.db.models import Q
 from channels import Group
 import datetime
 from users.models import User
@@ -34,7 +33,7 @@ from subjects.models import Subject
 from amadeus.permissions import has_subject_permissions, has_resource_permissions
 
 import time
-from log.models import Log
+from topics.statistics import ResourceStatistics
 from log.mixins import LogMixin
 from log.decorators import log_decorator
 
@@ -84,9 +83,9 @@ class NewWindowView(LoginRequiredMixin,LogMixin, generic.DetailView):
         self.log_context['webconference_slug'] = self.object.slug
         self.log_context['webconference_view'] = str(int(time.time()))
 
-        super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+        log = super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -248,9 +247,9 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.DetailView):
         self.log_context['webconference_slug'] = self.object.slug
         self.log_context['webconference_view'] = str(int(time.time()))
 
-        super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+        log = super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -625,54 +624,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
             end_date = datetime.datetime.strptime(self.request.GET.get('end_date',''),date_format)
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = webconference.students.all()
-        if webconference.all_students :
-            alunos = webconference.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'webconference_id':webconference.id},resource="webconference",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1))).filter(Q(action="view") | Q(action="initwebconference") | Q(action="participating"))
+        statistics = ResourceStatistics(webconference, "webconference", ["view", "initwebconference", "participating"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in webconference.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-
-        json_history["data"] = data_history
-
         column_view,column_initwebconference,column_participate = str(_('View')),str(_('Enter')),str(_('Participate'))
+        columns = [("view", column_view), ("initwebconference", column_initwebconference), ("participating", column_participate)]
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="view").distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in webconference.topic.subject.group_subject.filter(participants__email=alun.email)]),column_view, str(alun.email)])
-            index += 1
-
-        not_initwebconference = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="initwebconference").distinct("user_email")])
-        for alun in not_initwebconference:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in webconference.topic.subject.group_subject.filter(participants__email=alun.email)]),column_initwebconference, str(alun.email)])
-            index += 1
-
-        not_participate = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="participating").distinct("user_email")])
-        for alun in not_participate:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in webconference.topic.subject.group_subject.filter(participants__email=alun.email)]),column_participate, str(alun.email)])
-            index += 1
-
-        json_n_did["data"] = data_n_did
-
-
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.filter(action="view").distinct("user_email").count()
-        c_initwebconference = vis_ou.filter(action="initwebconference").distinct("user_email").count()
-        c_participate = vis_ou.filter(action="participating").distinct("user_email").count()
-        re.append([str(_('Webconference')),did,n_did])
+        context["json_n_did"] = {"data": statistics.get_not_did(columns)}
+        context["json_history"] = {"data": statistics.get_history()}
 
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
-        re.append([column_initwebconference,c_initwebconference, alunos.count() - c_initwebconference])
-        re.append([column_participate,c_participate, alunos.count() - c_participate])
+        re = statistics.get_chart(str(_('Webconference')), did, n_did, columns)
 
         context['view'] = column_view
         context['initwebconference'] = column_initwebconference
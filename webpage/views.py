@@ -31,7 +31,7 @@ from pendencies.forms import PendenciesForm
 from .forms import WebpageForm
 from .models import Webpage
 
-from log.models import Log
+from topics.statistics import ResourceStatistics
 from chat.models import Conversation, TalkMessages, ChatVisualizations
 from users.models import User
 from subjects.models import Subject
@@ -84,10 +84,10 @@ class NewWindowView(LoginRequiredMixin, LogMixin, generic.DetailView):
         self.log_context['webpage_slug'] = self.object.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action,
-                                             self.log_resource, self.log_context)
+        log = super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action,
+                                                   self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -135,9 +135,9 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.DetailView):
         self.log_context['webpage_slug'] = self.object.slug
         self.log_context['timestamp_start'] = str(int(time.time()))
 
-        super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
+        log = super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context)
 
-        self.request.session['log_id'] = Log.objects.latest('id').id
+        self.request.session['log_id'] = log.id
 
         return context
 
@@ -486,37 +486,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
             end_date = datetime.datetime.strptime(self.request.GET.get('end_date',''),date_format)
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = webpage.students.all()
-        if webpage.all_students :
-        	alunos = webpage.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'webpage_id':webpage.id},resource="webpage",action="view",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1)))
+        statistics = ResourceStatistics(webpage, "webpage", ["view"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in webpage.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
+        column_view = str(_('View'))
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in webpage.topic.subject.group_subject.filter(participants__email=alun.email)]),str(_('View')), str(alun.email)])
-            index += 1
-        json_n_did["data"] = data_n_did
+        context["json_n_did"] = {"data": statistics.get_not_did([("view", column_view)])}
+        context["json_history"] = {"data": statistics.get_history()}
 
+        re = statistics.get_chart(str(_('Webpage')), did, n_did, [("view", column_view)])
 
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.distinct("user_email").count()
-        column_view = str(_('View'))
-        re.append([str(_('Webpage')),did,n_did])
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
         context['topic'] = webpage.topic
         context['subject'] = webpage.topic.subject
         context['db_data'] = re
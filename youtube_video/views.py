@@ -21,7 +21,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from amadeus.permissions import has_subject_permissions, has_resource_permissions
 
 import time
-from log.models import Log
+from topics.statistics import ResourceStatistics
 from log.mixins import LogMixin
 from log.decorators import log_decorator_ajax, log_decorator
 
@@ -31,14 +31,12 @@ from .forms import YTVideoForm, InlinePendenciesFormset
 from .models import YTVideo
 
 import datetime
-from log.models import Log
 from chat.models import Conversation, TalkMessages, ChatVisualizations
 from users.models import User
 from subjects.models import Subject
 
 from webpage.forms import FormModalMessage
 
-from django.db.models import Q
 from django.template.loader import render_to_string
 from django.utils import formats
 import textwrap
@@ -87,9 +85,9 @@ class NewWindowView(LoginRequiredMixin, LogMixin, generic.DetailView):
 		self.log_context['ytvideo_slug'] = self.object.slug
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+		log = super(NewWindowView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		return context
 
@@ -137,9 +135,9 @@ class InsideView(LoginRequiredMixin, LogMixin, generic.DetailView):
 		self.log_context['ytvideo_slug'] = self.object.slug
 		self.log_context['timestamp_start'] = str(int(time.time()))
 
-		super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
+		log = super(InsideView, self).createLog(self.request.user, self.log_component, self.log_action, self.log_resource, self.log_context) 
 
-		self.request.session['log_id'] = Log.objects.latest('id').id
+		self.request.session['log_id'] = log.id
 
 		return context
 
@@ -463,7 +461,7 @@ def ytvideo_watch_log(request, ytvideo):
 
 		request.log_context = log_context
 
-		log_id = Log.objects.latest('id').id
+		log_id = request.log_id
 
 		return JsonResponse({'message': 'ok', 'log_id': log_id})
 
@@ -545,54 +543,16 @@ class StatisticsView(LoginRequiredMixin, LogMixin, generic.DetailView):
             end_date = datetime.datetime.strptime(self.request.GET.get('end_date',''),date_format)
         context["init_date"] = start_date
         context["end_date"] = end_date
-        alunos = ytvideo.students.all()
-        if ytvideo.all_students :
-        	alunos = ytvideo.topic.subject.students.all()
 
-        vis_ou = Log.objects.filter(context__contains={'ytvideo_id':ytvideo.id},resource="ytvideo",user_email__in=(aluno.email for aluno in alunos), datetime__range=(start_date,end_date + datetime.timedelta(minutes = 1))).filter(Q(action="view") | Q(action="watch") | Q(action="finish"))
+        statistics = ResourceStatistics(ytvideo, "ytvideo", ["view", "watch", "finish"], start_date, end_date + datetime.timedelta(minutes = 1))
         did,n_did,history = str(_("Realized")),str(_("Unrealized")),str(_("Historic"))
-        re = []
-        data_n_did,data_history = [],[]
-        json_n_did, json_history = {},{}
-
-        for log_al in vis_ou.order_by("datetime"):
-            data_history.append([str(alunos.get(email=log_al.user_email)),
-            ", ".join([str(x) for x in ytvideo.topic.subject.group_subject.filter(participants__email=log_al.user_email)]),
-            log_al.action,log_al.datetime])
-        
-        json_history["data"] = data_history
-
         column_view,column_watch,column_finish = str(_('View')),str(_('Watch')),str(_('Finish'))
+        columns = [("view", column_view), ("watch", column_watch), ("finish", column_finish)]
 
-        not_view = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="view").distinct("user_email")])
-        index = 0
-        for alun in not_view:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in ytvideo.topic.subject.group_subject.filter(participants__email=alun.email)]),column_view, str(alun.email)])
-            index += 1
-        
-        not_watch = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="watch").distinct("user_email")])
-        for alun in not_watch:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in ytvideo.topic.subject.group_subject.filter(participants__email=alun.email)]),column_watch, str(alun.email)])
-            index += 1
-        
-        not_finish = alunos.exclude(email__in=[log.user_email for log in vis_ou.filter(action="finish").distinct("user_email")])
-        for alun in not_finish:
-            data_n_did.append([index,str(alun),", ".join([str(x) for x in ytvideo.topic.subject.group_subject.filter(participants__email=alun.email)]),column_finish, str(alun.email)])
-            index += 1
+        context["json_n_did"] = {"data": statistics.get_not_did(columns)}
+        context["json_history"] = {"data": statistics.get_history()}
 
-        json_n_did["data"] = data_n_did
-
-
-        context["json_n_did"] = json_n_did
-        context["json_history"] = json_history
-        c_visualizou = vis_ou.filter(action="view").distinct("user_email").count()
-        c_watch = vis_ou.filter(action="watch").distinct("user_email").count()
-        c_finish = vis_ou.filter(action="finish").distinct("user_email").count()
-        re.append([str(_('Youtube Video')),did,n_did])
-        
-        re.append([column_view,c_visualizou, alunos.count() - c_visualizou])
-        re.append([column_watch,c_watch, alunos.count() - c_watch])
-        re.append([column_finish,c_finish, alunos.count() - c_finish])
+        re = statistics.get_chart(str(_('Youtube Video')), did, n_did, columns)
 
         context['view'] = column_view
         context['watch'] = column_watch